@@ -0,0 +1,341 @@
+# analysis_service.py
+"""
+Warm, long-running analysis service for low-latency task requests.
+
+Business role:
+- Answer run_task-style requests in milliseconds instead of paying a cold
+  Python start, imports, file parsing and market-data fetches every time.
+- Libraries stay imported, cleaned frames stay in task_runner's stage
+  cache (re-read automatically when the file changes) and market data
+  stays in market_data_utils' in-memory LRU.
+- Jobs run on a bounded worker pool: at most max_workers run at once,
+  at most max_pending are accepted; beyond that the service answers
+  503 + Retry-After instead of queueing without limit.
+
+Protocol: plain HTTP/1.1 + JSON on 127.0.0.1 or a Unix socket.
+    GET  /health        {"status": "ok"}
+    GET  /stats         running / queued / completed / failed / rejected, cache sizes
+    POST /run           one job (batch_runner job keys), returns the job report
+    POST /cache/clear   drop cached frames and market data
+
+Usage:
+    python analysis_service.py --port 8765 --workers 4 --max-pending 32 --format parquet
+    python analysis_service.py --unix-socket /tmp/analysis.sock
+
+    from analysis_service import request_task
+    request_task({"task": "clean", "filepath": "stores.csv"}, port=8765)
+"""
+
+import os
+import sys
+import json
+import time
+import socket
+import asyncio
+import argparse
+import threading
+import http.client
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import task_runner
+import market_data_utils
+from output_utils import configure_output
+from batch_runner import load_job_spec
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_BODY_BYTES = 1_000_000
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 413: "Payload Too Large",
+           500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+def _jsonable(value):
+    """Model results hold numpy scalars / arrays; DataFrames are not sent back."""
+    if isinstance(value, dict):
+        return {k: _jsonable(v) for k, v in value.items() if not isinstance(v, (pd.DataFrame, pd.Series))}
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _execute(job: dict) -> dict:
+    """Worker thread: run one job via run_task (never prompts) and time it."""
+    params = {k: v for k, v in job.items() if k != "name"}
+    wall_start, cpu_start = time.perf_counter(), time.thread_time()
+    try:
+        result = task_runner.run_task(interactive=False, **params)
+        status, error = "done", None
+    except Exception as e:
+        result, status, error = None, "failed", f"{type(e).__name__}: {e}"
+    return {
+        "name": job["name"],
+        "task": job["task"],
+        "filepath": job.get("filepath"),
+        "status": status,
+        "error": error,
+        "output": result if isinstance(result, str) else None,
+        "results": _jsonable(result) if isinstance(result, dict) else None,
+        "wall_seconds": round(time.perf_counter() - wall_start, 4),
+        "cpu_seconds": round(time.thread_time() - cpu_start, 4)
+    }
+
+
+class AnalysisService:
+    """
+    asyncio front end + thread pool back end. Threads (not processes) so
+    every job shares the warm caches; NumPy / pandas release the GIL in
+    their heavy loops.
+
+    max_workers: jobs running at once
+    max_pending: jobs accepted at once (running + waiting); more -> 503
+    timeout:     seconds before a request gets 504 (the job still finishes
+                 and its result is cached)
+    output_format: e.g. "parquet" — writing the output is most of a warm
+                 request, and parquet writes far faster than CSV
+    """
+
+    def __init__(self, max_workers: int = 4, max_pending: int = 32, timeout: float = None, preload: bool = True,
+                 output_format: str = None):
+        self.max_workers = max_workers
+        self.max_pending = max(max_pending, max_workers)
+        self.timeout = timeout
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="analysis")
+        self.pending = 0
+        self.running = 0
+        self._running_lock = threading.Lock()
+        self.counts = {"completed": 0, "failed": 0, "rejected": 0, "timed_out": 0}
+        self.started = time.time()
+        self.server = None
+        if output_format:
+            configure_output(fmt=output_format)
+        if preload:
+            for task in list(task_runner.TASK_REGISTRY):
+                task_runner.import_task(task)
+
+    # -------------------------
+    # Endpoints
+    # -------------------------
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "queued": self.pending - self.running,
+            "max_workers": self.max_workers,
+            "max_pending": self.max_pending,
+            **self.counts,
+            "stage_cache_entries": len(task_runner._stage_cache),
+            "stage_cache_bytes": task_runner.stage_cache_bytes(),
+            "market_cache_entries": len(market_data_utils._memory),
+            "uptime_seconds": round(time.time() - self.started, 1)
+        }
+
+    def _run_counted(self, job):
+        with self._running_lock:
+            self.running += 1
+        try:
+            return _execute(job)
+        finally:
+            with self._running_lock:
+                self.running -= 1
+
+    async def run_job(self, job: dict):
+        """Validate, admit (or reject) and run one job. Returns (HTTP status, body)."""
+        try:
+            job = load_job_spec([job])[0]
+        except (ValueError, TypeError, AttributeError) as e:
+            return 400, {"error": str(e)}
+
+        if self.pending >= self.max_pending:
+            self.counts["rejected"] += 1
+            return 503, {"error": "Service busy, retry shortly.", **self.stats()}
+
+        self.pending += 1
+        try:
+            future = asyncio.get_running_loop().run_in_executor(self.pool, self._run_counted, job)
+            row = await asyncio.wait_for(asyncio.shield(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.counts["timed_out"] += 1
+            return 504, {"error": f"Job did not finish within {self.timeout}s."}
+        finally:
+            self.pending -= 1
+
+        self.counts["completed" if row["status"] == "done" else "failed"] += 1
+        return (200 if row["status"] == "done" else 500), row
+
+    async def dispatch(self, method: str, path: str, body: bytes):
+        if method == "GET" and path == "/health":
+            return 200, {"status": "ok"}
+        if method == "GET" and path == "/stats":
+            return 200, self.stats()
+        if method == "POST" and path == "/cache/clear":
+            task_runner.clear_stage_cache()
+            market_data_utils.clear_cache()
+            return 200, {"status": "cleared"}
+        if method == "POST" and path == "/run":
+            try:
+                job = json.loads(body or b"{}")
+            except json.JSONDecodeError as e:
+                return 400, {"error": f"Invalid JSON: {e}"}
+            return await self.run_job(job)
+        return 404, {"error": f"No endpoint {method} {path}"}
+
+    # -------------------------
+    # HTTP/1.1 (keep-alive) over asyncio streams
+    # -------------------------
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line.strip():
+                    break
+                try:
+                    method, path, _ = request_line.decode("latin-1").split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, close=True)
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    key, _, value = line.decode("latin-1").partition(":")
+                    headers[key.strip().lower()] = value.strip()
+
+                close = headers.get("connection", "").lower() == "close"
+                length = int(headers.get("content-length") or 0)
+                if length > MAX_BODY_BYTES:
+                    await self._respond(writer, 413, {"error": f"Body over {MAX_BODY_BYTES} bytes"}, close=True)
+                    break
+                body = await reader.readexactly(length) if length else b""
+
+                status, payload = await self.dispatch(method.upper(), path.split("?", 1)[0], body)
+                await self._respond(writer, status, payload, close=close)
+                if close:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _respond(self, writer, status: int, payload: dict, close: bool = False):
+        body = json.dumps(payload, default=str).encode("utf-8")
+        head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                "Content-Type: application/json",
+                f"Content-Length: {len(body)}",
+                f"Connection: {'close' if close else 'keep-alive'}"]
+        if status == 503:
+            head.append("Retry-After: 1")
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, unix_socket: str = None):
+        """Start listening; returns the bound address (host, port) or the socket path."""
+        if unix_socket:
+            if os.path.exists(unix_socket):
+                os.remove(unix_socket)
+            self.server = await asyncio.start_unix_server(self.handle, path=unix_socket)
+            return unix_socket
+        self.server = await asyncio.start_server(self.handle, host, port)
+        return self.server.sockets[0].getsockname()[:2]
+
+    async def serve_forever(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, unix_socket: str = None):
+        address = await self.start(host, port, unix_socket)
+        print(f"✅ Analysis service listening on {address} ({self.max_workers} workers, {self.max_pending} pending max)")
+        async with self.server:
+            await self.server.serve_forever()
+
+    def close(self):
+        if self.server is not None:
+            self.server.close()
+        self.pool.shutdown(wait=False)
+
+
+def start_background(host: str = DEFAULT_HOST, port: int = 0, unix_socket: str = None, **service_kwargs):
+    """
+    Run a service on a daemon thread (notebooks, tests). port=0 picks a
+    free port. Returns (service, address); stop with stop_background(service).
+    """
+    service = AnalysisService(**service_kwargs)
+    loop = asyncio.new_event_loop()
+    ready = threading.Event()
+    box = {}
+
+    def run():
+        asyncio.set_event_loop(loop)
+        box["address"] = loop.run_until_complete(service.start(host, port, unix_socket))
+        ready.set()
+        loop.run_forever()
+
+    threading.Thread(target=run, name="analysis-service", daemon=True).start()
+    ready.wait()
+    service.loop = loop
+    return service, box["address"]
+
+
+def stop_background(service: AnalysisService, timeout: float = 10):
+    """Stop a start_background service: close open connections, then the loop."""
+    async def shutdown():
+        service.close()
+        # keep-alive connections still wait in handle(); end them while the loop runs
+        handlers = [t for t in asyncio.all_tasks() if t is not asyncio.current_task()]
+        for task in handlers:
+            task.cancel()
+        await asyncio.gather(*handlers, return_exceptions=True)
+
+    asyncio.run_coroutine_threadsafe(shutdown(), service.loop).result(timeout)
+    service.loop.call_soon_threadsafe(service.loop.stop)
+
+
+class _UnixHTTPConnection(http.client.HTTPConnection):
+    def __init__(self, path, timeout=None):
+        super().__init__("localhost", timeout=timeout)
+        self.unix_path = path
+
+    def connect(self):
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.settimeout(self.timeout)
+        self.sock.connect(self.unix_path)
+
+
+def request_task(job: dict = None, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT, unix_socket: str = None,
+                 path: str = "/run", method: str = None, timeout: float = 300) -> dict:
+    """
+    Client helper: send one job (or call another endpoint) and return the
+    JSON reply plus "http_status".
+    """
+    conn = _UnixHTTPConnection(unix_socket, timeout) if unix_socket else http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        body = json.dumps(job).encode("utf-8") if job is not None else None
+        conn.request(method or ("POST" if body is not None else "GET"), path, body=body,
+                     headers={"Content-Type": "application/json"})
+        response = conn.getresponse()
+        reply = json.loads(response.read() or b"{}")
+        reply["http_status"] = response.status
+        return reply
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Warm analysis service (HTTP + JSON).")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix-socket", default=None)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--max-pending", type=int, default=32)
+    parser.add_argument("--timeout", type=float, default=None)
+    parser.add_argument("--format", default=None, help="output format: csv, parquet or feather")
+    args = parser.parse_args()
+
+    service = AnalysisService(max_workers=args.workers, max_pending=args.max_pending, timeout=args.timeout,
+                              output_format=args.format)
+    try:
+        asyncio.run(service.serve_forever(args.host, args.port, args.unix_socket))
+    except KeyboardInterrupt:
+        service.close()
+        sys.exit(0)
@@ -1,8 +1,11 @@
 #analysis_utils.py
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+import numpy as np
 import pandas as pd
 import statsmodels.api as sm
-from scipy.stats import pearsonr, ttest_ind
-import matplotlib.pyplot as plt
+from statsmodels.stats.multitest import multipletests
+from scipy.stats import pearsonr, spearmanr, ttest_ind, t as t_dist
 
 # 1. Regression
 def prepare_regression(df, predictors, target):
@@ -18,6 +21,299 @@ def prepare_regression(df, predictors, target):
     model = sm.OLS(y, X).fit()
     return model
 
+# 1b. Grouped / rolling regression
+def _normalize_name(name):
+    return str(name).strip().lower().replace(" ", "_")
+
+
+def _regression_arrays(df, predictors, target, extra=()):
+    """
+    Float X / y (plus any extra key columns) with NaN rows dropped, matching
+    prepare_regression's column-name normalisation without renaming df.
+    """
+    lookup = {_normalize_name(c): c for c in df.columns}
+    predictors = [_normalize_name(p) for p in predictors]
+    target = _normalize_name(target)
+    extra = [_normalize_name(c) for c in extra if c is not None]
+    data = df[[lookup[c] for c in predictors + [target] + extra]].copy(deep=False)
+    data.columns = predictors + [target] + extra
+    data = data.dropna(subset=predictors + [target])
+    return data, predictors, target
+
+
+def _solve_centred(n, mx, my, cxx, cxy, cyy):
+    """
+    Batched OLS with intercept from centred moments.
+
+    n: (G,), mx: (G, p), my: (G,), cxx: (G, p, p), cxy: (G, p), cyy: (G,)
+    Returns coef (G, p+1) [const first], se (G, p+1), r2 (G,).
+    """
+    p = mx.shape[1]
+    inv = np.linalg.pinv(cxx)
+    slopes = np.einsum("gij,gj->gi", inv, cxy)
+    intercept = my - np.einsum("gi,gi->g", mx, slopes)
+
+    rss = np.maximum(cyy - np.einsum("gi,gi->g", slopes, cxy), 0.0)
+    dof = n - p - 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma2 = np.where(dof > 0, rss / dof, np.nan)
+        se_slopes = np.sqrt(sigma2[:, None] * np.einsum("gii->gi", inv))
+        se_intercept = np.sqrt(sigma2 * (1.0 / n + np.einsum("gi,gij,gj->g", mx, inv, mx)))
+        r2 = 1.0 - rss / cyy
+
+    coef = np.column_stack([intercept, slopes])
+    se = np.column_stack([se_intercept, se_slopes])
+    coef[dof <= 0] = np.nan
+    return coef, se, r2
+
+
+def _group_moments(x, y, starts, counts):
+    """Centred per-group moments for rows sorted by group (segments at `starts`)."""
+    n = counts.astype(float)
+    mx = np.add.reduceat(x, starts, axis=0) / n[:, None]
+    my = np.add.reduceat(y, starts) / n
+    xc = x - np.repeat(mx, counts, axis=0)
+    yc = y - np.repeat(my, counts)
+    p = x.shape[1]
+    cxx = np.add.reduceat((xc[:, :, None] * xc[:, None, :]).reshape(len(x), p * p), starts, axis=0).reshape(-1, p, p)
+    cxy = np.add.reduceat(xc * yc[:, None], starts, axis=0)
+    cyy = np.add.reduceat(yc ** 2, starts)
+    return n, mx, my, cxx, cxy, cyy
+
+
+def grouped_regression(df, predictors, target, group_col, n_jobs=1, min_obs=None):
+    """
+    One OLS (with constant) per group, all solved together with NumPy.
+
+    Rows with missing predictors/target are dropped (as in
+    prepare_regression), and so are rows with no group key. Groups with
+    too few rows (default: fewer than predictors + 2) get NaN results.
+    n_jobs > 1 splits the groups across threads.
+
+    Returns dict of DataFrames/Series indexed by group:
+      coef, se (columns const + predictors), r2, n, and
+      fitted (Series aligned to the rows of df that were used)
+    """
+    data, predictors, target = _regression_arrays(df, predictors, target, extra=[group_col])
+    group_col = _normalize_name(group_col)
+    data = data.dropna(subset=[group_col]).sort_values(group_col, kind="stable")
+
+    codes, groups = pd.factorize(data[group_col], sort=False)
+    starts = np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+    counts = np.diff(np.r_[starts, len(codes)])
+    x = data[predictors].to_numpy(dtype=float)
+    y = data[target].to_numpy(dtype=float)
+
+    def solve(lo, hi):
+        row_lo = starts[lo]
+        row_hi = starts[hi] if hi < len(starts) else len(x)
+        moments = _group_moments(x[row_lo:row_hi], y[row_lo:row_hi], starts[lo:hi] - row_lo, counts[lo:hi])
+        return _solve_centred(*moments)
+
+    bounds = np.linspace(0, len(starts), max(1, n_jobs) + 1).astype(int)
+    bounds = [(lo, hi) for lo, hi in zip(bounds[:-1], bounds[1:]) if hi > lo]
+    if n_jobs > 1 and len(bounds) > 1:
+        with ThreadPoolExecutor(max_workers=n_jobs) as pool:
+            parts = list(pool.map(lambda b: solve(*b), bounds))
+    else:
+        parts = [solve(*b) for b in bounds]
+    coef, se, r2 = (np.concatenate(a) for a in zip(*parts))
+
+    min_obs = min_obs if min_obs is not None else len(predictors) + 2
+    too_small = counts < min_obs
+    coef[too_small], se[too_small], r2[too_small] = np.nan, np.nan, np.nan
+
+    terms = ["const"] + predictors
+    index = pd.Index(groups, name=group_col)
+    fitted = coef[codes, 0] + np.einsum("ij,ij->i", x, coef[codes, 1:])
+    return {
+        "coef": pd.DataFrame(coef, index=index, columns=terms),
+        "se": pd.DataFrame(se, index=index, columns=terms),
+        "r2": pd.Series(r2, index=index, name="r2"),
+        "n": pd.Series(counts, index=index, name="n"),
+        "fitted": pd.Series(fitted, index=data.index, name="fitted").reindex(df.index.intersection(data.index))
+    }
+
+
+def rolling_regression(df, predictors, target, window, order_col=None, group_col=None):
+    """
+    OLS (with constant) over every trailing window of `window` rows.
+
+    Rows are ordered by order_col (e.g. a date) when given and rolled
+    separately per group_col when given (rows with no group key are
+    dropped). Window sums come from cumulative cross-products, so every
+    window is solved in one batch.
+
+    Returns dict: coef, se (indexed like the used rows of df; NaN until a
+    window is full), r2, and fitted (each window's fit at its last row).
+    """
+    data, predictors, target = _regression_arrays(df, predictors, target, extra=[order_col, group_col])
+    keys = [_normalize_name(c) for c in (group_col, order_col) if c is not None]
+    if group_col is not None:
+        data = data.dropna(subset=[keys[0]])
+    if keys:
+        data = data.sort_values(keys, kind="stable")
+
+    x = data[predictors].to_numpy(dtype=float)
+    y = data[target].to_numpy(dtype=float)
+    # Global shift keeps the cumulative sums well conditioned (OLS is shift-invariant)
+    x0, y0 = x.mean(axis=0), y.mean()
+    xs, ys = x - x0, y - y0
+    p = x.shape[1]
+
+    def window_sums(a):
+        c = np.concatenate([np.zeros((1,) + a.shape[1:]), np.cumsum(a, axis=0)])
+        return c[window:] - c[:-window]
+
+    sx = window_sums(xs)
+    sy = window_sums(ys)
+    sxx = window_sums((xs[:, :, None] * xs[:, None, :]).reshape(len(x), p * p)).reshape(-1, p, p)
+    sxy = window_sums(xs * ys[:, None])
+    syy = window_sums(ys ** 2)
+
+    n = np.full(len(sy), float(window))
+    mx, my = sx / window, sy / window
+    cxx = sxx - window * mx[:, :, None] * mx[:, None, :]
+    cxy = sxy - window * mx * my[:, None]
+    cyy = syy - window * my ** 2
+    # Centred moments are shift-invariant; the means go back to original units
+    coef_w, se_w, r2_w = _solve_centred(n, mx + x0, my + y0, cxx, cxy, cyy)
+
+    # Window ending at row t is valid only if it stays inside one group
+    ends = np.arange(window - 1, len(x))
+    if group_col is not None:
+        g = pd.factorize(data[_normalize_name(group_col)])[0]
+        valid = g[ends] == g[ends - window + 1]
+    else:
+        valid = np.ones(len(ends), dtype=bool)
+
+    terms = ["const"] + predictors
+    coef = np.full((len(x), p + 1), np.nan)
+    se = np.full((len(x), p + 1), np.nan)
+    r2 = np.full(len(x), np.nan)
+    coef[ends[valid]], se[ends[valid]], r2[ends[valid]] = coef_w[valid], se_w[valid], r2_w[valid]
+    fitted = coef[:, 0] + np.einsum("ij,ij->i", x, coef[:, 1:])
+
+    index = data.index
+    return {
+        "coef": pd.DataFrame(coef, index=index, columns=terms),
+        "se": pd.DataFrame(se, index=index, columns=terms),
+        "r2": pd.Series(r2, index=index, name="r2"),
+        "fitted": pd.Series(fitted, index=index, name="fitted")
+    }
+
+# 1c. Out-of-core regression
+class RegressionAccumulator:
+    """
+    Mergeable sufficient statistics for OLS with a constant.
+
+    Keeps n, the means of X and y, and the centred cross-products
+    (X'X, X'y, y'y about the mean). Chunks and partial accumulators from
+    other workers/files combine exactly (Chan's parallel update), and the
+    centred form keeps precision on large, offset data.
+    """
+
+    def __init__(self, predictors, target):
+        self.predictors = [_normalize_name(p) for p in predictors]
+        self.target = _normalize_name(target)
+        p = len(self.predictors)
+        self.n = 0
+        self.mean_x = np.zeros(p)
+        self.mean_y = 0.0
+        self.cxx = np.zeros((p, p))
+        self.cxy = np.zeros(p)
+        self.cyy = 0.0
+
+    def update(self, chunk):
+        """Add a DataFrame chunk (rows with missing values are dropped)."""
+        data, _, _ = _regression_arrays(chunk, self.predictors, self.target)
+        if data.empty:
+            return self
+        x = data[self.predictors].to_numpy(dtype=float)
+        y = data[self.target].to_numpy(dtype=float)
+        other = RegressionAccumulator(self.predictors, self.target)
+        other.n = len(y)
+        other.mean_x, other.mean_y = x.mean(axis=0), y.mean()
+        xc, yc = x - other.mean_x, y - other.mean_y
+        other.cxx, other.cxy, other.cyy = xc.T @ xc, xc.T @ yc, float(yc @ yc)
+        return self.merge(other)
+
+    def merge(self, other):
+        if other.predictors != self.predictors or other.target != self.target:
+            raise ValueError("Cannot merge accumulators for different regressions.")
+        if other.n == 0:
+            return self
+        n = self.n + other.n
+        w = self.n * other.n / n
+        dx, dy = other.mean_x - self.mean_x, other.mean_y - self.mean_y
+        self.cxx = self.cxx + other.cxx + w * np.outer(dx, dx)
+        self.cxy = self.cxy + other.cxy + w * dx * dy
+        self.cyy = self.cyy + other.cyy + w * dy * dy
+        self.mean_x = self.mean_x + dx * other.n / n
+        self.mean_y = self.mean_y + dy * other.n / n
+        self.n = n
+        return self
+
+    def solve(self):
+        """Coefficients, standard errors, t-stats, p-values, R² and n."""
+        coef, se, r2 = _solve_centred(
+            np.array([float(self.n)]), self.mean_x[None, :], np.array([self.mean_y]),
+            self.cxx[None, :, :], self.cxy[None, :], np.array([self.cyy])
+        )
+        terms = ["const"] + self.predictors
+        tvalues = coef[0] / se[0]
+        return {
+            "coef": pd.Series(coef[0], index=terms, name="coef"),
+            "se": pd.Series(se[0], index=terms, name="se"),
+            "t": pd.Series(tvalues, index=terms, name="t"),
+            "p_value": pd.Series(2 * t_dist.sf(np.abs(tvalues), self.n - len(terms)), index=terms, name="p_value"),
+            "r2": float(r2[0]),
+            "n": self.n
+        }
+
+
+def _accumulate_csv(path, predictors, target, chunksize, read_csv_kwargs):
+    wanted = {_normalize_name(c) for c in list(predictors) + [target]}
+    acc = RegressionAccumulator(predictors, target)
+    for chunk in pd.read_csv(path, chunksize=chunksize, usecols=lambda c: _normalize_name(c) in wanted, **read_csv_kwargs):
+        acc.update(chunk)
+    return acc
+
+
+def streaming_regression(source, predictors, target, chunksize=500_000, n_jobs=1, **read_csv_kwargs):
+    """
+    OLS for inputs too large to load: stream CSV chunks into a
+    RegressionAccumulator and solve once at the end.
+
+    source: CSV path, list of CSV paths (n_jobs > 1 reads files in parallel
+            processes and merges the partial results), or an iterable of
+            DataFrame chunks.
+    Only the predictor and target columns are read. Returns the same
+    fields as RegressionAccumulator.solve().
+    """
+    if isinstance(source, str):
+        paths = [source]
+    elif isinstance(source, (list, tuple)) and source and all(isinstance(s, str) for s in source):
+        paths = list(source)
+    else:
+        # chunk iterables are consumed one chunk at a time, never held together
+        total = RegressionAccumulator(predictors, target)
+        for chunk in source:
+            total.update(chunk)
+        return total.solve()
+
+    if n_jobs > 1 and len(paths) > 1:
+        with ProcessPoolExecutor(max_workers=n_jobs) as pool:
+            parts = list(pool.map(_accumulate_csv, paths, [predictors] * len(paths), [target] * len(paths),
+                                  [chunksize] * len(paths), [read_csv_kwargs] * len(paths)))
+    else:
+        parts = [_accumulate_csv(path, predictors, target, chunksize, read_csv_kwargs) for path in paths]
+
+    total = parts[0]
+    for part in parts[1:]:
+        total.merge(part)
+    return total.solve()
+
 # 2. Correlation
 def check_correlation(df, col1, col2):
     df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
@@ -27,19 +323,328 @@ def check_correlation(df, col1, col2):
     mask = x.notna() & y.notna()
     return pearsonr(x[mask], y[mask])
 
+# 2b. All-pairs correlation
+def _numeric_block(df, columns=None):
+    """Numeric matrix + observed mask for the chosen (or all numeric) columns; df is not modified."""
+    if columns is None:
+        data = df.select_dtypes(include="number")
+    else:
+        data = df[list(columns)].apply(pd.to_numeric, errors="coerce")
+    values = data.to_numpy(dtype=float)
+    return list(data.columns), values, ~np.isnan(values)
+
+
+def _correlation_tiles(values, mask, block_size=None):
+    """
+    Yield (i0, j0, r, n) tiles of the pairwise-complete Pearson matrix.
+
+    Each column is centred on its own mean first (for precision), then
+    every pair's sums over rows where BOTH columns are present come out of
+    masked matrix products. block_size bounds the working memory for very
+    wide frames; only tiles on or above the diagonal are produced.
+    No tiles for a frame without rows or columns.
+    """
+    p = values.shape[1]
+    if values.size == 0:
+        return
+    block_size = block_size or p
+    centred = np.where(mask, values - np.nanmean(np.where(mask, values, np.nan), axis=0), 0.0)
+    m = mask.astype(float)
+
+    for i0 in range(0, p, block_size):
+        xa, ma = centred[:, i0:i0 + block_size], m[:, i0:i0 + block_size]
+        for j0 in range(i0, p, block_size):
+            xb, mb = centred[:, j0:j0 + block_size], m[:, j0:j0 + block_size]
+            n = ma.T @ mb
+            with np.errstate(divide="ignore", invalid="ignore"):
+                sa, sb = (xa.T @ mb) / n, (ma.T @ xb) / n
+                cov = xa.T @ xb - n * sa * sb
+                va = (xa ** 2).T @ mb - n * sa ** 2
+                vb = ma.T @ (xb ** 2) - n * sb ** 2
+                r = np.clip(cov / np.sqrt(va * vb), -1.0, 1.0)
+            r[n < 3] = np.nan
+            yield i0, j0, r, n
+
+
+def _correlation_pvalues(r, n):
+    """Two-sided p-values for correlation r on n pairs (t-test, same as pearsonr)."""
+    dof = n - 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = r * np.sqrt(dof / (1.0 - r ** 2))
+    p = 2 * t_dist.sf(np.abs(t), dof)
+    p[np.abs(r) == 1.0] = 0.0
+    return p
+
+
+def _rank_columns(values, mask):
+    return pd.DataFrame(np.where(mask, values, np.nan)).rank(method="average").to_numpy()
+
+
+def _rank_pearson(x, y, keep):
+    """
+    Column-by-column Pearson r of two rank matrices over the rows set in
+    `keep`. Average ranks of k values always sum to k(k+1)/2, so the means
+    are known and only three products are needed.
+    """
+    k = keep.sum(axis=0)
+    x, y = np.where(keep, x, 0.0), np.where(keep, y, 0.0)
+    mean = (k + 1) / 2
+    with np.errstate(divide="ignore", invalid="ignore"):
+        cov = np.einsum("ij,ij->j", x, y) - k * mean ** 2
+        var_x = np.einsum("ij,ij->j", x, x) - k * mean ** 2
+        var_y = np.einsum("ij,ij->j", y, y) - k * mean ** 2
+        r = cov / np.sqrt(var_x * var_y)
+    return np.clip(r, -1.0, 1.0)
+
+
+def _sorted_ties(values):
+    """
+    Per column: rows in value order (NaN last), and for every row the
+    sorted positions [lo, hi) of its tie group.
+    """
+    order = np.argsort(values, axis=0, kind="stable")
+    ordered = np.take_along_axis(values, order, axis=0)
+    n_rows, width = values.shape
+    edge = np.ones((1, width), dtype=bool)
+    first = np.vstack([edge, ordered[1:] != ordered[:-1]])
+    last = np.vstack([first[1:], edge])
+    position = np.arange(n_rows)[:, None]
+    lo = np.maximum.accumulate(np.where(first, position, 0), axis=0)
+    hi = np.minimum.accumulate(np.where(last, position, n_rows - 1)[::-1], axis=0)[::-1] + 1
+    lo_row, hi_row = np.empty_like(lo), np.empty_like(hi)
+    np.put_along_axis(lo_row, order, lo, axis=0)
+    np.put_along_axis(hi_row, order, hi, axis=0)
+    return order, lo_row, hi_row
+
+
+def _ranks_within(order, lo, hi, keep):
+    """
+    Tie-averaged ranks of every column over the rows set in `keep`: a
+    running count of kept rows along the column's value order, read at
+    each row's tie-group bounds. No re-sorting.
+    """
+    kept = np.take_along_axis(keep, order, axis=0)
+    seen = np.vstack([np.zeros((1, kept.shape[1]), dtype=np.int32), np.cumsum(kept, axis=0, dtype=np.int32)])
+    cols = np.arange(kept.shape[1])
+    return (seen[lo, cols] + 1 + seen[hi, cols]) / 2
+
+
+def _fix_spearman_pairs(values, mask, r, n, i0=0, j0=0, ties=None):
+    """
+    Ranks are taken per column, which is exact when both columns are
+    missing on the same rows. Other pairs are re-ranked on their common
+    rows, as spearmanr would: each column is sorted once (`ties`, from
+    _sorted_ties), and its rank within any row subset is a running count
+    over that order, so a tile row's pairs are fixed in one array pass.
+    """
+    order, lo, hi = ties if ties is not None else _sorted_ties(values)
+    rows, cols = r.shape
+    counts = mask.sum(axis=0)
+    partners = np.arange(j0, j0 + cols)
+    for a in range(rows):
+        i = i0 + a
+        fix = (partners > i) & (n[a] >= 3) & ((counts[i] != n[a]) | (counts[partners] != n[a]))
+        if not fix.any():
+            continue
+        js = partners[fix]
+        keep = mask[:, [i]] & mask[:, js]
+        rank_j = _ranks_within(order[:, js], lo[:, js], hi[:, js], keep)
+        seen = np.vstack([np.zeros((1, len(js)), dtype=np.int32),
+                          np.cumsum(keep[order[:, i]], axis=0, dtype=np.int32)])
+        rank_i = (seen[lo[:, i]] + 1 + seen[hi[:, i]]) / 2
+        fixed = _rank_pearson(rank_i, rank_j, keep)
+        r[a, fix] = fixed
+        # same pair seen from the other side, when it falls inside this tile
+        if 0 <= i - j0 < cols:
+            inside = (js >= i0) & (js < i0 + rows)
+            r[js[inside] - i0, i - j0] = fixed[inside]
+
+
+def correlation_matrix(df, columns=None, method="pearson", block_size=None, exact_spearman=True):
+    """
+    Full correlation and p-value matrices in one vectorized pass.
+
+    - columns: columns to use (default: every numeric column)
+    - method: "pearson" or "spearman"
+    - block_size: compute in column blocks for very wide frames
+    - exact_spearman: re-rank pairs whose columns are missing on different
+      rows (matches spearmanr); False keeps per-column ranks, which is
+      faster but approximate for those pairs
+    Missing values are handled pairwise (each pair uses the rows where both
+    columns are present). The caller's DataFrame is not modified.
+
+    Returns (corr, p_values, n_obs) as DataFrames.
+    """
+    names, values, mask = _numeric_block(df, columns)
+    p = len(names)
+    source = _rank_columns(values, mask) if method == "spearman" else values
+
+    ties = _sorted_ties(values) if method == "spearman" and exact_spearman else None
+
+    corr = np.full((p, p), np.nan)
+    n_obs = np.zeros((p, p))
+    for i0, j0, r, n in _correlation_tiles(source, mask, block_size):
+        if ties is not None:
+            _fix_spearman_pairs(values, mask, r, n, i0, j0, ties)
+        rows, cols = r.shape
+        corr[i0:i0 + rows, j0:j0 + cols] = r
+        corr[j0:j0 + cols, i0:i0 + rows] = r.T
+        n_obs[i0:i0 + rows, j0:j0 + cols] = n
+        n_obs[j0:j0 + cols, i0:i0 + rows] = n.T
+
+    diagonal = np.diag_indices(p)
+    corr[diagonal] = np.where(n_obs[diagonal] >= 3, 1.0, np.nan)
+    pvals = _correlation_pvalues(corr, n_obs)
+
+    wrap = lambda a: pd.DataFrame(a, index=names, columns=names)
+    return wrap(corr), wrap(pvals), wrap(n_obs.astype(int))
+
+
+def top_correlations(df, k=20, columns=None, method="pearson", block_size=None, min_obs=3, exact_spearman=True):
+    """
+    Tidy table of the k strongest pairs by |r|: col1, col2, r, p_value, n.
+    With block_size the full matrix is never held; only the running top-k.
+    """
+    names, values, mask = _numeric_block(df, columns)
+    source = _rank_columns(values, mask) if method == "spearman" else values
+    ties = _sorted_ties(values) if method == "spearman" and exact_spearman else None
+
+    best = pd.DataFrame(columns=["i", "j", "r", "n"])
+    for i0, j0, r, n in _correlation_tiles(source, mask, block_size):
+        if ties is not None:
+            _fix_spearman_pairs(values, mask, r, n, i0, j0, ties)
+        a, b = np.nonzero(np.isfinite(r) & (n >= min_obs))
+        keep = (i0 + a) < (j0 + b)  # upper triangle only
+        tile = pd.DataFrame({"i": i0 + a[keep], "j": j0 + b[keep], "r": r[a, b][keep], "n": n[a, b][keep]})
+        best = pd.concat([best, tile], ignore_index=True) if len(best) else tile
+        best = best.loc[best["r"].abs().nlargest(k).index]
+
+    best = best.loc[best["r"].abs().sort_values(ascending=False).index].reset_index(drop=True)
+    return pd.DataFrame({
+        "col1": [names[i] for i in best["i"]],
+        "col2": [names[j] for j in best["j"]],
+        "r": best["r"].to_numpy(dtype=float),
+        "p_value": _correlation_pvalues(best["r"].to_numpy(dtype=float), best["n"].to_numpy(dtype=float)),
+        "n": best["n"].to_numpy(dtype=int)
+    })
+
 # 3. Hypothesis Testing
-def compare_groups(df, group_col, value_col, group1, group2):
+def compare_groups(df, group_col, value_col, group1=None, group2=None, **kwargs):
+    """
+    t-test of value_col between group1 and group2 (scipy ttest_ind result).
+    Leave group1/group2 as None to test every group instead; kwargs then go
+    to compare_all_groups and a tidy DataFrame is returned.
+    """
+    if group1 is None and group2 is None:
+        return compare_all_groups(df, group_col, value_col, **kwargs)
     df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
     group_col, value_col = group_col.lower().replace(" ", "_"), value_col.lower().replace(" ", "_")
     g1 = pd.to_numeric(df[df[group_col] == group1][value_col], errors="coerce").dropna()
     g2 = pd.to_numeric(df[df[group_col] == group2][value_col], errors="coerce").dropna()
     return ttest_ind(g1, g2)
 
+
+# 3b. All-groups comparison
+def _group_stats(df, group_col, value_col):
+    """
+    Count, mean and variance per group in one groupby pass, plus the
+    values of rows that have a group (df is not renamed).
+    """
+    lookup = {_normalize_name(c): c for c in df.columns}
+    values = pd.to_numeric(df[lookup[_normalize_name(value_col)]], errors="coerce")
+    groups = df[lookup[_normalize_name(group_col)]]
+    stats = values.groupby(groups, observed=True, sort=True).agg(["count", "mean", "var"])
+    stats = stats[stats["count"] > 0]
+    return stats, values[groups.notna()].dropna()
+
+
+def _t_from_stats(n1, m1, v1, n2, m2, v2, equal_var):
+    """Vectorized Student/Welch t statistic, degrees of freedom and two-sided p."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if equal_var:
+            dof = n1 + n2 - 2
+            pooled = ((n1 - 1) * v1 + (n2 - 1) * v2) / dof
+            se = np.sqrt(pooled * (1 / n1 + 1 / n2))
+        else:
+            a, b = v1 / n1, v2 / n2
+            se = np.sqrt(a + b)
+            dof = (a + b) ** 2 / (a ** 2 / (n1 - 1) + b ** 2 / (n2 - 1))
+        t = (m1 - m2) / se
+        p = 2 * t_dist.sf(np.abs(t), dof)
+        d = (m1 - m2) / np.sqrt(((n1 - 1) * v1 + (n2 - 1) * v2) / (n1 + n2 - 2))
+    return t, dof, p, d
+
+
+def compare_all_groups(df, group_col, value_col, mode="pairs", equal_var=False, correction="holm", alpha=0.05):
+    """
+    t-tests for every pair of groups (mode="pairs") or each group against
+    all other grouped rows (mode="rest"; rows with no group are left out),
+    from per-group count/mean/variance only.
+
+    - equal_var: False = Welch (default), True = Student
+    - correction: multiple-testing method for statsmodels multipletests
+      ("holm", "bonferroni", "fdr_bh", ...) or None
+    - effect size is Cohen's d with the pooled standard deviation
+    Pairs where either side has fewer than 2 values get NaN statistics and
+    are left out of the correction. The caller's DataFrame is not modified.
+
+    Returns one row per comparison: group1, group2, n1, n2, mean1, mean2,
+    mean_diff, t_stat, dof, p_value, p_adjusted, significant, cohens_d.
+    """
+    if mode not in ("pairs", "rest"):
+        raise ValueError("mode must be 'pairs' or 'rest'")
+
+    stats, values = _group_stats(df, group_col, value_col)
+    n, mean, var = (stats[c].to_numpy(dtype=float) for c in ("count", "mean", "var"))
+
+    if mode == "pairs":
+        i, j = np.triu_indices(len(stats), k=1)
+        labels2 = stats.index.to_numpy()[j]
+        n1, m1, v1, n2, m2, v2 = n[i], mean[i], var[i], n[j], mean[j], var[j]
+    else:
+        i = np.arange(len(stats))
+        labels2 = np.full(len(stats), "rest", dtype=object)
+        total_n, total_mean = float(len(values)), float(values.mean())
+        total_m2 = float(((values - total_mean) ** 2).sum())
+        n1, m1, v1 = n, mean, var
+        n2 = total_n - n
+        with np.errstate(divide="ignore", invalid="ignore"):
+            m2 = (total_n * total_mean - n * mean) / n2
+            # remove each group's share from the total sum of squares (Chan's update in reverse)
+            rest_m2 = total_m2 - np.nan_to_num((n - 1) * var) - n * n2 / total_n * (mean - m2) ** 2
+            v2 = rest_m2 / (n2 - 1)
+
+    t, dof, p, d = _t_from_stats(n1, m1, v1, n2, m2, v2, equal_var)
+
+    p_adj = np.full_like(p, np.nan)
+    valid = np.isfinite(p)
+    if correction and valid.any():
+        p_adj[valid] = multipletests(p[valid], alpha=alpha, method=correction)[1]
+    elif valid.any():
+        p_adj[valid] = p[valid]
+
+    return pd.DataFrame({
+        "group1": stats.index.to_numpy()[i],
+        "group2": labels2,
+        "n1": n1.astype(int),
+        "n2": n2.astype(int),
+        "mean1": m1,
+        "mean2": m2,
+        "mean_diff": m1 - m2,
+        "t_stat": t,
+        "dof": dof,
+        "p_value": p,
+        "p_adjusted": p_adj,
+        "significant": p_adj < alpha,
+        "cohens_d": d
+    })
+
 # 4. Charting
 def plot_sales_by_group(df, group_col, value_col):
+    import matplotlib.pyplot as plt  # only charting needs matplotlib; keeps analysis imports light
     df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
     group_col, value_col = group_col.lower().replace(" ", "_"), value_col.lower().replace(" ", "_")
-    grouped = df.groupby(group_col)[value_col].sum()
+    grouped = df.groupby(group_col, observed=True)[value_col].sum()
     grouped.plot(kind="bar", color="skyblue")
     plt.title(f"Total {value_col.replace('_',' ').title()} by {group_col.title()}")
     plt.ylabel(value_col.replace("_"," ").title())
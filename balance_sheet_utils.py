@@ -10,9 +10,11 @@ Business role:
 - Provide Shareholding Pattern table.
 """
 
+import time
+import numpy as np
 import pandas as pd
 
-def compute_working_capital_accounts(income_df: pd.DataFrame, assumptions: dict) -> pd.DataFrame:
+def compute_working_capital_accounts(income_df: pd.DataFrame, assumptions: dict, entity_col: str = None) -> pd.DataFrame:
     """
     Compute receivables, inventory, payables from % assumptions.
 
@@ -26,9 +28,56 @@ def compute_working_capital_accounts(income_df: pd.DataFrame, assumptions: dict)
     df["Inventory"] = df["COGS"] * assumptions.get("inv_pct_cogs", 0.08)
     df["AccountsPayable"] = df["COGS"] * assumptions.get("ap_pct_cogs", 0.15)
     df["NetWorkingCapital"] = df["AccountsReceivable"] + df["Inventory"] - df["AccountsPayable"]
-    return df[["Year", "AccountsReceivable", "Inventory", "AccountsPayable", "NetWorkingCapital"]]
+    keys = [entity_col, "Year"] if entity_col else ["Year"]
+    return df[keys + ["AccountsReceivable", "Inventory", "AccountsPayable", "NetWorkingCapital"]]
 
-def compute_balance_sheet(income_df: pd.DataFrame, cash_flow_df: pd.DataFrame, assumptions: dict, opening_balances: dict = None) -> pd.DataFrame:
+def _rollforward(opening, flows, groups=None, floor=True):
+    """
+    Vectorized running balance: balance_t = balance_{t-1} + flow_t,
+    optionally floored at zero after every step, as
+    max(0, ...) in a loop would do.
+
+    With C = opening + cumsum(flows), the floored balance is
+    C - min(0, cummin(C)), so no Python loop is needed. When the floor
+    never binds the result is bit-identical to the loop.
+
+    opening: scalar or per-row array (only the first row of each group is used)
+    groups:  optional per-row keys; rows must be in time order within a group
+    """
+    flows = pd.Series(np.asarray(flows, dtype=float))
+    opening = np.broadcast_to(np.asarray(opening, dtype=float), flows.shape)
+
+    if groups is None:
+        first = np.zeros(len(flows), dtype=bool)
+        first[:1] = True
+        running = flows.where(~first, flows + opening).cumsum()
+        if floor:
+            running = running - np.minimum(0.0, running.cummin())
+    else:
+        groups = pd.Series(np.asarray(groups))
+        first = ~groups.duplicated().to_numpy()
+        running = flows.where(~first, flows + opening).groupby(groups, sort=False).cumsum()
+        if floor:
+            running = running - np.minimum(0.0, running.groupby(groups, sort=False).cummin())
+
+    return running.to_numpy()
+
+def _resolve_openings(assumptions: dict, opening_balances, entities=None) -> dict:
+    """
+    Opening balances as scalars, or as per-row arrays when opening_balances
+    is a DataFrame indexed by entity (panel mode).
+    """
+    keys = ["cash_opening", "ppne_opening", "debt_opening", "equity_opening"]
+    if isinstance(opening_balances, pd.DataFrame):
+        table = opening_balances.reindex(pd.unique(entities))
+        return {
+            k: entities.map(table[k]).fillna(assumptions.get(k, 0.0)).to_numpy(dtype=float)
+            if k in table.columns else assumptions.get(k, 0.0)
+            for k in keys
+        }
+    return {k: (opening_balances or {}).get(k, assumptions.get(k, 0.0)) for k in keys}
+
+def compute_balance_sheet(income_df: pd.DataFrame, cash_flow_df: pd.DataFrame, assumptions: dict, opening_balances=None, entity_col: str = None) -> pd.DataFrame:
     """
     Build a simple but complete balance sheet per year.
 
@@ -38,12 +87,56 @@ def compute_balance_sheet(income_df: pd.DataFrame, cash_flow_df: pd.DataFrame, a
       - assumptions:
           ppne_opening, cash_opening, debt_opening, equity_opening
           ar_pct_revenue, inv_pct_cogs, ap_pct_cogs
-      - opening_balances (optional override dict)
+      - opening_balances (optional override dict, or in panel mode a
+        DataFrame indexed by entity with the *_opening columns)
+      - entity_col (optional): panel mode, rolls every entity forward in one call
 
     Returns:
       DataFrame with Assets (Cash, AR, Inventory, PP&E), Liabilities (AP, Debt), Equity (ShareCapital, RetainedEarnings)
     """
-    # Resolve openings
+    keys = [entity_col, "Year"] if entity_col else ["Year"]
+
+    wc = compute_working_capital_accounts(income_df, assumptions, entity_col)
+    df = income_df.merge(cash_flow_df[keys + ["NetChangeInCash", "Capex", "Financing_DebtChange", "Financing_EquityIssue", "Dividends"]], on=keys)
+    df = df.merge(wc, on=keys)
+    if entity_col:
+        df = df.sort_values(keys, kind="stable").reset_index(drop=True)
+
+    groups = df[entity_col] if entity_col else None
+    openings = _resolve_openings(assumptions, opening_balances, groups)
+
+    # Cash accumulates by net change in cash; the other accounts are floored at zero
+    cash = _rollforward(openings["cash_opening"], df["NetChangeInCash"], groups, floor=False)
+    ppne = _rollforward(openings["ppne_opening"], df["Capex"] - df["Depreciation"], groups)
+    debt = _rollforward(openings["debt_opening"], df["Financing_DebtChange"], groups)
+    share_capital = _rollforward(openings["equity_opening"], df["Financing_EquityIssue"], groups)
+    retained_earnings = _rollforward(0.0, df["NetIncome"] - df["Dividends"], groups)
+
+    out = pd.DataFrame({
+        **({entity_col: df[entity_col]} if entity_col else {}),
+        "Year": df["Year"],
+        "Cash": cash,
+        "AccountsReceivable": df["AccountsReceivable"],
+        "Inventory": df["Inventory"],
+        "PP&E": ppne,
+        "TotalAssets": cash + df["AccountsReceivable"].to_numpy() + df["Inventory"].to_numpy() + ppne,
+        "AccountsPayable": df["AccountsPayable"],
+        "Debt": debt,
+        "ShareCapital": share_capital,
+        "RetainedEarnings": retained_earnings,
+    })
+
+    out["TotalLiabilities"] = out["AccountsPayable"] + out["Debt"]
+    out["TotalEquity"] = out["ShareCapital"] + out["RetainedEarnings"]
+    out["AssetsMinusLiabEq"] = out["TotalAssets"] - (out["TotalLiabilities"] + out["TotalEquity"])  # Should be ~0
+
+    return out
+
+def _compute_balance_sheet_iterrows(income_df: pd.DataFrame, cash_flow_df: pd.DataFrame, assumptions: dict, opening_balances: dict = None) -> pd.DataFrame:
+    """
+    Previous row-by-row implementation of compute_balance_sheet.
+    Kept as the reference for benchmark_balance_sheet.
+    """
     cash_open = (opening_balances or {}).get("cash_opening", assumptions.get("cash_opening", 0.0))
     ppne_open = (opening_balances or {}).get("ppne_opening", assumptions.get("ppne_opening", 0.0))
     debt_open = (opening_balances or {}).get("debt_opening", assumptions.get("debt_opening", 0.0))
@@ -53,30 +146,14 @@ def compute_balance_sheet(income_df: pd.DataFrame, cash_flow_df: pd.DataFrame, a
     df = income_df.merge(cash_flow_df[["Year", "NetChangeInCash", "Capex", "Financing_DebtChange", "Financing_EquityIssue", "Dividends"]], on="Year")
     df = df.merge(wc, on="Year")
 
-    # Initialize rolling accounts
-    cash = []
-    ppne = []
-    debt = []
-    share_capital = []
-    retained_earnings = []
-
-    current_cash = cash_open
-    current_ppne = ppne_open
-    current_debt = debt_open
-    current_share_capital = equity_open  # initial paid-in capital
-    current_retained = 0.0
+    cash, ppne, debt, share_capital, retained_earnings = [], [], [], [], []
+    current_cash, current_ppne, current_debt = cash_open, ppne_open, debt_open
+    current_share_capital, current_retained = equity_open, 0.0
 
     for _, row in df.iterrows():
-        # Cash accumulates by net change in cash
         current_cash += row["NetChangeInCash"]
-
-        # PP&E evolves with Capex and Depreciation
         current_ppne = max(0.0, current_ppne + row["Capex"] - row["Depreciation"])
-
-        # Debt evolves by financing flows
         current_debt = max(0.0, current_debt + row["Financing_DebtChange"])
-
-        # Equity: share capital + retained earnings
         current_share_capital = max(0.0, current_share_capital + row["Financing_EquityIssue"])
         current_retained = max(0.0, current_retained + row["NetIncome"] - row["Dividends"])
 
@@ -101,25 +178,79 @@ def compute_balance_sheet(income_df: pd.DataFrame, cash_flow_df: pd.DataFrame, a
 
     out["TotalLiabilities"] = out["AccountsPayable"] + out["Debt"]
     out["TotalEquity"] = out["ShareCapital"] + out["RetainedEarnings"]
-    out["AssetsMinusLiabEq"] = out["TotalAssets"] - (out["TotalLiabilities"] + out["TotalEquity"])  # Should be ~0
+    out["AssetsMinusLiabEq"] = out["TotalAssets"] - (out["TotalLiabilities"] + out["TotalEquity"])
 
     return out
 
-def compute_shareholding_pattern(balance_sheet_df: pd.DataFrame, ownership: dict) -> pd.DataFrame:
+def compute_shareholding_pattern(balance_sheet_df: pd.DataFrame, ownership: dict, entity_col: str = None) -> pd.DataFrame:
     """
     Generate a shareholding table by Year based on ShareCapital and ownership %.
 
     ownership: {"Promoters": 0.55, "Institutions": 0.35, "Public": 0.10}
     """
-    pattern_rows = []
-    for _, row in balance_sheet_df.iterrows():
-        total_equity_value = row["TotalEquity"]
-        year = row["Year"]
-        for holder, pct in ownership.items():
-            pattern_rows.append({
-                "Year": year,
-                "Holder": holder,
-                "OwnershipPct": pct,
-                "EquityAttributed": total_equity_value * pct
-            })
-    return pd.DataFrame(pattern_rows)
+    holders = list(ownership.keys())
+    pcts = np.array(list(ownership.values()), dtype=float)
+    n, k = len(balance_sheet_df), len(holders)
+
+    # Carry panel/scenario keys along with Year when present
+    keys = [c for c in ("Scenario", entity_col) if c in balance_sheet_df.columns] + ["Year"]
+    out = pd.DataFrame({c: np.repeat(balance_sheet_df[c].to_numpy(), k) for c in keys})
+    out["Holder"] = np.tile(holders, n)
+    out["OwnershipPct"] = np.tile(pcts, n)
+    out["EquityAttributed"] = np.repeat(balance_sheet_df["TotalEquity"].to_numpy(dtype=float), k) * out["OwnershipPct"].to_numpy()
+    return out
+
+def _synthetic_statements(n_years: int, n_entities: int = 1, seed: int = 0):
+    """Random income / cash flow frames (Entity, Year, ...) for benchmarking."""
+    rng = np.random.default_rng(seed)
+    n = n_years * n_entities
+    income_df = pd.DataFrame({
+        "Entity": np.repeat(np.arange(n_entities), n_years),
+        "Year": np.tile(np.arange(2025, 2025 + n_years), n_entities),
+        "Revenue": rng.uniform(5e5, 2e6, n),
+    })
+    income_df["COGS"] = income_df["Revenue"] * 0.6
+    income_df["Depreciation"] = income_df["Revenue"] * 0.04
+    income_df["EBIT"] = income_df["Revenue"] * 0.16
+    income_df["NetIncome"] = income_df["EBIT"] * 0.7
+    cash_flow_df = pd.DataFrame({
+        "Entity": income_df["Entity"],
+        "Year": income_df["Year"],
+        "NetChangeInCash": rng.normal(0, 5e4, n),
+        "Capex": -income_df["Revenue"] * 0.05,
+        "Financing_DebtChange": rng.normal(0, 2e4, n),
+        "Financing_EquityIssue": rng.normal(0, 1e4, n),
+        "Dividends": -income_df["NetIncome"] * 0.3,
+    })
+    return income_df, cash_flow_df
+
+def benchmark_balance_sheet(n_years: int = 2_000, n_entities: int = 500, assumptions: dict = None) -> pd.DataFrame:
+    """
+    Time the iterrows reference against the vectorized roll-forward on one
+    long horizon, and the panel mode against looping entity by entity.
+    """
+    assumptions = assumptions or {"ppne_opening": 5e5, "cash_opening": 1e5, "debt_opening": 2e5, "equity_opening": 3e5}
+    rows = []
+
+    income_df, cash_flow_df = _synthetic_statements(n_years)
+    for name, fn in [("iterrows", _compute_balance_sheet_iterrows), ("vectorized", compute_balance_sheet)]:
+        start = time.perf_counter()
+        fn(income_df.drop(columns="Entity"), cash_flow_df.drop(columns="Entity"), assumptions)
+        rows.append({"Case": f"single entity x {n_years} years", "Method": name, "Seconds": time.perf_counter() - start})
+
+    income_df, cash_flow_df = _synthetic_statements(20, n_entities)
+    start = time.perf_counter()
+    for entity, inc in income_df.groupby("Entity"):
+        cf = cash_flow_df[cash_flow_df["Entity"] == entity]
+        _compute_balance_sheet_iterrows(inc.drop(columns="Entity"), cf.drop(columns="Entity"), assumptions)
+    rows.append({"Case": f"{n_entities} entities x 20 years", "Method": "iterrows per entity", "Seconds": time.perf_counter() - start})
+    start = time.perf_counter()
+    compute_balance_sheet(income_df, cash_flow_df, assumptions, entity_col="Entity")
+    rows.append({"Case": f"{n_entities} entities x 20 years", "Method": "panel", "Seconds": time.perf_counter() - start})
+
+    out = pd.DataFrame(rows)
+    out["Speedup"] = out.groupby("Case")["Seconds"].transform("max") / out["Seconds"]
+    return out
+
+if __name__ == "__main__":
+    print(benchmark_balance_sheet().to_string(index=False))
@@ -0,0 +1,152 @@
+# batch_runner.py
+"""
+Non-interactive batch mode for task_runner.
+
+Business role:
+- Describe many runs in one job-spec file (JSON or TOML) instead of
+  answering prompts.
+- Execute the jobs across a process pool so a batch box uses all cores.
+- Report per-job status, timing and output path (model jobs are saved
+  as an Excel workbook).
+
+Job spec (JSON):
+    {
+      "defaults": {"archive": false},
+      "jobs": [
+        {"name": "stores-clean", "task": "clean", "filepath": "stores.csv"},
+        {"name": "ads-scenario", "task": "scenario", "filepath": "ads.csv",
+         "predictors": ["tv", "radio"], "target": "sales"},
+        {"name": "ab-test", "task": "comparison", "filepath": "ab.csv",
+         "group_col": "campaign", "metric": "revenue", "group_a": "A", "group_b": "B"}
+      ]
+    }
+TOML uses the same keys ([defaults] and [[jobs]] tables).
+"""
+
+import os
+import sys
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+JOB_KEYS = {
+    "task", "filepath", "domain", "assumptions", "opening_balances", "ownership",
+    "predictors", "target", "group_col", "metric", "group_a", "group_b", "mode",
+    "ticker", "forecast", "archive", "trace", "profile", "compact"
+}
+
+
+def load_job_spec(spec) -> list:
+    """
+    Read a job spec (path to .json/.toml, dict, or list of jobs) and return
+    the job list with defaults applied. Unknown keys or tasks raise ValueError.
+    """
+    from task_runner import TASK_REGISTRY
+
+    if isinstance(spec, str):
+        if spec.endswith(".toml"):
+            import tomllib
+            with open(spec, "rb") as fh:
+                spec = tomllib.load(fh)
+        else:
+            with open(spec, encoding="utf-8") as fh:
+                spec = json.load(fh)
+    if isinstance(spec, list):
+        spec = {"jobs": spec}
+
+    defaults = spec.get("defaults", {})
+    jobs = []
+    for i, job in enumerate(spec.get("jobs", [])):
+        job = {**defaults, **job}
+        job.setdefault("name", f"job_{i + 1}")
+        unknown = set(job) - JOB_KEYS - {"name"}
+        if unknown:
+            raise ValueError(f"Job '{job['name']}' has unknown keys: {sorted(unknown)}")
+        if "task" not in job:
+            raise ValueError(f"Job '{job['name']}' is missing 'task'")
+        if str(job["task"]).strip().lower() not in TASK_REGISTRY:
+            raise ValueError(f"Job '{job['name']}' has unknown task '{job['task']}'. Choose: {', '.join(TASK_REGISTRY)}.")
+        jobs.append(job)
+    return jobs
+
+
+def _save_model(results: dict, filepath: str = None) -> str:
+    """Save run_forecast results next to the other outputs; return the path."""
+    import output_utils
+    from excel_export_utils import save_model_workbook
+
+    input_name = os.path.splitext(os.path.basename(filepath))[0] if filepath else "latest"
+    path = os.path.join(output_utils.OUTPUT_FOLDER, f"{input_name}_model_output.xlsx")
+    save_model_workbook(results, path)
+    print(f"✅ Saved model workbook: {os.path.basename(path)}")
+    return path
+
+
+def _run_job(job: dict) -> dict:
+    """
+    Worker: run one job via run_task without prompts and time it.
+    Model results are saved as an Excel workbook, since the worker process
+    (and the returned dict with it) goes away when the batch ends.
+    """
+    from task_runner import run_task
+
+    params = {k: v for k, v in job.items() if k != "name"}
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        result = run_task(interactive=False, **params)
+        if isinstance(result, dict):
+            result = _save_model(result, job.get("filepath"))
+        status, error = "done", None
+    except Exception as e:
+        result, status, error = None, "failed", f"{type(e).__name__}: {e}"
+    return {
+        "name": job["name"],
+        "task": job["task"],
+        "filepath": job.get("filepath"),
+        "status": status,
+        "error": error,
+        "output": result,
+        "wall_seconds": round(time.perf_counter() - wall_start, 3),
+        "cpu_seconds": round(time.process_time() - cpu_start, 3),
+        "pid": os.getpid()
+    }
+
+
+def run_jobs(spec, max_workers: int = None, report_path: str = None) -> pd.DataFrame:
+    """
+    Run every job in `spec` across a process pool (default: all cores).
+
+    Returns one status row per job (status, error, output path, wall/CPU
+    seconds, worker pid), in spec order; optionally also writes it to
+    report_path (.csv or .json).
+    """
+    jobs = load_job_spec(spec)
+    max_workers = max_workers or os.cpu_count()
+    rows = [None] * len(jobs)
+
+    with ProcessPoolExecutor(max_workers=max_workers) as pool:
+        futures = {pool.submit(_run_job, job): i for i, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            row = future.result()
+            mark = "✅" if row["status"] == "done" else "❌"
+            print(f"{mark} {row['name']} ({row['task']}) — {row['wall_seconds']}s" + (f" — {row['error']}" if row["error"] else ""))
+            rows[futures[future]] = row
+
+    report = pd.DataFrame(rows)
+    if report_path:
+        if report_path.endswith(".json"):
+            report.to_json(report_path, orient="records", indent=1)
+        else:
+            report.to_csv(report_path, index=False)
+    return report
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        print("Usage: python batch_runner.py jobs.json [max_workers] [report.csv]")
+        sys.exit(1)
+    workers = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    report = run_jobs(sys.argv[1], max_workers=workers, report_path=sys.argv[3] if len(sys.argv) > 3 else None)
+    print(report.to_string(index=False))
@@ -0,0 +1,290 @@
+# benchmark_utils.py
+"""
+Benchmark suite for the analysis and model utilities.
+
+Business role:
+- Back the "faster workflows" claims with numbers: time every core step
+  (cleaning, regression, correlation, group tests, forecast, cash flow,
+  balance sheet, shareholding, saving) on synthetic data at several scales.
+- Write results to JSON and compare them with a stored baseline, so a
+  slowdown is caught before it reaches the nightly run.
+
+Usage:
+    python benchmark_utils.py --scales small medium --baseline benchmarks/baseline.json
+    python benchmark_utils.py --scales small medium --baseline benchmarks/baseline.json --update-baseline
+    python benchmark_utils.py --imports            # start-up time of task_runner per task
+Exit code is 1 when any case is slower than baseline by more than --tolerance.
+"""
+
+import os
+import sys
+import json
+import time
+import shutil
+import subprocess
+import argparse
+import platform
+import tempfile
+import contextlib
+from io import StringIO
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from primary_clean_utils import clean_dataframe, _synthetic_messy_frame
+from analysis_utils import prepare_regression, check_correlation, compare_groups
+from forecast_utils import financial_forecast, financial_forecast_batch, FORECAST_ASSUMPTIONS, DEFAULT_ASSUMPTIONS
+from cashflow_utils import compute_cash_flows
+from balance_sheet_utils import (
+    compute_working_capital_accounts, compute_balance_sheet, compute_shareholding_pattern, _synthetic_statements
+)
+import output_utils
+
+# rows: data-frame cases; scenarios: forecast cases
+SCALES = {
+    "small": {"rows": 1_000, "scenarios": 1},
+    "medium": {"rows": 100_000, "scenarios": 1_000},
+    "large": {"rows": 1_000_000, "scenarios": 10_000},
+    "xlarge": {"rows": 10_000_000, "scenarios": 100_000}
+}
+
+MESSY_COLUMNS = 8
+SCALAR_FORECAST_CAP = 100  # financial_forecast is timed over at most this many one-scenario calls
+OWNERSHIP = {"Promoters": 0.55, "Institutions": 0.35, "Public": 0.10}
+OPENING = {"ppne_opening": 5e5, "cash_opening": 1e5, "debt_opening": 2e5, "equity_opening": 3e5}
+
+
+# -------------------------
+# Synthetic data
+# -------------------------
+def synthetic_sales_frame(n_rows: int, n_groups: int = 8, seed: int = 0) -> pd.DataFrame:
+    """Marketing-style frame: campaign groups, spend drivers and a noisy sales target."""
+    rng = np.random.default_rng(seed)
+    groups = np.array([chr(ord("A") + i) for i in range(n_groups)], dtype=object)
+    df = pd.DataFrame({
+        "Campaign": groups[rng.integers(0, n_groups, n_rows)],
+        "TV": rng.uniform(0, 300, n_rows),
+        "Radio": rng.uniform(0, 50, n_rows),
+        "Social": rng.uniform(0, 100, n_rows)
+    })
+    df["Sales"] = 3 + 0.05 * df["TV"] + 0.2 * df["Radio"] + 0.01 * df["Social"] + rng.normal(0, 2, n_rows)
+    return df
+
+
+def synthetic_assumptions(n_scenarios: int, seed: int = 0) -> dict:
+    """Random but sensible forecast assumptions, one value per scenario."""
+    rng = np.random.default_rng(seed)
+    spread = {"growth_rate": 0.05, "cogs_pct": 0.05, "opex_pct": 0.03, "tax_rate": 0.02, "capex_pct": 0.01,
+              "depr_pct": 0.01, "wc_pct": 0.02, "discount_rate": 0.02, "terminal_growth": 0.005}
+    return {k: DEFAULT_ASSUMPTIONS[k] + rng.uniform(-spread[k], spread[k], n_scenarios) for k in FORECAST_ASSUMPTIONS}
+
+
+def _statements(n_rows: int):
+    """Single-entity income / cash flow / working-capital frames with n_rows years."""
+    income_df, cash_flow_df = _synthetic_statements(n_rows)
+    income_df, cash_flow_df = income_df.drop(columns="Entity"), cash_flow_df.drop(columns="Entity")
+    wc_df = compute_working_capital_accounts(income_df, {})
+    return income_df, cash_flow_df, wc_df
+
+
+# -------------------------
+# Cases: name -> (dimension, setup(size) -> state, run(state), size cap)
+# -------------------------
+def _save_case(df):
+    folder = tempfile.mkdtemp(prefix="bench_output_")
+    return {"df": df, "folder": folder}
+
+
+def _run_save(state):
+    previous = output_utils.OUTPUT_FOLDER
+    output_utils.OUTPUT_FOLDER = state["folder"]
+    try:
+        output_utils.save_output(state["df"], "benchmark.csv", "benchmark", archive=False, interactive=False, background=False)
+    finally:
+        output_utils.OUTPUT_FOLDER = previous
+
+
+CASES = {
+    "clean_dataframe": ("rows",
+                        lambda n: _synthetic_messy_frame(n, MESSY_COLUMNS),
+                        lambda df: clean_dataframe(df.copy()), None),
+    "prepare_regression": ("rows",
+                           synthetic_sales_frame,
+                           lambda df: prepare_regression(df.copy(), ["TV", "Radio", "Social"], "Sales"), None),
+    "check_correlation": ("rows",
+                          synthetic_sales_frame,
+                          lambda df: check_correlation(df.copy(), "TV", "Sales"), None),
+    "compare_groups": ("rows",
+                       synthetic_sales_frame,
+                       lambda df: compare_groups(df.copy(), "Campaign", "Sales", "A", "B"), None),
+    "financial_forecast": ("scenarios",
+                           synthetic_assumptions,
+                           lambda a: [financial_forecast(**{k: v[i] for k, v in a.items()})
+                                      for i in range(len(a["growth_rate"]))],
+                           SCALAR_FORECAST_CAP),
+    "financial_forecast_batch": ("scenarios",
+                                 synthetic_assumptions,
+                                 lambda a: financial_forecast_batch(a, return_table=True), None),
+    "compute_cash_flows": ("rows",
+                           _statements,
+                           lambda s: compute_cash_flows(s[0], {"dividends_pct_net_income": 0.3}, s[2]), None),
+    "compute_balance_sheet": ("rows",
+                              _statements,
+                              lambda s: compute_balance_sheet(s[0], s[1], OPENING), None),
+    "compute_shareholding_pattern": ("rows",
+                                     lambda n: compute_balance_sheet(*_statements(n)[:2], OPENING),
+                                     lambda bs: compute_shareholding_pattern(bs, OWNERSHIP), None),
+    "save_output": ("rows",
+                    lambda n: _save_case(synthetic_sales_frame(n)),
+                    _run_save, None)
+}
+
+
+def _time_case(run, state, repeat: int) -> dict:
+    """Best and median wall seconds over `repeat` runs after one warm-up (output printing suppressed)."""
+    timings, cpu = [], []
+    with contextlib.redirect_stdout(StringIO()):
+        run(state)
+    for _ in range(repeat):
+        with contextlib.redirect_stdout(StringIO()):
+            wall_start, cpu_start = time.perf_counter(), time.process_time()
+            run(state)
+            timings.append(time.perf_counter() - wall_start)
+            cpu.append(time.process_time() - cpu_start)
+    return {"seconds": min(timings), "median_seconds": float(np.median(timings)), "cpu_seconds": min(cpu)}
+
+
+def benchmark_imports(tasks=None, repeat: int = 5) -> pd.DataFrame:
+    """
+    Start-up cost of each task: a fresh interpreter imports task_runner and
+    the modules the task declares (task_runner.import_task). One row per
+    task with seconds (best of `repeat`) and seconds_over_python, the same
+    minus a bare `python -c pass` start.
+    """
+    import task_runner
+    tasks = list(tasks or task_runner.TASK_REGISTRY)
+    here = os.path.dirname(os.path.abspath(__file__))
+
+    def _best(code):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            subprocess.run([sys.executable, "-c", code], cwd=here, check=True)
+            timings.append(time.perf_counter() - start)
+        return min(timings), float(np.median(timings))
+
+    bare, _ = _best("pass")
+    rows = []
+    for task in tasks:
+        seconds, median = _best(f"import task_runner; task_runner.import_task({task!r})")
+        rows.append({"case": f"import:{task}", "scale": "startup", "dimension": "process", "size": 1,
+                     "seconds": seconds, "median_seconds": median, "seconds_over_python": seconds - bare})
+        print(f"⏱️ {'import:' + task:<30} {seconds:.3f}s ({seconds - bare:.3f}s over bare python)")
+    return pd.DataFrame(rows)
+
+
+def _environment() -> dict:
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__
+    }
+
+
+def compare_to_baseline(results: pd.DataFrame, baseline_path: str, tolerance: float = 0.25,
+                        min_delta: float = 0.005) -> pd.DataFrame:
+    """
+    Add baseline_seconds, ratio and status (ok / regression / improved / new)
+    by (case, scale). A case is a regression when it is more than
+    `tolerance` (e.g. 0.25 = 25%) AND more than min_delta seconds slower
+    than the baseline — tiny cases are too noisy to judge on ratio alone.
+    """
+    with open(baseline_path, encoding="utf-8") as fh:
+        baseline = pd.DataFrame(json.load(fh)["results"])[["case", "scale", "seconds"]]
+    out = results.merge(baseline.rename(columns={"seconds": "baseline_seconds"}), on=["case", "scale"], how="left")
+    out["ratio"] = out["seconds"] / out["baseline_seconds"]
+    out["status"] = np.select(
+        [out["baseline_seconds"].isna(),
+         (out["ratio"] > 1 + tolerance) & (out["seconds"] - out["baseline_seconds"] > min_delta),
+         (out["ratio"] < 1 / (1 + tolerance)) & (out["baseline_seconds"] - out["seconds"] > min_delta)],
+        ["new", "regression", "improved"],
+        default="ok"
+    )
+    return out
+
+
+def run_benchmarks(scales=("small", "medium"), cases=None, repeat: int = 3, output_path: str = None,
+                   baseline_path: str = None, tolerance: float = 0.25, update_baseline: bool = False,
+                   min_delta: float = 0.005, imports: bool = False) -> pd.DataFrame:
+    """
+    Time every case at every scale and return one row per (case, scale):
+    size, seconds (best of `repeat`), median_seconds, cpu_seconds and
+    throughput (rows or scenarios per second).
+
+    output_path:     write {"environment": ..., "results": [...]} as JSON
+    baseline_path:   compare against this file (see compare_to_baseline)
+    update_baseline: write these results to baseline_path instead of comparing
+    tolerance / min_delta: regression thresholds (see compare_to_baseline)
+    imports:         also time task start-up (see benchmark_imports)
+    """
+    cases = cases or list(CASES)
+    unknown = set(cases) - set(CASES)
+    if unknown:
+        raise ValueError(f"Unknown benchmark cases {sorted(unknown)}. Choose from {list(CASES)}")
+
+    rows = []
+    for scale in scales:
+        for name in cases:
+            dimension, setup, run, cap = CASES[name]
+            size = SCALES[scale][dimension] if cap is None else min(cap, SCALES[scale][dimension])
+            state = setup(size)
+            timing = _time_case(run, state, repeat)
+            if isinstance(state, dict) and "folder" in state:
+                shutil.rmtree(state["folder"], ignore_errors=True)
+            rows.append({"case": name, "scale": scale, "dimension": dimension, "size": size, **timing,
+                         "throughput": size / timing["seconds"] if timing["seconds"] else np.nan})
+            print(f"⏱️ {name:<30} {scale:<7} {size:>11,} {dimension:<9} {timing['seconds']:.4f}s")
+
+    results = pd.DataFrame(rows)
+    if imports:
+        results = pd.concat([results, benchmark_imports(repeat=max(repeat, 3))], ignore_index=True)
+    payload = {"environment": _environment(), "results": results.to_dict(orient="records")}
+
+    if baseline_path and update_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=1)
+        print(f"✅ Baseline updated: {baseline_path}")
+    elif baseline_path and os.path.exists(baseline_path):
+        results = compare_to_baseline(results, baseline_path, tolerance, min_delta)
+        payload["results"] = results.to_dict(orient="records")
+        for row in results[results["status"] == "regression"].itertuples():
+            print(f"❌ Regression: {row.case} ({row.scale}) {row.seconds:.4f}s vs baseline {row.baseline_seconds:.4f}s")
+
+    if output_path:
+        with open(output_path, "w", encoding="utf-8") as fh:
+            json.dump(payload, fh, indent=1, default=str)
+        print(f"✅ Results saved: {output_path}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the analysis and model utilities.")
+    parser.add_argument("--scales", nargs="+", default=["small", "medium"], choices=list(SCALES))
+    parser.add_argument("--cases", nargs="+", default=None, choices=list(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", default=None)
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--min-delta", type=float, default=0.005)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument("--imports", action="store_true", help="also time task_runner start-up per task")
+    args = parser.parse_args()
+
+    results = run_benchmarks(args.scales, args.cases, args.repeat, args.output,
+                             args.baseline, args.tolerance, args.update_baseline, args.min_delta, args.imports)
+    sys.exit(1 if "status" in results and (results["status"] == "regression").any() else 0)
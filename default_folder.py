@@ -1,9 +1,19 @@
+import pandas as pd
+from input_cache_utils import read_cached
 
 DEFAULT_FOLDER = r"C:\Users\Dell\Documents\Data Analysis Input"
 
-def load_file(filepath):
+def read_source(filepath):
+    return pd.read_excel(filepath) if filepath.endswith(".xlsx") else pd.read_csv(filepath)
+
+def resolve_path(filepath):
     # If user gives only file name → attach default folder
     if "\\" not in filepath and "/" not in filepath:
         filepath = DEFAULT_FOLDER + "\\" + filepath
+    return filepath
 
-    return pd.read_excel(filepath) if filepath.endswith(".xlsx") else pd.read_csv(filepath)
+def load_file(filepath, cache=True, clean=False):
+    filepath = resolve_path(filepath)
+
+    # Parsed frames are cached in columnar form (see input_cache_utils)
+    return read_cached(filepath, read_source, clean=clean) if cache else read_source(filepath)
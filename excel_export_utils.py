@@ -0,0 +1,196 @@
+# excel_export_utils.py
+"""
+Streaming Excel export for model and KPI outputs.
+
+Business role:
+- Write many statements / scenarios into ONE workbook, one sheet each.
+- Rows are streamed with openpyxl's write-only mode, so memory stays flat
+  however many scenarios are exported.
+- Columns are pre-sized and number-formatted once per column (one styled
+  cell per column is reused for every row) instead of styling cell by cell.
+"""
+
+import os
+import threading
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from openpyxl.utils import get_column_letter
+
+NUMBER_FORMATS = {
+    "float": "#,##0.00",
+    "int": "#,##0",
+    "datetime": "yyyy-mm-dd"
+}
+
+STATEMENT_SHEETS = {
+    "income_statement": "Income",
+    "cash_flow": "Cash Flow",
+    "balance_sheet": "Balance Sheet",
+    "shareholding": "Shareholding"
+}
+
+MAX_WIDTH = 40
+BLOCK_ROWS = 10_000
+
+
+def _column_format(series: pd.Series, name, number_formats: dict):
+    if name in number_formats:
+        return number_formats[name]
+    if str(name).strip().lower() in ("year", "scenario"):
+        return "0"
+    if pd.api.types.is_bool_dtype(series):
+        return None
+    if pd.api.types.is_integer_dtype(series):
+        return NUMBER_FORMATS["int"]
+    if pd.api.types.is_float_dtype(series):
+        return NUMBER_FORMATS["float"]
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return NUMBER_FORMATS["datetime"]
+    return None
+
+
+def _column_width(series: pd.Series, name, sample_rows: int) -> float:
+    """Header length vs. the longest formatted value in the first sample_rows rows."""
+    sample = series.iloc[:sample_rows]
+    if pd.api.types.is_float_dtype(sample):
+        longest = len(f"{sample.abs().max():,.2f}") + 1 if sample.notna().any() else 0
+    else:
+        longest = int(sample.astype(str).str.len().max()) if len(sample) else 0
+    return min(MAX_WIDTH, max(len(str(name)), longest) + 2)
+
+
+def _frame_layout(df: pd.DataFrame, number_formats: dict, sample_rows: int) -> dict:
+    """Column arrays, widths and number formats, worked out once per frame."""
+    columns = list(df.columns)
+    return {
+        "columns": columns,
+        # datetimes as Timestamp objects (numpy would hand back raw integers)
+        "arrays": [df[c].astype(object).to_numpy() if pd.api.types.is_datetime64_any_dtype(df[c]) else df[c].to_numpy()
+                   for c in columns],
+        "widths": [_column_width(df[c], c, sample_rows) for c in columns],
+        "formats": [_column_format(df[c], c, number_formats) for c in columns],
+        "rows": len(df)
+    }
+
+
+def _sheet_title(name, used: set) -> str:
+    """Excel-safe sheet title (<= 31 chars, no []:*?/\\), unique within the workbook."""
+    title = "".join("_" if ch in "[]:*?/\\" else ch for ch in str(name))[:31] or "Sheet"
+    base, i = title, 1
+    while title.lower() in used:
+        i += 1
+        suffix = f" ({i})"
+        title = base[:31 - len(suffix)] + suffix
+    used.add(title.lower())
+    return title
+
+
+def _write_sheet(wb, title, layout: dict, positions=None):
+    """Stream one sheet; positions selects a subset of the layout's rows."""
+    ws = wb.create_sheet(title)
+
+    # widths must be set before the first row in write-only mode
+    for i, width in enumerate(layout["widths"], start=1):
+        ws.column_dimensions[get_column_letter(i)].width = width
+    ws.freeze_panes = "A2"
+
+    bold = Font(bold=True)
+    header = []
+    for col in layout["columns"]:
+        cell = WriteOnlyCell(ws, value=str(col))
+        cell.font = bold
+        header.append(cell)
+    ws.append(header)
+
+    # one styled cell per column, reused for every row: the style is written
+    # as a shared index, the row is serialised on append
+    cells = []
+    for fmt in layout["formats"]:
+        cell = WriteOnlyCell(ws)
+        if fmt:
+            cell.number_format = fmt
+        cells.append(cell)
+
+    n = layout["rows"] if positions is None else len(positions)
+    for start in range(0, n, BLOCK_ROWS):
+        stop = min(n, start + BLOCK_ROWS)
+        index = slice(start, stop) if positions is None else positions[start:stop]
+        block = [arr[index].tolist() for arr in layout["arrays"]]
+        for row in zip(*block):
+            for cell, value in zip(cells, row):
+                cell.value = None if value != value or value is pd.NaT else value  # NaN / NaT -> blank
+            ws.append(cells)
+
+
+def _save(wb, path: str, sheet_count: int) -> str:
+    if not sheet_count:
+        wb.create_sheet("Sheet")
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    # unique per thread: the warm service can export from several workers
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    wb.save(tmp)
+    os.replace(tmp, path)
+    print(f"✅ Workbook saved: {path} ({sheet_count} sheets)")
+    return path
+
+
+def save_workbook(sheets, path: str, number_formats: dict = None, sample_rows: int = 1000) -> str:
+    """
+    Stream several DataFrames into one .xlsx, one sheet each.
+
+    sheets:         {sheet name: DataFrame} or an iterable of (name, DataFrame)
+                    pairs — a generator keeps only one sheet's frame alive
+    number_formats: {column name: Excel format} overrides; otherwise floats
+                    get "#,##0.00", ints "#,##0", dates "yyyy-mm-dd"
+    sample_rows:    rows looked at when sizing each column
+
+    Written to a temp file and renamed. Returns the workbook path.
+    """
+    number_formats = number_formats or {}
+    items = sheets.items() if isinstance(sheets, dict) else sheets
+
+    wb = Workbook(write_only=True)
+    used = set()
+    for name, df in items:
+        _write_sheet(wb, _sheet_title(name, used), _frame_layout(df, number_formats, sample_rows))
+    return _save(wb, path, len(used))
+
+
+def save_model_workbook(results: dict, path: str, split_scenarios: bool = True,
+                        number_formats: dict = None, sample_rows: int = 1000) -> str:
+    """
+    Export run_forecast results (an EV/NPV summary, income statement, cash
+    flow, balance sheet and shareholding) to one streamed workbook.
+
+    split_scenarios: one sheet per statement per scenario; False keeps each
+                     statement as one long sheet with a Scenario column.
+    Layout (widths, formats) is worked out once per statement and shared by
+    its scenario sheets; no per-scenario frames are built.
+    """
+    number_formats = number_formats or {}
+    wb = Workbook(write_only=True)
+    used = set()
+
+    summary = {k: np.atleast_1d(np.asarray(results[k], dtype=float))
+               for k in ("enterprise_value", "net_present_value") if k in results}
+    if summary:
+        summary_df = pd.DataFrame(summary)
+        if len(summary_df) > 1:
+            summary_df.insert(0, "Scenario", np.arange(len(summary_df)))
+        _write_sheet(wb, _sheet_title("Summary", used), _frame_layout(summary_df, number_formats, sample_rows))
+
+    for key, label in STATEMENT_SHEETS.items():
+        df = results.get(key)
+        if df is None:
+            continue
+        if not (split_scenarios and "Scenario" in df.columns):
+            _write_sheet(wb, _sheet_title(label, used), _frame_layout(df, number_formats, sample_rows))
+            continue
+        layout = _frame_layout(df.drop(columns="Scenario"), number_formats, sample_rows)
+        for scenario, positions in df.groupby("Scenario", sort=True).indices.items():
+            _write_sheet(wb, _sheet_title(f"{label} - S{scenario}", used), layout, positions)
+
+    return _save(wb, path, len(used))
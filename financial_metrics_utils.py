@@ -1,4 +1,8 @@
-import yfinance as yf
+import pandas as pd
+from market_data_utils import CachedTicker, fetch_many
+
+ASSUMPTION_COLUMNS = ["Ticker", "Growth Rate", "COGS %", "Opex %", "Tax Rate", "Capex %", "Depreciation %",
+                      "Working Capital %", "Discount Rate (CAPM)"]
 
 def safe_get(df, keys):
     """Try multiple possible row names, return first match or None."""
@@ -8,13 +12,16 @@ def safe_get(df, keys):
     return None
 
 def get_assumptions(ticker_symbol, rf=0.07, rm=0.12):
-    t = yf.Ticker(ticker_symbol)
+    t = CachedTicker(ticker_symbol)
 
     fin = t.financials
     cf = t.cashflow
     bs = t.balance_sheet
 
     revenue = safe_get(fin, ["Total Revenue"])
+    if revenue is None:
+        # missing data is not a transient error: fetch_many does not retry ValueError
+        raise ValueError(f"No 'Total Revenue' in the financials for {ticker_symbol}")
 
     # Growth rate
     growth_rate = revenue.pct_change(fill_method=None).dropna().mean()
@@ -63,6 +70,19 @@ def get_assumptions(ticker_symbol, rf=0.07, rm=0.12):
         "Discount Rate (CAPM)": round(discount_rate*100, 2)
     }
 
+def get_assumptions_batch(tickers, rf=0.07, rm=0.12, max_workers=8, rate_limit=None, retries=2, backoff=0.5):
+    """
+    Concurrent get_assumptions for a watchlist.
+    Returns one DataFrame, a row per ticker; failures keep their row with
+    the message in the Error column instead of aborting the batch. The
+    columns are always ASSUMPTION_COLUMNS + Error, even for no tickers.
+    """
+    tickers = list(tickers)
+    results = fetch_many(lambda t: get_assumptions(t, rf=rf, rm=rm), tickers,
+                         max_workers=max_workers, rate_limit=rate_limit, retries=retries, backoff=backoff) if tickers else []
+    return pd.DataFrame([{"Ticker": t, **(res or {}), "Error": err} for t, res, err in results],
+                        columns=ASSUMPTION_COLUMNS + ["Error"])
+
 if __name__ == "__main__":
     # Ask user for ticker when running script directly
     ticker = input("Enter ticker symbol (e.g., WMT, MSFT, JPM, TCS.NS): ").strip()
@@ -1,5 +1,8 @@
+import numpy as np
 import pandas as pd
-import yfinance as yf
+from market_data_utils import CachedTicker
+
+from balance_sheet_utils import compute_shareholding_pattern
 
 def safe_get(df, keys):
     """Try multiple possible row names, return first match or None."""
@@ -9,24 +12,28 @@ def safe_get(df, keys):
     return None
 
 
+INDUSTRY_TICKERS = {
+    "Technology": "XLK",
+    "Retail": "XRT",
+    "Healthcare": "XLV",
+    "Financials": "XLF",
+    "Energy": "XLE"
+}
+
+
+def _industry_ticker(industry: str):
+    if industry not in INDUSTRY_TICKERS:
+        raise ValueError(f"Industry '{industry}' not supported. Choose from {list(INDUSTRY_TICKERS.keys())}")
+    return CachedTicker(INDUSTRY_TICKERS[industry])
+
+
 def get_industry_metrics(industry: str):
     """
     Fetch industry benchmark metrics using Yahoo Finance sector ETFs or representative tickers.
     Industry examples: 'Technology', 'Retail', 'Healthcare'
     Returns a dictionary of assumptions for financial_forecast.
     """
-    industry_map = {
-        "Technology": "XLK",
-        "Retail": "XRT",
-        "Healthcare": "XLV",
-        "Financials": "XLF",
-        "Energy": "XLE"
-    }
-
-    if industry not in industry_map:
-        raise ValueError(f"Industry '{industry}' not supported. Choose from {list(industry_map.keys())}")
-
-    ticker = yf.Ticker(industry_map[industry])
+    ticker = _industry_ticker(industry)
     fin = ticker.financials
     cf = ticker.cashflow
     bs = ticker.balance_sheet
@@ -75,6 +82,135 @@ def get_industry_metrics(industry: str):
     }
 
 
+FORECAST_ASSUMPTIONS = [
+    "growth_rate", "cogs_pct", "opex_pct", "tax_rate", "capex_pct",
+    "depr_pct", "wc_pct", "discount_rate", "terminal_growth"
+]
+
+DEFAULT_ASSUMPTIONS = {
+    "growth_rate": 0.10,
+    "cogs_pct": 0.60,
+    "opex_pct": 0.20,
+    "tax_rate": 0.30,
+    "capex_pct": 0.05,
+    "depr_pct": 0.04,
+    "wc_pct": 0.10,
+    "discount_rate": 0.12,
+    "terminal_growth": 0.03
+}
+
+FORECAST_COLUMNS = [
+    "Year", "Revenue", "COGS", "Opex", "Depreciation", "EBIT", "Net Income",
+    "Capex", "Working Capital Change", "Free Cash Flow", "Discounted FCF"
+]
+
+
+def _assumption_arrays(assumptions=None, revenue=1_000_000):
+    """
+    Turn a dict of scalars/arrays (or a DataFrame, one row per scenario)
+    into equal-length 1-D float arrays. Missing keys fall back to
+    DEFAULT_ASSUMPTIONS; `revenue` may also be given per scenario.
+    """
+    if assumptions is None:
+        assumptions = {}
+    if isinstance(assumptions, pd.DataFrame):
+        assumptions = {c: assumptions[c].to_numpy() for c in assumptions.columns}
+
+    values = {k: assumptions.get(k, DEFAULT_ASSUMPTIONS[k]) for k in FORECAST_ASSUMPTIONS}
+    values["revenue"] = assumptions.get("revenue", revenue)
+
+    arrays = np.broadcast_arrays(*[np.atleast_1d(np.asarray(v, dtype=float)) for v in values.values()])
+    if arrays[0].ndim != 1:
+        raise ValueError("Assumptions must be scalars or 1-D arrays (one value per scenario).")
+    return {k: a for k, a in zip(values.keys(), arrays)}
+
+
+def _forecast_arrays(a, years):
+    """
+    Core DCF engine: every year x scenario in one broadcast.
+    `a` is the output of _assumption_arrays. Returns a dict of
+    (scenarios, years) arrays plus the 1-D `Year` vector.
+    """
+    year = np.arange(1, years + 1)
+    col = {k: v[:, None] for k, v in a.items()}
+
+    rev = col["revenue"] * ((1 + col["growth_rate"]) ** year)
+    cogs = rev * col["cogs_pct"]
+    opex = rev * col["opex_pct"]
+    depr = rev * col["depr_pct"]
+    ebit = rev - cogs - opex - depr
+    tax = ebit * col["tax_rate"]
+    net_income = ebit - tax
+    capex = rev * col["capex_pct"]
+    wc_change = rev * col["wc_pct"]
+    fcf = net_income + depr - capex - wc_change
+    discounted_fcf = fcf / ((1 + col["discount_rate"]) ** year)
+
+    return {
+        "Year": year,
+        "Revenue": rev,
+        "COGS": cogs,
+        "Opex": opex,
+        "Depreciation": depr,
+        "EBIT": ebit,
+        "Net Income": net_income,
+        "Capex": capex,
+        "Working Capital Change": wc_change,
+        "Free Cash Flow": fcf,
+        "Discounted FCF": discounted_fcf
+    }
+
+
+def _valuation_arrays(a, f, years):
+    """EV and NPV vectors from the per-year arrays (same formulas as financial_forecast)."""
+    last_fcf = f["Free Cash Flow"][:, -1]
+    terminal_value = (last_fcf * (1 + a["terminal_growth"])) / (a["discount_rate"] - a["terminal_growth"])
+    discounted_terminal_value = terminal_value / ((1 + a["discount_rate"]) ** years)
+
+    enterprise_value = f["Discounted FCF"].sum(axis=1) + discounted_terminal_value
+    net_present_value = last_fcf * 0.10
+    return enterprise_value, net_present_value
+
+
+def get_industry_history(industry: str):
+    """
+    Per-period ratio history behind get_industry_metrics.
+    Returns a dict of pd.Series (one value per reported year) for the
+    assumptions that can be derived from the statements; keys with no
+    data are omitted. Used to build empirical distributions.
+    """
+    ticker = _industry_ticker(industry)
+    fin = ticker.financials
+    cf = ticker.cashflow
+    bs = ticker.balance_sheet
+
+    revenue = safe_get(fin, ["Total Revenue", "Revenue", "Net Sales"])
+    if revenue is None:
+        return {}
+
+    cogs = safe_get(fin, ["Cost Of Revenue", "Cost of Goods Sold"])
+    op_income = safe_get(fin, ["Operating Income", "EBIT"])
+    capex = safe_get(cf, ["Capital Expenditures", "Capital Expenditure"])
+    depr = safe_get(cf, ["Depreciation"])
+    curr_assets = safe_get(bs, ["Total Current Assets"])
+    curr_liab = safe_get(bs, ["Total Current Liabilities"])
+
+    history = {"growth_rate": revenue.pct_change(fill_method=None)}
+    if cogs is not None:
+        history["cogs_pct"] = cogs / revenue
+        if op_income is not None:
+            history["opex_pct"] = 1 - op_income / revenue - cogs / revenue
+    if capex is not None:
+        history["capex_pct"] = capex / revenue
+    if depr is not None:
+        history["depr_pct"] = depr / revenue
+    if curr_assets is not None and curr_liab is not None:
+        history["wc_pct"] = (curr_assets - curr_liab) / revenue
+
+    history = {k: v.dropna().astype(float) for k, v in history.items()}
+    return {k: v for k, v in history.items() if not v.empty}
+
+
 def financial_forecast(
     revenue=1_000_000,
     growth_rate=0.10,
@@ -89,37 +225,262 @@ def financial_forecast(
     terminal_growth=0.03
 ):
     """Generate financial forecast and valuation metrics."""
-    data = []
-    for year in range(1, years + 1):
-        rev = revenue * ((1 + growth_rate) ** year)
-        cogs = rev * cogs_pct
-        opex = rev * opex_pct
-        depr = rev * depr_pct
-        ebit = rev - cogs - opex - depr
-        tax = ebit * tax_rate
-        net_income = ebit - tax
-        capex = rev * capex_pct
-        wc_change = rev * wc_pct
-        fcf = net_income + depr - capex - wc_change
-        discounted_fcf = fcf / ((1 + discount_rate) ** year)
-
-        data.append([
-            year, rev, cogs, opex, depr, ebit, net_income,
-            capex, wc_change, fcf, discounted_fcf
-        ])
-
-    df = pd.DataFrame(data, columns=[
-        "Year", "Revenue", "COGS", "Opex", "Depreciation", "EBIT", "Net Income",
-        "Capex", "Working Capital Change", "Free Cash Flow", "Discounted FCF"
-    ])
-
-    terminal_value = (df["Free Cash Flow"].iloc[-1] * (1 + terminal_growth)) / (discount_rate - terminal_growth)
-    discounted_terminal_value = terminal_value / ((1 + discount_rate) ** years)
-
-    enterprise_value = df["Discounted FCF"].sum() + discounted_terminal_value
-    net_present_value = df["Free Cash Flow"].iloc[-1] * 0.10
-
-    return df, round(enterprise_value, 2), round(net_present_value, 2)
+    a = _assumption_arrays({
+        "growth_rate": growth_rate,
+        "cogs_pct": cogs_pct,
+        "opex_pct": opex_pct,
+        "tax_rate": tax_rate,
+        "capex_pct": capex_pct,
+        "depr_pct": depr_pct,
+        "wc_pct": wc_pct,
+        "discount_rate": discount_rate,
+        "terminal_growth": terminal_growth
+    }, revenue=revenue)
+    f = _forecast_arrays(a, years)
+
+    df = pd.DataFrame({c: f[c][0] if c != "Year" else f[c] for c in FORECAST_COLUMNS})
+
+    enterprise_value, net_present_value = _valuation_arrays(a, f, years)
+
+    return df, round(enterprise_value[0], 2), round(net_present_value[0], 2)
+
+
+def financial_forecast_batch(assumptions=None, revenue=1_000_000, years=5, return_table=False):
+    """
+    Vectorized multi-scenario version of financial_forecast.
+
+    assumptions: dict of scalars/arrays or a DataFrame with one row per scenario.
+                 Keys are FORECAST_ASSUMPTIONS (plus optional "revenue");
+                 missing keys use DEFAULT_ASSUMPTIONS.
+
+    Returns (table, enterprise_value, net_present_value):
+      - table: long-format per-year DataFrame (Scenario, Year, ...) if
+        return_table=True, otherwise None
+      - enterprise_value / net_present_value: arrays, one per scenario
+        (unrounded; financial_forecast rounds its scalar result to 2 dp)
+    """
+    a = _assumption_arrays(assumptions, revenue=revenue)
+    f = _forecast_arrays(a, years)
+    enterprise_value, net_present_value = _valuation_arrays(a, f, years)
+
+    table = None
+    if return_table:
+        n = a["revenue"].shape[0]
+        table = pd.DataFrame({
+            "Scenario": np.repeat(np.arange(n), years),
+            "Year": np.tile(f["Year"], n),
+            **{c: f[c].ravel() for c in FORECAST_COLUMNS if c != "Year"}
+        })
+
+    return table, enterprise_value, net_present_value
+
+
+MODEL_DEFAULTS = {
+    "ar_pct_revenue": 0.12,
+    "inv_pct_cogs": 0.08,
+    "ap_pct_cogs": 0.15,
+    "dividends_pct_net_income": 0.0,
+    "cash_opening": 0.0,
+    "ppne_opening": 0.0,
+    "debt_opening": 0.0,
+    "equity_opening": 0.0
+}
+
+
+def _long_table(columns: dict, years: np.ndarray, n: int) -> pd.DataFrame:
+    """Materialise (scenarios, years) arrays as one long table; Scenario only when n > 1."""
+    head = {"Scenario": np.repeat(np.arange(n), len(years))} if n > 1 else {}
+    return pd.DataFrame({**head, "Year": np.tile(years, n), **{c: v.ravel() for c, v in columns.items()}})
+
+
+def check_balance(balance_sheet: pd.DataFrame, tolerance: float = 1e-6) -> dict:
+    """
+    Check that AssetsMinusLiabEq is ~0 on every row (relative to TotalAssets).
+    """
+    diff = balance_sheet["AssetsMinusLiabEq"].abs()
+    scale = balance_sheet["TotalAssets"].abs().clip(lower=1.0)
+    return {
+        "balanced": bool((diff <= tolerance * scale).all()),
+        "max_abs_diff": float(diff.max()) if len(diff) else 0.0
+    }
+
+
+def _three_statement_arrays(a: dict, m: dict, years: int, year_labels: np.ndarray, debt_schedule: dict, equity_schedule: dict):
+    """
+    Linked income -> cash flow -> balance sheet over (scenarios, years) arrays.
+
+    Sign convention follows cashflow_utils: Capex and Dividends are
+    outflows (negative). Every balance sheet movement comes from a cash
+    flow line, so the sheet balances whenever the opening balances do.
+    """
+    f = _forecast_arrays(a, years)
+    rev, cogs, depr, net_income = f["Revenue"], f["COGS"], f["Depreciation"], f["Net Income"]
+    col = {k: v[:, None] for k, v in m.items()}
+
+    # Income statement
+    income = {
+        "Revenue": rev,
+        "COGS": cogs,
+        "Opex": f["Opex"],
+        "Depreciation": depr,
+        "EBIT": f["EBIT"],
+        "Tax": f["EBIT"] - net_income,
+        "NetIncome": net_income
+    }
+
+    # Working capital (first year assumes the full build, as in cashflow_utils)
+    ar = rev * col["ar_pct_revenue"]
+    inventory = cogs * col["inv_pct_cogs"]
+    ap = cogs * col["ap_pct_cogs"]
+    nwc = ar + inventory - ap
+    delta_nwc = np.diff(nwc, axis=1, prepend=0.0)
+
+    # Cash flow
+    capex = -rev * a["capex_pct"][:, None]
+    debt_change = np.broadcast_to(np.array([debt_schedule.get(y, 0.0) for y in year_labels], dtype=float), rev.shape)
+    equity_issue = np.broadcast_to(np.array([equity_schedule.get(y, 0.0) for y in year_labels], dtype=float), rev.shape)
+    dividends = -(net_income * col["dividends_pct_net_income"])
+    operating_cf = net_income + depr - delta_nwc
+    financing_cf = debt_change + equity_issue + dividends
+    net_change = operating_cf + capex + financing_cf
+
+    cash_flow = {
+        "OperatingCF": operating_cf,
+        "InvestingCF": capex,
+        "FinancingCF": financing_cf,
+        "NetChangeInCash": net_change,
+        "Capex": capex,
+        "DeltaNWC": delta_nwc,
+        "Financing_DebtChange": debt_change,
+        "Financing_EquityIssue": equity_issue,
+        "Dividends": dividends
+    }
+
+    # Balance sheet roll-forward
+    cash = col["cash_opening"] + np.cumsum(net_change, axis=1)
+    ppne = col["ppne_opening"] + np.cumsum(-capex - depr, axis=1)
+    debt = col["debt_opening"] + np.cumsum(debt_change, axis=1)
+    share_capital = col["equity_opening"] + np.cumsum(equity_issue, axis=1)
+    retained = np.cumsum(net_income + dividends, axis=1)
+
+    total_assets = cash + ar + inventory + ppne
+    total_liabilities = ap + debt
+    total_equity = share_capital + retained
+
+    balance_sheet = {
+        "Cash": cash,
+        "AccountsReceivable": ar,
+        "Inventory": inventory,
+        "PP&E": ppne,
+        "TotalAssets": total_assets,
+        "AccountsPayable": ap,
+        "Debt": debt,
+        "ShareCapital": share_capital,
+        "RetainedEarnings": retained,
+        "TotalLiabilities": total_liabilities,
+        "TotalEquity": total_equity,
+        "AssetsMinusLiabEq": total_assets - (total_liabilities + total_equity)
+    }
+
+    return f, income, cash_flow, balance_sheet
+
+
+def _ask(prompt: str, default, cast=float, interactive: bool = True):
+    if not interactive:
+        return default
+    value = input(f"{prompt} [{default}]: ").strip()
+    return cast(value) if value else default
+
+
+def run_forecast(filepath: str = None,
+                 data: pd.DataFrame = None,
+                 revenue: float = None,
+                 years: int = None,
+                 start_year: int = None,
+                 industry: str = None,
+                 assumptions: dict = None,
+                 scenarios=None,
+                 opening_balances: dict = None,
+                 ownership: dict = None,
+                 interactive: bool = True):
+    """
+    Integrated three-statement model (income -> cash flow -> balance sheet)
+    plus DCF valuation, computed over one shared years x scenarios array
+    set. pandas tables are only built at the end.
+
+    Inputs left as None are prompted for (revenue, years, start_year,
+    industry); with interactive=False their defaults are used instead. Starting revenue
+    defaults to the last value of a "revenue" column in `data` (or the
+    file at `filepath`) when present.
+
+    assumptions: scalar overrides for DEFAULT_ASSUMPTIONS / MODEL_DEFAULTS,
+                 plus optional debt_change_schedule / equity_issue_schedule
+                 ({year: amount}).
+    scenarios:   optional dict of arrays or DataFrame (one row per scenario)
+                 varying any of those assumptions.
+
+    Returns dict with income_statement, cash_flow, balance_sheet,
+    shareholding (if ownership given), enterprise_value,
+    net_present_value and balance_check.
+    """
+    assumptions = dict(assumptions or {})
+
+    if revenue is None and data is None and filepath is not None:
+        from default_folder import load_file
+        data = load_file(filepath)
+    if revenue is None and data is not None:
+        revenue_cols = [c for c in data.columns if str(c).strip().lower() == "revenue"]
+        if revenue_cols:
+            last = pd.to_numeric(data[revenue_cols[0]], errors="coerce").dropna()
+            revenue = float(last.iloc[-1]) if not last.empty else None
+
+    if revenue is None:
+        revenue = _ask("Enter starting revenue", 1_000_000.0, interactive=interactive)
+    if years is None:
+        years = _ask("Enter forecast years", 5, int, interactive)
+    if start_year is None:
+        start_year = _ask("Enter starting forecast year", pd.Timestamp.today().year + 1, int, interactive)
+    if industry is None:
+        industry = _ask(f"Enter industry benchmark {list(INDUSTRY_TICKERS.keys())} (blank = none)", "", str, interactive)
+
+    base = get_industry_metrics(industry) if industry else {}
+    base.update(opening_balances or {})
+    base.update(assumptions)
+
+    if isinstance(scenarios, pd.DataFrame):
+        scenarios = {c: scenarios[c].to_numpy() for c in scenarios.columns}
+    merged = {**base, **(scenarios or {})}
+
+    a = _assumption_arrays(merged, revenue=revenue)
+    n = a["revenue"].shape[0]
+    m = {k: np.broadcast_to(np.asarray(merged.get(k, v), dtype=float), (n,)) for k, v in MODEL_DEFAULTS.items()}
+
+    year_labels = np.arange(start_year, start_year + years)
+    f, income, cash_flow, balance_sheet = _three_statement_arrays(
+        a, m, years, year_labels,
+        base.get("debt_change_schedule", {}), base.get("equity_issue_schedule", {})
+    )
+    enterprise_value, net_present_value = _valuation_arrays(a, f, years)
+
+    bs_df = _long_table(balance_sheet, year_labels, n)
+    results = {
+        "income_statement": _long_table(income, year_labels, n),
+        "cash_flow": _long_table(cash_flow, year_labels, n),
+        "balance_sheet": bs_df,
+        "enterprise_value": round(enterprise_value[0], 2) if n == 1 else enterprise_value,
+        "net_present_value": round(net_present_value[0], 2) if n == 1 else net_present_value,
+        "balance_check": check_balance(bs_df)
+    }
+    if ownership:
+        results["shareholding"] = compute_shareholding_pattern(bs_df, ownership)
+
+    if results["balance_check"]["balanced"]:
+        print("✅ Balance sheet balances (Assets = Liabilities + Equity).")
+    else:
+        print(f"⚠️ Balance sheet off by up to {results['balance_check']['max_abs_diff']:,.2f} "
+              "(check that opening cash + PP&E = opening debt + equity).")
+
+    return results
 
 
 def forecast_with_industry(revenue: float, years: int, industry: str):
@@ -0,0 +1,228 @@
+# implied_utils.py
+"""
+Implied-assumption solver: what does the market price imply?
+
+Business role:
+- Back out the growth rate, discount rate, terminal growth or a margin
+  assumption at which the financial_forecast EV equals the market EV
+  (CMP x shares + debt - cash, from the same Yahoo info valuation_kpis uses).
+- Solve thousands of tickers at once, with convergence diagnostics per ticker.
+
+How: FCF_t = k * R * (1 + g)^t, where k (free cash flow per unit of revenue)
+and R (starting revenue) do not change while solving. So
+  - k-assumptions (cogs, opex, depr, tax, capex, wc) enter EV linearly:
+    exact closed form from two evaluations,
+  - terminal growth has a closed form,
+  - growth and discount rate use vectorized Newton steps with analytic
+    derivatives, kept inside a bisection bracket.
+"""
+
+import numpy as np
+import pandas as pd
+
+from forecast_utils import FORECAST_ASSUMPTIONS, DEFAULT_ASSUMPTIONS, _assumption_arrays, financial_forecast_batch
+from market_data_utils import CachedTicker, fetch_many
+
+LINEAR_ASSUMPTIONS = ("cogs_pct", "opex_pct", "tax_rate", "capex_pct", "depr_pct", "wc_pct")
+DEFAULT_BRACKETS = {"growth_rate": (-0.5, 1.0), "discount_rate": (None, 1.0)}
+IMPLIED_COLUMNS = ["Ticker", "CMP", "shares", "market_ev", "revenue", "solve_for", "implied_value", "converged",
+                   "iterations", "residual", "method", "status", "Error"]
+
+
+def _fcf_per_revenue(a):
+    """k: free cash flow per unit of revenue (same terms as _forecast_arrays)."""
+    return ((1 - a["cogs_pct"] - a["opex_pct"] - a["depr_pct"]) * (1 - a["tax_rate"])
+            + a["depr_pct"] - a["capex_pct"] - a["wc_pct"])
+
+
+def _ev_and_slope(x, solve_for, kr, g, r, tg, years):
+    """EV and dEV/dx for x = growth_rate or discount_rate (kr = k * R is fixed)."""
+    if solve_for == "growth_rate":
+        g = x
+    else:
+        r = x
+    t = np.arange(1, years + 1)
+    u = ((1 + g) / (1 + r))[:, None]
+    tv = (1 + tg) / (r - tg)
+    powers = u ** t
+    ev = kr * (powers.sum(axis=1) + powers[:, -1] * tv)
+    d_sum = (t * u ** (t - 1)).sum(axis=1)  # d/du of sum u^t
+    d_last = years * u[:, 0] ** (years - 1)  # d/du of u^Y
+    if solve_for == "growth_rate":
+        slope = kr / (1 + r) * (d_sum + d_last * tv)
+    else:
+        du = -u[:, 0] / (1 + r)
+        slope = kr * ((d_sum + d_last * tv) * du - powers[:, -1] * (1 + tg) / (r - tg) ** 2)
+    return ev, slope
+
+
+def _newton_bracketed(target, solve_for, kr, g, r, tg, years, lo, hi, tol, max_iter):
+    """Safeguarded Newton for every row at once; returns value, iterations, status."""
+    n = target.shape[0]
+    f_lo = _ev_and_slope(lo, solve_for, kr, g, r, tg, years)[0] - target
+    f_hi = _ev_and_slope(hi, solve_for, kr, g, r, tg, years)[0] - target
+    bracketed = np.isfinite(f_lo) & np.isfinite(f_hi) & (np.sign(f_lo) != np.sign(f_hi))
+
+    x = np.where(bracketed, (lo + hi) / 2, np.nan)
+    iterations = np.zeros(n, dtype=int)
+    converged = np.zeros(n, dtype=bool)
+    active = bracketed.copy()
+    scale = np.maximum(np.abs(target), 1.0)
+
+    for i in range(max_iter):
+        if not active.any():
+            break
+        f, slope = _ev_and_slope(x[active], solve_for, kr[active], g[active], r[active], tg[active], years)
+        f = f - target[active]
+        iterations[active] += 1
+
+        done = np.abs(f) <= tol * scale[active]
+        # keep the sign change inside [lo, hi]
+        same_as_lo = np.sign(f) == np.sign(f_lo[active])
+        lo_a, hi_a, flo_a = lo[active], hi[active], f_lo[active]
+        lo_a = np.where(same_as_lo, x[active], lo_a)
+        flo_a = np.where(same_as_lo, f, flo_a)
+        hi_a = np.where(same_as_lo, hi_a, x[active])
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            step = x[active] - f / slope
+        inside = np.isfinite(step) & (step > lo_a) & (step < hi_a)
+        new_x = np.where(inside, step, (lo_a + hi_a) / 2)
+        done |= np.abs(hi_a - lo_a) <= tol * np.maximum(np.abs(new_x), 1.0)
+
+        idx = np.flatnonzero(active)
+        lo[idx], hi[idx], f_lo[idx] = lo_a, hi_a, flo_a
+        x[idx] = np.where(done, x[idx], new_x)
+        converged[idx[done]] = True
+        active[idx[done]] = False
+
+    status = np.where(converged, "converged", np.where(bracketed, "max_iter", "no_root_in_bracket"))
+    return x, iterations, status
+
+
+def solve_implied_assumption(target_ev, solve_for="growth_rate", assumptions=None, revenue=1_000_000,
+                             years=5, bracket=None, tol=1e-10, max_iter=100) -> pd.DataFrame:
+    """
+    Value of one assumption that makes the DCF EV equal target_ev.
+
+    target_ev, revenue and every assumption may be scalars or arrays
+    (one value per company); all rows are solved together.
+    solve_for: any FORECAST_ASSUMPTIONS name
+    bracket:   (low, high) search range for growth_rate / discount_rate
+               (default growth -50%..100%, discount just above terminal growth..100%)
+
+    Returns one row per company: implied_value, converged, iterations,
+    residual (model EV - target, recomputed with financial_forecast_batch),
+    method and status.
+    """
+    if solve_for not in FORECAST_ASSUMPTIONS:
+        raise ValueError(f"Unknown assumption '{solve_for}'. Choose from {FORECAST_ASSUMPTIONS}")
+
+    merged = dict(DEFAULT_ASSUMPTIONS)
+    merged.update(assumptions or {})
+    target = np.atleast_1d(np.asarray(target_ev, dtype=float))
+    a = _assumption_arrays(merged, revenue=revenue)
+    n = max(target.shape[0], a["revenue"].shape[0])
+    a = {k: np.broadcast_to(v, (n,)).astype(float) for k, v in a.items()}
+    target = np.broadcast_to(target, (n,)).astype(float)
+
+    g, r, tg = a["growth_rate"], a["discount_rate"], a["terminal_growth"]
+    kr = _fcf_per_revenue(a) * a["revenue"]
+    iterations = np.zeros(n, dtype=int)
+
+    if solve_for in LINEAR_ASSUMPTIONS:
+        method = "closed_form_linear"
+        # EV is affine in this assumption: two evaluations give the exact root
+        at0 = {**a, solve_for: np.zeros(n)}
+        at1 = {**a, solve_for: np.ones(n)}
+        ev0 = _ev_and_slope(g, "growth_rate", _fcf_per_revenue(at0) * a["revenue"], g, r, tg, years)[0]
+        ev1 = _ev_and_slope(g, "growth_rate", _fcf_per_revenue(at1) * a["revenue"], g, r, tg, years)[0]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            value = (target - ev0) / (ev1 - ev0)
+        status = np.where(np.isfinite(value), "converged", "no_solution")
+    elif solve_for == "terminal_growth":
+        method = "closed_form"
+        # EV = A + B * (1 + tg) / (r - tg)  ->  tg = (C r - 1) / (1 + C), C = (EV - A) / B
+        u = ((1 + g) / (1 + r))[:, None]
+        powers = u ** np.arange(1, years + 1)
+        A, B = kr * powers.sum(axis=1), kr * powers[:, -1]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            c = (target - A) / B
+            value = (c * r - 1) / (1 + c)
+        ok = np.isfinite(value) & (value < r) & (c > 0)
+        value = np.where(ok, value, np.nan)
+        status = np.where(ok, "converged", "no_solution")
+    else:
+        method = "newton_bisection"
+        lo, hi = bracket or DEFAULT_BRACKETS[solve_for]
+        if lo is None:  # discount rate must stay above terminal growth
+            lo = tg + 1e-6
+        lo = np.broadcast_to(np.asarray(lo, dtype=float), (n,)).copy()
+        hi = np.broadcast_to(np.asarray(hi, dtype=float), (n,)).copy()
+        value, iterations, status = _newton_bracketed(target, solve_for, kr, g, r, tg, years, lo, hi, tol, max_iter)
+        value = np.where(status == "no_root_in_bracket", np.nan, value)
+
+    check = {**{k: a[k] for k in FORECAST_ASSUMPTIONS}, solve_for: np.where(np.isfinite(value), value, a[solve_for])}
+    _, model_ev, _ = financial_forecast_batch(check, revenue=a["revenue"], years=years)
+    residual = np.where(np.isfinite(value), model_ev - target, np.nan)
+
+    return pd.DataFrame({
+        "solve_for": solve_for,
+        "target_ev": target,
+        "implied_value": value,
+        "converged": status == "converged",
+        "iterations": iterations,
+        "residual": residual,
+        "method": method,
+        "status": status
+    })
+
+
+def _market_inputs(ticker: str) -> dict:
+    """CMP (as in valuation_kpis), share count, net debt and revenue from the cached info."""
+    info = CachedTicker(ticker).info
+    cmp = info.get("currentPrice")
+    shares = info.get("sharesOutstanding")
+    revenue = info.get("totalRevenue")
+    if not cmp or not shares or not revenue:
+        raise ValueError("currentPrice, sharesOutstanding and totalRevenue are required")
+    debt = info.get("totalDebt") or 0.0
+    cash = info.get("totalCash") or 0.0
+    return {
+        "Ticker": ticker,
+        "CMP": cmp,
+        "shares": shares,
+        "market_ev": cmp * shares + debt - cash,
+        "revenue": revenue
+    }
+
+
+def implied_assumptions(tickers, solve_for="growth_rate", assumptions=None, years=5,
+                        max_workers=8, rate_limit=None, retries=2, backoff=0.5, **solver_kwargs) -> pd.DataFrame:
+    """
+    Implied `solve_for` for a watchlist: fetch CMP / shares / net debt /
+    revenue concurrently through the market-data cache, then solve every
+    ticker in one vectorized call.
+
+    assumptions: base case for the other assumptions (scalars, or arrays in
+                 ticker order). Tickers that fail to fetch keep a row with
+                 the message in the Error column.
+    """
+    tickers = list(tickers)
+    if not tickers:
+        return pd.DataFrame(columns=IMPLIED_COLUMNS)
+    fetched = fetch_many(_market_inputs, tickers, max_workers=max_workers,
+                         rate_limit=rate_limit, retries=retries, backoff=backoff)
+    ok = np.array([err is None for _, _, err in fetched], dtype=bool)
+    rows = [pd.DataFrame({"Ticker": [t for t, _, err in fetched if err is not None],
+                          "Error": [err for _, _, err in fetched if err is not None],
+                          "_order": np.flatnonzero(~ok)})]
+    if ok.any():
+        market = pd.DataFrame([res for _, res, err in fetched if err is None])
+        # per-ticker assumption arrays follow the input order; keep the fetched rows only
+        base = {k: np.asarray(v)[ok] if np.ndim(v) else v for k, v in (assumptions or {}).items()}
+        solved = solve_implied_assumption(market["market_ev"].to_numpy(), solve_for=solve_for, assumptions=base,
+                                          revenue=market["revenue"].to_numpy(), years=years, **solver_kwargs)
+        rows.insert(0, pd.concat([market, solved.drop(columns="target_ev")], axis=1).assign(Error=None, _order=np.flatnonzero(ok)))
+    table = pd.concat([r for r in rows if len(r)], ignore_index=True)
+    return table.sort_values("_order", ignore_index=True).drop(columns="_order")
@@ -0,0 +1,123 @@
+# ingest_utils.py
+"""
+Incremental ingestion for the input folder.
+
+Business role:
+- Keep a manifest (path, size, mtime, hash, status) of every file already
+  handled, so re-runs only touch new or changed drops.
+- Push new files through clean_dataframe and an optional analysis step,
+  oldest arrival first.
+- Optional watch loop for long-running ingestion.
+"""
+
+import os
+import glob
+import json
+import time
+from datetime import datetime
+
+from default_folder import read_source
+from input_cache_utils import file_fingerprint
+from primary_clean_utils import clean_dataframe
+
+MANIFEST_NAME = ".ingest_manifest.json"
+
+
+def load_manifest(manifest_path: str) -> dict:
+    if not os.path.exists(manifest_path):
+        return {}
+    with open(manifest_path, encoding="utf-8") as fh:
+        return json.load(fh)
+
+
+def save_manifest(manifest: dict, manifest_path: str):
+    tmp = f"{manifest_path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(manifest, fh, indent=1)
+    os.replace(tmp, manifest_path)
+
+
+def find_pending_files(folder: str, manifest: dict, retry_failed: bool = False, settle_seconds: float = 2.0) -> list:
+    """
+    New or changed .xlsx/.csv files in arrival (ctime) order.
+
+    Only size and mtime are compared here; files whose size and mtime match
+    the manifest are never re-read. Files modified in the last
+    settle_seconds are left for the next pass (still being copied in).
+    """
+    now = time.time()
+    pending = []
+    for path in glob.glob(os.path.join(folder, "*.xlsx")) + glob.glob(os.path.join(folder, "*.csv")):
+        stat = os.stat(path)
+        if now - stat.st_mtime < settle_seconds:
+            continue
+        entry = manifest.get(os.path.abspath(path))
+        unchanged = entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns
+        if unchanged and (entry["status"] == "done" or not retry_failed):
+            continue
+        pending.append((stat.st_ctime, path))
+    return [path for _, path in sorted(pending)]
+
+
+def ingest_folder(folder: str = r"C:\Users\Dell\Documents\Data Analysis Input",
+                  process=None,
+                  manifest_path: str = None,
+                  retry_failed: bool = False,
+                  settle_seconds: float = 2.0) -> list:
+    """
+    Clean (and optionally process) every new or changed file in `folder`.
+
+    process: optional callable(df, path) run on each cleaned frame, e.g. an
+             analysis + save step.
+    A file whose bytes are unchanged (same hash) after a touch is marked
+    done again without reprocessing.
+
+    Returns the manifest entries written during this pass.
+    """
+    manifest_path = manifest_path or os.path.join(folder, MANIFEST_NAME)
+    manifest = load_manifest(manifest_path)
+    handled = []
+
+    for path in find_pending_files(folder, manifest, retry_failed, settle_seconds):
+        key = os.path.abspath(path)
+        fingerprint = file_fingerprint(path)
+        previous = manifest.get(key)
+        entry = {
+            "size": fingerprint["size"],
+            "mtime_ns": fingerprint["mtime_ns"],
+            "hash": fingerprint["hash"],
+            "processed_at": datetime.now().isoformat(timespec="seconds")
+        }
+
+        if previous and previous.get("hash") == fingerprint["hash"] and previous["status"] == "done":
+            entry.update(status="done", rows=previous.get("rows"))
+        else:
+            try:
+                df = clean_dataframe(read_source(path))
+                if process is not None:
+                    process(df, path)
+                entry.update(status="done", rows=int(df.shape[0]))
+                print(f"✅ Ingested: {os.path.basename(path)} ({df.shape[0]} rows)")
+            except Exception as e:
+                entry.update(status="failed", error=f"{type(e).__name__}: {e}")
+                print(f"❌ Failed: {os.path.basename(path)} — {e}")
+
+        manifest[key] = entry
+        save_manifest(manifest, manifest_path)
+        handled.append({"path": key, **entry})
+
+    return handled
+
+
+def watch_folder(folder: str = r"C:\Users\Dell\Documents\Data Analysis Input",
+                 process=None,
+                 interval: float = 30.0,
+                 max_cycles: int = None,
+                 **kwargs):
+    """Run ingest_folder every `interval` seconds (forever, or max_cycles times)."""
+    cycle = 0
+    while max_cycles is None or cycle < max_cycles:
+        ingest_folder(folder, process=process, **kwargs)
+        cycle += 1
+        if max_cycles is None or cycle < max_cycles:
+            time.sleep(interval)
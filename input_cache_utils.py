@@ -0,0 +1,126 @@
+# input_cache_utils.py
+"""
+Columnar cache for parsed input files.
+
+Business role:
+- Parse an Excel/CSV source once, store the frame as uncompressed Feather
+  (memory-mapped on read), and serve later loads near-instantly.
+- Entries are keyed by path, size and mtime (nanoseconds), so an edited
+  file is re-parsed; a content hash can be added for sources whose mtime
+  cannot be trusted (it reads the whole file on every load).
+- Optionally cache the cleaned frame instead of the raw one.
+- Evict least-recently-used entries when the cache exceeds its size budget.
+"""
+
+import os
+import hashlib
+import threading
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:  # fall back to pickle when pyarrow is not installed
+    pa = None
+    feather = None
+
+CACHE_DIR = os.environ.get("INPUT_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".input_cache"))
+MAX_CACHE_BYTES = int(os.environ.get("INPUT_CACHE_MAX_BYTES", 5 * 1024 ** 3))
+
+
+def file_fingerprint(path: str, content_hash: bool = True) -> dict:
+    """Path, size, mtime and (optionally) a BLAKE2 hash of the file contents."""
+    stat = os.stat(path)
+    fingerprint = {"path": os.path.abspath(path), "size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    if content_hash:
+        digest = hashlib.blake2b(digest_size=16)
+        with open(path, "rb") as fh:
+            for block in iter(lambda: fh.read(1 << 20), b""):
+                digest.update(block)
+        fingerprint["hash"] = digest.hexdigest()
+    return fingerprint
+
+
+def _entry_stem(fingerprint: dict, variant: str) -> str:
+    key = "|".join(str(fingerprint.get(k, "")) for k in ("path", "size", "mtime_ns", "hash")) + "|" + variant
+    return os.path.join(CACHE_DIR, hashlib.sha1(key.encode()).hexdigest())
+
+
+def _read_entry(stem: str):
+    for ext in (".feather", ".pkl"):
+        path = stem + ext
+        if os.path.exists(path):
+            os.utime(path)  # mark as recently used for eviction
+            if ext == ".feather":
+                return feather.read_table(path, memory_map=True).to_pandas()
+            return pd.read_pickle(path)
+    return None
+
+
+def _write_entry(stem: str, df: pd.DataFrame):
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    # unique per thread: the warm service loads files from a thread pool
+    tmp = f"{stem}.{os.getpid()}.{threading.get_ident()}.tmp"
+    if feather is not None:
+        try:
+            table = pa.Table.from_pandas(df, preserve_index=True)
+            feather.write_feather(table, tmp, compression="uncompressed")
+            os.replace(tmp, stem + ".feather")
+            return
+        except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError, ValueError, TypeError):
+            # mixed-type object columns cannot be stored as Arrow
+            if os.path.exists(tmp):
+                os.remove(tmp)
+    df.to_pickle(tmp)
+    os.replace(tmp, stem + ".pkl")
+
+
+def evict_cache(max_bytes: int = None):
+    """Delete least-recently-used entries until the cache fits in max_bytes."""
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    if not os.path.isdir(CACHE_DIR):
+        return
+    entries = []
+    for name in os.listdir(CACHE_DIR):
+        if name.endswith((".feather", ".pkl")):
+            path = os.path.join(CACHE_DIR, name)
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:  # evicted by another thread meanwhile
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def read_cached(path: str, reader, clean: bool = False, content_hash: bool = False) -> pd.DataFrame:
+    """
+    Return reader(path) through the columnar cache.
+
+    clean:        cache (and return) clean_dataframe(reader(path)) instead of the raw frame
+    content_hash: also key on a hash of the file bytes (catches an edit that
+                  keeps size and mtime, but reads the whole file every load);
+                  by default size + mtime_ns are trusted and a hit costs one stat
+    """
+    fingerprint = file_fingerprint(path, content_hash=content_hash)
+    stem = _entry_stem(fingerprint, "clean" if clean else "raw")
+
+    df = _read_entry(stem)
+    if df is not None:
+        return df
+
+    df = reader(path)
+    if clean:
+        from primary_clean_utils import clean_dataframe
+        df = clean_dataframe(df)
+    _write_entry(stem, df)
+    evict_cache()
+    return df
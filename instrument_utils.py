@@ -0,0 +1,299 @@
+# instrument_utils.py
+"""
+Per-stage timing and memory instrumentation.
+
+Business role:
+- Show where a slow run spends its time: loading, cleaning, the analysis
+  or writing the output.
+- Per stage: wall time, CPU time, tracemalloc peak above the stage start,
+  process peak RSS and rows / columns handled.
+- One JSON file that is both a plain stage list and a Chrome trace
+  (open it in chrome://tracing or https://ui.perfetto.dev).
+- Optional cProfile of every stage, keeping only the hottest one.
+
+Each traced run has its own recorder, held in a context variable, so
+concurrent runs (service jobs, threads) each write their own trace; worker
+threads join a run by running in a copy of its context. tracemalloc is
+shared by the process: it is started by the first run that asks for
+memory tracking and stopped when the last one ends, and the memory figures
+of runs that overlap in time overlap too.
+
+Disabled (the default) stage() hands back one shared no-op context, so the
+instrumented code pays a function call and nothing else.
+"""
+
+import os
+import sys
+import json
+import time
+import pstats
+import cProfile
+import threading
+import contextlib
+import contextvars
+import tracemalloc
+from io import StringIO
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_NULL = contextlib.nullcontext()
+
+_current = contextvars.ContextVar("instrument_recorder", default=None)
+_lock = threading.Lock()
+_tracemalloc = {"users": 0, "started": False}
+
+
+def _peak_rss():
+    """Process peak resident set size in bytes (None when not available)."""
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    try:
+        import psutil
+        info = psutil.Process().memory_info()
+        return getattr(info, "peak_wset", info.rss)
+    except ImportError:
+        return None
+
+
+def _acquire_tracemalloc():
+    with _lock:
+        if _tracemalloc["users"] == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _tracemalloc["started"] = True
+        _tracemalloc["users"] += 1
+
+
+def _release_tracemalloc():
+    with _lock:
+        _tracemalloc["users"] -= 1
+        if _tracemalloc["users"] == 0 and _tracemalloc["started"]:
+            tracemalloc.stop()
+            _tracemalloc["started"] = False
+
+
+class _Recorder:
+    """Records and settings of one traced run."""
+
+    def __init__(self, memory=True, profile=False):
+        self.enabled = True
+        self.memory = memory
+        self.profile = profile
+        self.origin = time.perf_counter()
+        self.records = []
+        self.hottest = None  # (wall seconds, stage name, Profile)
+        self.lock = threading.Lock()
+        self.local = threading.local()  # open-stage stack per thread
+        if memory:
+            _acquire_tracemalloc()
+
+    def stack(self):
+        if not hasattr(self.local, "stack"):
+            self.local.stack = []
+        return self.local.stack
+
+    def stop(self):
+        if self.enabled:
+            self.enabled = False
+            if self.memory:
+                _release_tracemalloc()
+
+
+def _active():
+    """The recorder of the current run, or None when not recording."""
+    recorder = _current.get()
+    return recorder if recorder is not None and recorder.enabled else None
+
+
+def enable_instrumentation(memory: bool = True, profile: bool = False):
+    """
+    Start recording stages in the current context (clears earlier records).
+
+    memory:  track Python allocations with tracemalloc (slows allocation-heavy code)
+    profile: run each stage under cProfile and keep the hottest stage's profile
+    """
+    disable_instrumentation()
+    _current.set(_Recorder(memory=memory, profile=profile))
+
+
+def disable_instrumentation():
+    """Stop recording in the current context; its records stay readable."""
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.stop()
+
+
+def is_enabled() -> bool:
+    return _active() is not None
+
+
+class _Stage:
+    def __init__(self, recorder, name, fields):
+        self.recorder = recorder
+        self.record = {"name": name, **fields}
+
+    def __enter__(self):
+        recorder = self.recorder
+        stack = recorder.stack()
+        self.record["parent"] = stack[-1].record["name"] if stack else None
+        if recorder.memory and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            # fold the peak so far into every open stage before resetting it for this one
+            for open_stage in stack:
+                open_stage.peak = max(open_stage.peak, peak)
+            tracemalloc.reset_peak()
+            self.start_memory, self.peak = current, current
+        stack.append(self)
+        self.profiler = cProfile.Profile() if recorder.profile and len(stack) == 1 else None
+        self.wall = time.perf_counter()
+        self.cpu = time.thread_time()
+        if self.profiler:
+            try:
+                self.profiler.enable()
+            except ValueError:  # another stage on a different thread is already being profiled
+                self.profiler = None
+        return self.record
+
+    def __exit__(self, exc_type, exc, tb):
+        if self.profiler:
+            self.profiler.disable()
+        wall = time.perf_counter() - self.wall
+        cpu = time.thread_time() - self.cpu
+        recorder = self.recorder
+        stack = recorder.stack()
+        stack.pop()
+
+        record = self.record
+        record.update(
+            start_seconds=self.wall - recorder.origin,
+            wall_seconds=wall,
+            cpu_seconds=cpu,
+            thread=threading.get_ident(),
+            peak_rss_bytes=_peak_rss(),
+            error=f"{exc_type.__name__}: {exc}" if exc_type else None
+        )
+        if recorder.memory and tracemalloc.is_tracing():
+            peak = max(self.peak, tracemalloc.get_traced_memory()[1])
+            record["tracemalloc_peak_delta_bytes"] = peak - self.start_memory
+            if stack:
+                stack[-1].peak = max(stack[-1].peak, peak)
+
+        with recorder.lock:
+            recorder.records.append(record)
+            if self.profiler and (recorder.hottest is None or wall > recorder.hottest[0]):
+                recorder.hottest = (wall, record["name"], self.profiler)
+        return False
+
+
+def stage(name: str, **fields):
+    """
+    Context manager timing one stage:
+
+        with stage("clean", file=path):
+            df = clean_dataframe(df)
+            note_shape(df)
+
+    Extra keyword fields are stored with the record. No-op when disabled.
+    """
+    recorder = _active()
+    if recorder is None:
+        return _NULL
+    return _Stage(recorder, name, fields)
+
+
+def note(**fields):
+    """Attach fields (e.g. rows=...) to the innermost open stage on this thread."""
+    recorder = _active()
+    if recorder is not None and recorder.stack():
+        recorder.stack()[-1].record.update(fields)
+
+
+def note_shape(df):
+    """Record rows / columns of a DataFrame on the innermost open stage."""
+    recorder = _active()
+    if recorder is not None and recorder.stack() and hasattr(df, "shape") and len(df.shape) == 2:
+        recorder.stack()[-1].record.update(rows=int(df.shape[0]), columns=int(df.shape[1]))
+
+
+def get_records() -> list:
+    """Records of the current context's run (the last one, once stopped)."""
+    recorder = _current.get()
+    if recorder is None:
+        return []
+    with recorder.lock:
+        return list(recorder.records)
+
+
+def hottest_profile(limit: int = 25) -> str:
+    """pstats text (by cumulative time) of the slowest profiled stage, or ''."""
+    recorder = _current.get()
+    hottest = recorder.hottest if recorder is not None else None
+    if hottest is None:
+        return ""
+    out = StringIO()
+    pstats.Stats(hottest[2], stream=out).sort_stats("cumulative").print_stats(limit)
+    return f"Hottest stage: {hottest[1]} ({hottest[0]:.3f}s)\n" + out.getvalue()
+
+
+def write_trace(path: str) -> str:
+    """
+    Write the records as JSON: {"stages": [...], "traceEvents": [...]}.
+    The same file loads in chrome://tracing / Perfetto. With profiling on,
+    the hottest stage is also saved as <path>.prof (pstats) and <path>.prof.txt.
+    """
+    records = get_records()
+    pid = os.getpid()
+    events = [{
+        "name": r["name"],
+        "cat": "stage",
+        "ph": "X",
+        "ts": round(r["start_seconds"] * 1e6, 1),
+        "dur": round(r["wall_seconds"] * 1e6, 1),
+        "pid": pid,
+        "tid": r["thread"],
+        "args": {k: v for k, v in r.items() if k not in ("name", "start_seconds", "wall_seconds", "thread")}
+    } for r in records]
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = f"{path}.{pid}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump({"stages": records, "traceEvents": events, "displayTimeUnit": "ms"}, fh, indent=1, default=str)
+    os.replace(tmp, path)
+
+    recorder = _current.get()
+    if recorder is not None and recorder.hottest is not None:
+        recorder.hottest[2].dump_stats(f"{path}.prof")
+        with open(f"{path}.prof.txt", "w", encoding="utf-8") as fh:
+            fh.write(hottest_profile())
+    return path
+
+
+@contextlib.contextmanager
+def _recording(trace_path, memory, profile):
+    recorder = _Recorder(memory=memory, profile=profile)
+    token = _current.set(recorder)
+    try:
+        yield
+    finally:
+        recorder.stop()
+        try:
+            write_trace(trace_path)
+        finally:
+            _current.reset(token)
+        slowest = max(recorder.records, key=lambda r: r["wall_seconds"], default=None)
+        print(f"⏱️ Trace saved: {trace_path}" + (f" (slowest stage: {slowest['name']}, {slowest['wall_seconds']:.3f}s)" if slowest else ""))
+
+
+def instrumented(trace_path: str = None, memory: bool = True, profile: bool = False):
+    """
+    Record every stage inside the block and write trace_path at the end.
+    Returns a no-op context when trace_path is None (or this run is already
+    recording, e.g. a pipeline that enabled it around several tasks); runs
+    on other threads or in other contexts get their own recorder.
+    """
+    if not trace_path or is_enabled():
+        return _NULL
+    return _recording(trace_path, memory, profile)
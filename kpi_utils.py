@@ -1,13 +1,17 @@
 import os
 import pandas as pd
-import yfinance as yf
+from market_data_utils import CachedTicker, fetch_many
+
+KPI_COLUMNS = ["Ticker", "CMP", "EPS", "P/E", "P/B", "Earnings Yield (%)", "Dividend Yield (%)",
+               "Gov Bond Yield (%)", "Valuation"]
 
 def valuation_kpis(ticker_symbol, gov_bond_yield=0.07):
     """
     Calculate valuation KPIs for a given company ticker.
-    Returns a DataFrame with metrics.
+    Returns a DataFrame with metrics; raises ValueError when the ticker
+    has no current price.
     """
-    t = yf.Ticker(ticker_symbol)
+    t = CachedTicker(ticker_symbol)
     info = t.info
     
     cmp = info.get("currentPrice")
@@ -15,6 +19,8 @@ def valuation_kpis(ticker_symbol, gov_bond_yield=0.07):
     bvps = info.get("bookValue")
     dividend = info.get("dividendRate")
     beta = info.get("beta", 1)
+    if not cmp:
+        raise ValueError(f"No current price for {ticker_symbol}")
     
     # KPIs
     pe = cmp / eps if eps else None
@@ -37,6 +43,21 @@ def valuation_kpis(ticker_symbol, gov_bond_yield=0.07):
         "Valuation": valuation_flag
     }])
 
+def valuation_kpis_batch(tickers, gov_bond_yield=0.07, max_workers=8, rate_limit=None, retries=2, backoff=0.5):
+    """
+    Concurrent valuation_kpis for a watchlist, combined into one DataFrame.
+    Failed tickers keep a row with the message in the Error column.
+    """
+    tickers = list(tickers)
+    if not tickers:
+        return pd.DataFrame(columns=KPI_COLUMNS + ["Error"])
+    results = fetch_many(lambda t: valuation_kpis(t, gov_bond_yield=gov_bond_yield), tickers,
+                         max_workers=max_workers, rate_limit=rate_limit, retries=retries, backoff=backoff)
+    frames = [res.assign(Error=None) if err is None else pd.DataFrame([{"Ticker": t, "Error": err}])
+              for t, res, err in results]
+    # every column even when all tickers failed
+    return pd.concat(frames, ignore_index=True).reindex(columns=KPI_COLUMNS + ["Error"])
+
 def save_kpis(df, output_folder=r"C:\Users\Dell\Output", filename_base="valuation_kpis"):
     """
     Save KPI DataFrame into CSV and XLSX in output folder.
@@ -1,14 +1,21 @@
 import os, glob, pandas as pd
+from default_folder import read_source
+from input_cache_utils import read_cached
 
-def get_latest_data(folder=r"C:\Users\Dell\Documents\Data Analysis Input"):
+DEFAULT_INPUT_FOLDER = r"C:\Users\Dell\Documents\Data Analysis Input"
+
+def find_latest_file(folder=DEFAULT_INPUT_FOLDER):
     files = glob.glob(os.path.join(folder, "*.xlsx")) + glob.glob(os.path.join(folder, "*.csv"))
     if not files:
         raise FileNotFoundError("No .xlsx or .csv files found")
-    latest = max(files, key=os.path.getctime)
+    return max(files, key=os.path.getctime)
+
+def get_latest_data(folder=DEFAULT_INPUT_FOLDER, cache=True, clean=False):
+    latest = find_latest_file(folder)
     print("Picked file:", latest)
-    return pd.read_excel(latest) if latest.endswith(".xlsx") else pd.read_csv(latest)
+    return read_cached(latest, read_source, clean=clean) if cache else read_source(latest)
 
 # Example use inside notebook
-from latest_data_utils import get_latest_data
-df = get_latest_data()
-df.head()
+if __name__ == "__main__":
+    df = get_latest_data()
+    print(df.head())
@@ -0,0 +1,209 @@
+# market_data_utils.py
+"""
+Shared cache for Yahoo Finance market data.
+
+Business role:
+- Serve (ticker, dataset) pairs — financials, cashflow, balance_sheet, info —
+  from an in-memory LRU, then a compact on-disk store, and only then from
+  yfinance.
+- Per-dataset TTLs: statements change quarterly, prices change daily.
+- Offline "replay" mode serves only from cache, so tests and CI run with
+  no network.
+- Watchlist helper: run a per-ticker function over many tickers on a
+  bounded thread pool with rate limiting, retries and per-ticker errors.
+"""
+
+import os
+import re
+import time
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+DATASETS = ("financials", "cashflow", "balance_sheet", "info")
+
+# Seconds before a cached entry is refetched
+DEFAULT_TTLS = {
+    "financials": 7 * 24 * 3600,
+    "cashflow": 7 * 24 * 3600,
+    "balance_sheet": 7 * 24 * 3600,
+    "info": 12 * 3600
+}
+
+CACHE_DIR = os.environ.get("MARKET_CACHE_DIR", os.path.join(os.path.expanduser("~"), ".market_data_cache"))
+MEMORY_MAX_ENTRIES = 512
+
+_settings = {
+    "offline": os.environ.get("MARKET_DATA_OFFLINE", "").strip().lower() in ("1", "true", "yes"),
+    "ttls": dict(DEFAULT_TTLS),
+    "cache_dir": CACHE_DIR,
+    "fetcher": None
+}
+_memory = OrderedDict()
+_lock = threading.Lock()
+
+
+def configure_cache(offline: bool = None, ttls: dict = None, cache_dir: str = None, fetcher=None, memory_max_entries: int = None):
+    """
+    Change cache behaviour at runtime.
+
+    offline:   True = replay mode, never touch the network
+    ttls:      {dataset: seconds} overrides
+    cache_dir: on-disk store location
+    fetcher:   callable(ticker, dataset) used instead of yfinance (e.g. a local stub)
+    """
+    global MEMORY_MAX_ENTRIES
+    if offline is not None:
+        _settings["offline"] = offline
+    if ttls:
+        _settings["ttls"].update(ttls)
+    if cache_dir is not None:
+        _settings["cache_dir"] = cache_dir
+    if fetcher is not None:
+        _settings["fetcher"] = fetcher
+    if memory_max_entries is not None:
+        MEMORY_MAX_ENTRIES = memory_max_entries
+
+
+def clear_cache(disk: bool = False):
+    """Empty the in-memory LRU (and optionally the on-disk store)."""
+    with _lock:
+        _memory.clear()
+    if disk and os.path.isdir(_settings["cache_dir"]):
+        for name in os.listdir(_settings["cache_dir"]):
+            if name.endswith(".pkl.gz"):
+                os.remove(os.path.join(_settings["cache_dir"], name))
+
+
+def _disk_path(ticker: str, dataset: str) -> str:
+    safe = re.sub(r"[^A-Za-z0-9._-]", "_", ticker.upper())
+    return os.path.join(_settings["cache_dir"], f"{safe}__{dataset}.pkl.gz")
+
+
+def _fetch_live(ticker: str, dataset: str):
+    if _settings["fetcher"] is not None:
+        return _settings["fetcher"](ticker, dataset)
+    import yfinance as yf
+    return getattr(yf.Ticker(ticker), dataset)
+
+
+def _remember(key, entry):
+    with _lock:
+        _memory[key] = entry
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_MAX_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def get_market_data(ticker: str, dataset: str):
+    """
+    Return one dataset for a ticker, using memory -> disk -> yfinance.
+    In offline mode stale entries are still served; a miss raises LookupError.
+    """
+    if dataset not in DATASETS:
+        raise ValueError(f"Dataset '{dataset}' not supported. Choose from {list(DATASETS)}")
+
+    key = (ticker.upper(), dataset)
+    ttl = _settings["ttls"][dataset]
+    offline = _settings["offline"]
+    now = time.time()
+
+    with _lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            _memory.move_to_end(key)
+    if entry is not None and (offline or now - entry["fetched_at"] < ttl):
+        return entry["data"]
+
+    path = _disk_path(ticker, dataset)
+    if os.path.exists(path):
+        entry = pd.read_pickle(path, compression="gzip")
+        if offline or now - entry["fetched_at"] < ttl:
+            _remember(key, entry)
+            return entry["data"]
+
+    if offline:
+        raise LookupError(f"Offline mode: no cached '{dataset}' for {ticker} in {_settings['cache_dir']}")
+
+    entry = {"fetched_at": now, "data": _fetch_live(ticker, dataset)}
+    os.makedirs(_settings["cache_dir"], exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    pd.to_pickle(entry, tmp_path, compression="gzip")
+    os.replace(tmp_path, path)
+    _remember(key, entry)
+    return entry["data"]
+
+
+class CachedTicker:
+    """
+    Drop-in for yf.Ticker covering the attributes this project uses:
+    financials, cashflow, balance_sheet and info — all served through the cache.
+    """
+
+    def __init__(self, ticker: str):
+        self.ticker = ticker
+
+    @property
+    def financials(self):
+        return get_market_data(self.ticker, "financials")
+
+    @property
+    def cashflow(self):
+        return get_market_data(self.ticker, "cashflow")
+
+    @property
+    def balance_sheet(self):
+        return get_market_data(self.ticker, "balance_sheet")
+
+    @property
+    def info(self):
+        return get_market_data(self.ticker, "info")
+
+
+class RateLimiter:
+    """Thread-safe limiter: at most `rate` acquisitions per second, evenly spaced."""
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self.interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def fetch_many(fn, tickers, max_workers: int = 8, rate_limit: float = None, retries: int = 2, backoff: float = 0.5):
+    """
+    Call fn(ticker) for every ticker on a bounded thread pool.
+
+    rate_limit: max ticker calls started per second (None = unlimited)
+    retries:    extra attempts per ticker, waiting backoff * 2**attempt between them;
+                offline cache misses (LookupError) and bad input (ValueError) are not retried
+
+    Returns a list of (ticker, result, error) in input order; error is None
+    on success and the final exception message otherwise.
+    """
+    limiter = RateLimiter(rate_limit) if rate_limit else None
+
+    def attempt(ticker):
+        for i in range(retries + 1):
+            if limiter:
+                limiter.acquire()
+            try:
+                return ticker, fn(ticker), None
+            except (LookupError, ValueError) as e:
+                return ticker, None, f"{type(e).__name__}: {e}"
+            except Exception as e:
+                if i == retries:
+                    return ticker, None, f"{type(e).__name__}: {e}"
+                time.sleep(backoff * 2 ** i)
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return list(pool.map(attempt, tickers))
@@ -0,0 +1,232 @@
+# monte_carlo_utils.py
+"""
+Monte Carlo valuation on top of the vectorized DCF engine in forecast_utils.
+
+Business role:
+- Put a distribution on each forecast assumption (normal, triangular,
+  uniform, or empirical from industry history).
+- Simulate millions of EV paths with a fixed seed, chunk by chunk.
+- Report EV mean, spread, quantiles and probability of loss without ever
+  holding all paths in memory (exact streaming moments + mergeable
+  quantile sketch).
+"""
+
+import math
+import numpy as np
+
+from forecast_utils import (
+    FORECAST_ASSUMPTIONS, DEFAULT_ASSUMPTIONS,
+    _assumption_arrays, _forecast_arrays, _valuation_arrays,
+    get_industry_metrics, get_industry_history
+)
+
+
+class StreamingMoments:
+    """
+    Exact count / mean / variance / min / max over chunks.
+    Chunks are combined with Chan's parallel update, so two instances
+    built on different workers can be merged.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        other = StreamingMoments()
+        other.count = values.size
+        if other.count == 0:
+            return self
+        other.mean = float(values.mean())
+        other.m2 = float(((values - other.mean) ** 2).sum())
+        other.min = float(values.min())
+        other.max = float(values.max())
+        return self.merge(other)
+
+    def merge(self, other):
+        if other.count == 0:
+            return self
+        n = self.count + other.count
+        delta = other.mean - self.mean
+        self.m2 += other.m2 + delta ** 2 * self.count * other.count / n
+        self.mean += delta * other.count / n
+        self.count = n
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    @property
+    def std(self):
+        return math.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+class QuantileSketch:
+    """
+    Mergeable quantile sketch with relative-error guarantee (DDSketch-style).
+
+    Values are counted in logarithmic buckets, so any quantile is returned
+    within `relative_accuracy` of the true value. Memory depends on the
+    dynamic range of the data, not on the number of values.
+    """
+
+    def __init__(self, relative_accuracy=0.005):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero = 0
+        self.count = 0
+
+    def _add_buckets(self, store, magnitudes):
+        keys = np.ceil(np.log(magnitudes) / self._log_gamma).astype(np.int64)
+        idx, counts = np.unique(keys, return_counts=True)
+        for k, c in zip(idx.tolist(), counts.tolist()):
+            store[k] = store.get(k, 0) + c
+
+    def update(self, values):
+        values = np.asarray(values, dtype=float)
+        values = values[np.isfinite(values)]
+        self.count += values.size
+        self.zero += int((values == 0).sum())
+        if (values > 0).any():
+            self._add_buckets(self.positive, values[values > 0])
+        if (values < 0).any():
+            self._add_buckets(self.negative, -values[values < 0])
+        return self
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("Cannot merge sketches with different relative accuracy.")
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for k, c in other_store.items():
+                store[k] = store.get(k, 0) + c
+        self.zero += other.zero
+        self.count += other.count
+        return self
+
+    def _bucket_value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def quantile(self, q):
+        if self.count == 0:
+            return math.nan
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._bucket_value(key)
+        seen += self.zero
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._bucket_value(key)
+        return self._bucket_value(max(self.positive))
+
+
+def _sample(spec, rng, size):
+    """
+    Draw `size` values for one assumption.
+
+    spec is either a constant or a dict:
+      {"dist": "normal", "mean": m, "std": s}
+      {"dist": "triangular", "left": a, "mode": c, "right": b}
+      {"dist": "uniform", "low": a, "high": b}
+      {"dist": "empirical", "values": [...]}
+    """
+    if not isinstance(spec, dict):
+        return np.full(size, float(spec))
+
+    dist = spec.get("dist")
+    if dist == "normal":
+        return rng.normal(spec["mean"], spec["std"], size)
+    if dist == "triangular":
+        return rng.triangular(spec["left"], spec["mode"], spec["right"], size)
+    if dist == "uniform":
+        return rng.uniform(spec["low"], spec["high"], size)
+    if dist == "empirical":
+        return rng.choice(np.asarray(spec["values"], dtype=float), size)
+    raise ValueError(f"Unknown distribution '{dist}'. Choose from normal, triangular, uniform, empirical.")
+
+
+def monte_carlo_forecast(
+    distributions: dict,
+    revenue=1_000_000,
+    years=5,
+    n_paths=1_000_000,
+    seed=42,
+    chunk_size=100_000,
+    quantiles=(0.05, 0.25, 0.5, 0.75, 0.95),
+    loss_threshold=0.0,
+    relative_accuracy=0.005
+):
+    """
+    Simulate EV/NPV paths for financial_forecast in fixed-size chunks.
+
+    distributions: {assumption: constant or distribution spec} (see _sample);
+                   missing assumptions use DEFAULT_ASSUMPTIONS.
+    The same seed and chunk_size always give the same result.
+
+    Returns a dict with paths, EV mean/std/min/max, EV quantiles
+    (within relative_accuracy), mean NPV and probability that EV is
+    below loss_threshold. Paths whose EV or NPV is not finite (e.g. a
+    discount rate equal to terminal growth) are left out of every
+    statistic and counted in excluded_paths.
+    """
+    rng = np.random.default_rng(seed)
+    ev_moments = StreamingMoments()
+    npv_moments = StreamingMoments()
+    sketch = QuantileSketch(relative_accuracy)
+    losses = excluded = 0
+
+    for start in range(0, n_paths, chunk_size):
+        size = min(chunk_size, n_paths - start)
+        draws = {k: _sample(distributions.get(k, DEFAULT_ASSUMPTIONS[k]), rng, size) for k in FORECAST_ASSUMPTIONS}
+
+        a = _assumption_arrays(draws, revenue=revenue)
+        f = _forecast_arrays(a, years)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ev, npv = _valuation_arrays(a, f, years)
+        finite = np.isfinite(ev) & np.isfinite(npv)
+        if not finite.all():
+            excluded += int(size - finite.sum())
+            ev, npv = ev[finite], npv[finite]
+
+        ev_moments.update(ev)
+        npv_moments.update(npv)
+        sketch.update(ev)
+        losses += int((ev < loss_threshold).sum())
+
+    return {
+        "paths": ev_moments.count,
+        "excluded_paths": excluded,
+        "ev_mean": round(ev_moments.mean, 2),
+        "ev_std": round(ev_moments.std, 2),
+        "ev_min": round(ev_moments.min, 2),
+        "ev_max": round(ev_moments.max, 2),
+        "ev_quantiles": {q: round(sketch.quantile(q), 2) for q in quantiles},
+        "npv_mean": round(npv_moments.mean, 2),
+        "prob_loss": losses / ev_moments.count if ev_moments.count else math.nan
+    }
+
+
+def monte_carlo_with_industry(revenue: float, years: int, industry: str, n_paths=1_000_000, seed=42, **kwargs):
+    """
+    Wrapper: empirical distributions from the industry's reported history,
+    industry point estimates for everything else, then monte_carlo_forecast.
+    """
+    metrics = get_industry_metrics(industry)
+    history = get_industry_history(industry)
+
+    distributions = dict(metrics)
+    for k, values in history.items():
+        distributions[k] = {"dist": "empirical", "values": values.to_numpy()}
+
+    return monte_carlo_forecast(distributions, revenue=revenue, years=years, n_paths=n_paths, seed=seed, **kwargs)
@@ -1,42 +1,183 @@
 import os
+import json
+import atexit
+import shutil
+import threading
 import pandas as pd
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
-OUTPUT_FOLDER = r"C:\Users\Dell\Documents\Data Analysis Output"
+OUTPUT_FOLDER = os.environ.get("ANALYSIS_OUTPUT_FOLDER", r"C:\Users\Dell\Documents\Data Analysis Output")
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
-def save_output(df, filepath, analysis_type):
+FORMATS = ("csv", "parquet", "feather")
+DEFAULT_COMPRESSION = {"csv": None, "parquet": "zstd", "feather": "zstd"}
+
+_settings = {
+    "format": os.environ.get("ANALYSIS_OUTPUT_FORMAT", "csv").strip().lower(),
+    "compression": None,
+    "background": False
+}
+_writer = None
+_pending = []
+_pending_lock = threading.Lock()
+
+
+def configure_output(fmt: str = None, compression: str = None, background: bool = None):
+    """
+    Change the defaults used by save_output.
+
+    fmt:         "csv" (default), "parquet" or "feather"
+    compression: codec for the chosen format (e.g. "zstd", "snappy", "gzip");
+                 None keeps DEFAULT_COMPRESSION
+    background:  True = write files on a background thread (see flush_outputs)
+    """
+    if fmt is not None:
+        if fmt not in FORMATS:
+            raise ValueError(f"Output format '{fmt}' not supported. Choose from {list(FORMATS)}")
+        _settings["format"] = fmt
+    if compression is not None:
+        _settings["compression"] = compression
+    if background is not None:
+        _settings["background"] = background
+
+
+def _tmp_name(path: str) -> str:
+    return f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+
+
+def _write_frame(df, path, fmt, compression=None, partition_cols=None):
+    """Write df to a temp file/folder, then rename it over `path` in one step."""
+    tmp = _tmp_name(path)
+    if fmt == "csv":
+        df.to_csv(tmp, index=False, compression=compression)
+    elif fmt == "feather":
+        df.reset_index(drop=True).to_feather(tmp, compression=compression)
+    elif partition_cols:
+        df.to_parquet(tmp, index=False, compression=compression, partition_cols=partition_cols)
+    else:
+        df.to_parquet(tmp, index=False, compression=compression)
+
+    if os.path.isdir(tmp):
+        # a directory cannot be replaced atomically when the target exists:
+        # swap the old one aside first, then remove it
+        old = None
+        if os.path.exists(path):
+            old = _tmp_name(path) + ".old"
+            os.replace(path, old)
+        os.replace(tmp, path)
+        if old:
+            shutil.rmtree(old, ignore_errors=True)
+    else:
+        os.replace(tmp, path)
+
+
+def _write_summary(summary: dict, path: str):
+    tmp = _tmp_name(path)
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(summary, fh, indent=1, default=float)
+    os.replace(tmp, path)
+
+
+def _submit(fn, *args, **kwargs):
+    global _writer
+    with _pending_lock:
+        if _writer is None:
+            # one writer thread keeps files for the same output in order
+            _writer = ThreadPoolExecutor(max_workers=1)
+        future = _writer.submit(fn, *args, **kwargs)
+        _pending.append(future)
+    return future
+
+
+def flush_outputs():
+    """Wait for background writes to finish; re-raises the first write error."""
+    with _pending_lock:
+        futures = list(_pending)
+        _pending.clear()
+    for future in futures:
+        future.result()
+
+
+atexit.register(flush_outputs)
+
+
+def save_output(df, filepath, analysis_type, archive=None, interactive=True,
+                fmt=None, compression=None, partition_cols=None, summary=None, background=None):
     """
     Always saves a fixed live dashboard file.
     Optionally saves a separate timestamped file if user wants.
+
+    archive: True/False skips the prompt; with interactive=False a missing
+             choice means no archive file. Returns the live file path.
+    fmt / compression / background: override configure_output defaults
+    partition_cols: Parquet only — write a folder partitioned by these columns
+    summary: scalar results (e.g. a correlation or t-test) saved next to the
+             output as <name>_summary.json instead of one column per row;
+             defaults to df.attrs["summary"] when set. Without one, a
+             summary left by an earlier save of the same output is removed.
+
+    Files are written to a temp name and renamed, so readers never see a
+    half-written output. With background=True the call returns at once;
+    call flush_outputs() to wait for the files. The write works on a
+    snapshot (copy-on-write), so the caller may keep changing df meanwhile.
     """
+    fmt = fmt or _settings["format"]
+    if fmt not in FORMATS:
+        raise ValueError(f"Output format '{fmt}' not supported. Choose from {list(FORMATS)}")
+    if partition_cols and fmt != "parquet":
+        raise ValueError("partition_cols is only supported with fmt='parquet'")
+    compression = compression or _settings["compression"] or DEFAULT_COMPRESSION[fmt]
+    background = _settings["background"] if background is None else background
+    summary = summary if summary is not None else df.attrs.get("summary")
+    if background:
+        df, summary = df.copy(deep=False), dict(summary or {})
 
     # Extract input file name
-    input_name = os.path.splitext(os.path.basename(filepath))[0]
+    input_name = os.path.splitext(os.path.basename(filepath))[0] if filepath else "latest"
 
     # Build filenames
     timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-    archive_filename = f"{input_name}_{analysis_type}_output_{timestamp}.csv"
-    fixed_filename = f"{input_name}_{analysis_type}_output.csv"
+    archive_filename = f"{input_name}_{analysis_type}_output_{timestamp}.{fmt}"
+    fixed_filename = f"{input_name}_{analysis_type}_output.{fmt}"
+    fixed_path = os.path.join(OUTPUT_FOLDER, fixed_filename)
+
+    def write(path, name, message):
+        _write_frame(df, path, fmt, compression, partition_cols)
+        summary_path = os.path.splitext(path)[0] + "_summary.json"
+        if summary:
+            _write_summary(summary, summary_path)
+        elif os.path.exists(summary_path):
+            os.remove(summary_path)
+        print(message.format(name))
+
+    def dispatch(path, name, message):
+        if background:
+            _submit(write, path, name, message)
+        else:
+            write(path, name, message)
 
     # ✅ Always save fixed live dashboard file (no question asked)
-    df.to_csv(os.path.join(OUTPUT_FOLDER, fixed_filename), index=False)
-    print(f"✅ Updated live dashboard file: {fixed_filename}")
+    dispatch(fixed_path, fixed_filename, "✅ Updated live dashboard file: {}")
 
     # ✅ Ask only if user wants a separate archive file
-    choice = input(
-        "\nDo you want to save a separate timestamped file?\n"
-        "1 = Yes (create archive file)\n"
-        "2 = No (only update live dashboard)\n"
-        "Enter choice: "
-    ).strip()
+    if archive is None and interactive:
+        choice = input(
+            "\nDo you want to save a separate timestamped file?\n"
+            "1 = Yes (create archive file)\n"
+            "2 = No (only update live dashboard)\n"
+            "Enter choice: "
+        ).strip()
+    else:
+        choice = "1" if archive else "2"
 
     if choice == "1":
-        df.to_csv(os.path.join(OUTPUT_FOLDER, archive_filename), index=False)
-        print(f"✅ Saved archive file: {archive_filename}")
+        dispatch(os.path.join(OUTPUT_FOLDER, archive_filename), archive_filename, "✅ Saved archive file: {}")
 
     elif choice == "2":
         print("✅ No archive file created.")
 
     else:
         print("⚠️ Invalid choice. Only live dashboard file saved.")
+
+    return fixed_path
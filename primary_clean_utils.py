@@ -1,6 +1,14 @@
+import time
+import numpy as np
 import pandas as pd
 
-def clean_dataframe(df):
+try:
+    import pyarrow  # noqa: F401  (optional: Arrow-backed strings in compact_dataframe)
+    ARROW_STRING = pd.StringDtype("pyarrow", na_value=np.nan)
+except ImportError:
+    ARROW_STRING = None
+
+def clean_dataframe(df, compact=False):
     """
     General-purpose cleaning function for any DataFrame.
     Steps:
@@ -9,6 +17,7 @@ def clean_dataframe(df):
     3. Drop duplicate rows.
     4. Handle missing values (optional: fill with 0 or drop).
     5. Convert numeric-looking columns to numeric dtype.
+    6. Optional (compact=True): memory-compact dtypes, see compact_dataframe.
     """
     # Normalize column names
     df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
@@ -34,6 +43,318 @@ def clean_dataframe(df):
         except Exception:
             pass
 
-    return df
+    return compact_dataframe(df) if compact else df
+
+
+def _strip_strings(series):
+    """
+    Vectorized strip that leaves non-string cells untouched (like the per-cell map).
+    Low-cardinality object columns are stripped once per distinct value
+    and expanded back through the factorized codes.
+    """
+    if pd.api.types.infer_dtype(series, skipna=True) != "string":
+        is_str = series.map(type).eq(str)
+        out = series.copy()
+        if is_str.any():
+            out[is_str] = series[is_str].str.strip()
+        return out.infer_objects()
+
+    if series.dtype != object:
+        # Native string dtype: strip already runs in compiled code
+        return series.str.strip()
+
+    codes, uniques = pd.factorize(series)
+    if len(uniques) > len(series) // 2:
+        return series.str.strip().infer_objects()
+
+    stripped = np.asarray(pd.Index(uniques).str.strip(), dtype=object).take(codes)
+    return pd.Series(stripped, index=series.index, name=series.name).where(codes != -1, series).infer_objects()
+
+
+def _maybe_numeric(series, sample_size):
+    """
+    Cheap rejection from a sample: one unparsable value means the full
+    pd.to_numeric would raise, so the column stays as-is.
+    """
+    sample = series.dropna().head(sample_size)
+    return bool(pd.to_numeric(sample, errors="coerce").notna().all())
+
+
+def _to_numeric_distinct(series):
+    """
+    pd.to_numeric on the distinct values only, expanded back through the
+    factorized codes. Raises exactly when the full conversion would.
+    """
+    codes, uniques = pd.factorize(series)
+    converted = pd.to_numeric(pd.Series(uniques)).to_numpy()
+    if (codes == -1).any():
+        converted = np.append(converted.astype(float), np.nan)
+    return pd.Series(converted.take(codes), index=series.index, name=series.name)
+
+
+def clean_dataframe_fast(df, sample_size=1_000, compact=False):
+    """
+    Same result as clean_dataframe, with fewer and cheaper passes:
+    - whitespace stripped with vectorized string ops instead of a per-cell map
+    - numeric NA filled in one operation
+    - numeric candidates picked from a sample, then converted once per
+      distinct value
+    The caller's DataFrame is not modified.
+    """
+    df = df.copy(deep=False)
+    df.columns = df.columns.str.strip().str.lower().str.replace(" ", "_")
+
+    for col in df.select_dtypes(include="object").columns:
+        df[col] = _strip_strings(df[col])
+
+    df = df.drop_duplicates()
+    df = df.dropna(how="all")
+
+    num_cols = df.select_dtypes(include="number").columns
+    if len(num_cols):
+        df[num_cols] = df[num_cols].fillna(0)
+
+    text_cols = set(df.select_dtypes(include="object").columns)
+    for col in df.columns:
+        try:
+            if col not in text_cols:
+                df[col] = pd.to_numeric(df[col])
+            elif _maybe_numeric(df[col], sample_size):
+                df[col] = _to_numeric_distinct(df[col])
+        except Exception:
+            pass
+
+    return compact_dataframe(df) if compact else df
+
+
+def _is_text(series):
+    return series.dtype == object or isinstance(series.dtype, pd.StringDtype)
+
+
+def _compact_column(series, category_ratio, arrow_strings, downcast_numeric=False):
+    """Compact dtype for one column; anything it cannot narrow losslessly is returned unchanged."""
+    if downcast_numeric and series.dtype.kind in "iu":
+        return pd.to_numeric(series, downcast="integer" if series.dtype.kind == "i" else "unsigned")
+    if downcast_numeric and series.dtype == np.float64:
+        narrow = series.astype(np.float32)  # keeps NaN and the sign of zeros
+        same = np.array_equal(narrow.to_numpy(dtype=np.float64), series.to_numpy(), equal_nan=True)
+        return narrow if same else series
+    if not _is_text(series) or pd.api.types.infer_dtype(series, skipna=True) not in ("string", "empty"):
+        return series
+    distinct = series.nunique(dropna=True)
+    if len(series) and distinct <= category_ratio * len(series):
+        return series.astype("category")
+    if arrow_strings and ARROW_STRING is not None:
+        if series.dtype == object:
+            return series.astype(ARROW_STRING)
+        if series.dtype.storage == "python":  # pandas' StringDtype without pyarrow storage
+            return series.astype(pd.StringDtype("pyarrow", na_value=series.dtype.na_value))
+    return series
+
+
+def compact_dataframe(df, category_ratio=0.5, arrow_strings=True, downcast_numeric=False):
+    """
+    Memory-compact copy of a cleaned frame, without changing any value:
+    - string columns with at most category_ratio distinct values per row
+      become categoricals; other object / python-backed string columns
+      become Arrow strings (arrow_strings=True and pyarrow installed;
+      pandas 3 text already is)
+    - downcast_numeric=True: integers shrink to the smallest type holding
+      their values, float64 becomes float32 only when every value
+      round-trips exactly. Off by default: arithmetic on the narrow types
+      overflows (int16 units * units) or rounds (float32 results), so only
+      use it for frames that are stored or grouped, not computed on.
+    Mixed-type object columns, bools and datetimes are left as they are.
+    The caller's DataFrame is not modified; see memory_report for the saving.
+    """
+    out = df.copy(deep=False)
+    for col in out.columns:
+        out[col] = _compact_column(out[col], category_ratio, arrow_strings, downcast_numeric)
+    return out
+
+
+def memory_report(before, after):
+    """
+    Per-column memory (deep, bytes) and dtype before / after compaction,
+    with a "(total)" row last. Prints the total saving.
+    """
+    b, a = before.memory_usage(deep=True, index=False), after.memory_usage(deep=True, index=False)
+    report = pd.DataFrame({
+        "column": list(before.columns),
+        "dtype_before": [str(t) for t in before.dtypes],
+        "dtype_after": [str(after[c].dtype) if c in after.columns else None for c in before.columns],
+        "bytes_before": b.to_numpy(),
+        "bytes_after": a.reindex(b.index).to_numpy()
+    })
+    total = pd.DataFrame([{"column": "(total)", "dtype_before": None, "dtype_after": None,
+                           "bytes_before": int(b.sum()), "bytes_after": int(a.sum())}])
+    report = pd.concat([report, total], ignore_index=True)
+    report["saved_pct"] = 100 * (1 - report["bytes_after"] / report["bytes_before"].replace(0, np.nan))
+    print(f"✅ Memory: {b.sum() / 1e6:,.1f} MB -> {a.sum() / 1e6:,.1f} MB "
+          f"({report['saved_pct'].iloc[-1]:.0f}% smaller)")
+    return report
+
+
+def _synthetic_messy_frame(n_rows, n_cols, seed=0):
+    """Mixed frame for benchmarking: padded strings, numeric strings, floats with NA, ints."""
+    rng = np.random.default_rng(seed)
+    words = np.array(["  north", "south ", " east ", "west", "central  "], dtype=object)
+    numeric_text = np.array([" 1", "2 ", "3", " 4 ", "5"], dtype=object)
+    cols = {}
+    for i in range(n_cols):
+        kind = i % 4
+        if kind == 0:
+            cols[f"Text Col {i}"] = words[rng.integers(0, len(words), n_rows)]
+        elif kind == 1:
+            values = rng.normal(100, 20, n_rows)
+            values[rng.random(n_rows) < 0.05] = np.nan
+            cols[f"Float Col {i}"] = values
+        elif kind == 2:
+            cols[f"Int Col {i}"] = rng.integers(0, 1_000, n_rows)
+        else:
+            cols[f"Num Text {i}"] = numeric_text[rng.integers(0, len(numeric_text), n_rows)]
+    return pd.DataFrame(cols)
+
+
+def benchmark_clean(n_rows=10_000_000, n_cols=50, seed=0):
+    """Time clean_dataframe vs clean_dataframe_fast on synthetic data and check the outputs match."""
+    df = _synthetic_messy_frame(n_rows, n_cols, seed)
+
+    start = time.perf_counter()
+    fast = clean_dataframe_fast(df)
+    fast_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    reference = clean_dataframe(df.copy())
+    reference_seconds = time.perf_counter() - start
+
+    pd.testing.assert_frame_equal(reference, fast)
+    return pd.DataFrame([
+        {"Rows": n_rows, "Columns": n_cols, "Method": "clean_dataframe", "Seconds": reference_seconds},
+        {"Rows": n_rows, "Columns": n_cols, "Method": "clean_dataframe_fast", "Seconds": fast_seconds},
+    ]).assign(Speedup=lambda t: reference_seconds / t["Seconds"])
+
+
+class _RowHashSet:
+    """
+    Compact set of 64-bit row hashes for cross-chunk dedup.
+    Hashes live in a few sorted uint64 runs that are merged as they grow
+    (log-structured), so memory is 8 bytes per unique row and inserts stay
+    amortised O(n log n).
+    """
+
+    def __init__(self):
+        self.runs = []
+
+    def contains(self, hashes):
+        found = np.zeros(len(hashes), dtype=bool)
+        for run in self.runs:
+            pos = np.searchsorted(run, hashes).clip(max=len(run) - 1)
+            found |= run[pos] == hashes
+        return found
+
+    def add(self, hashes):
+        if len(hashes) == 0:
+            return
+        self.runs.append(np.unique(hashes))
+        while len(self.runs) > 1 and len(self.runs[-2]) <= 2 * len(self.runs[-1]):
+            last = self.runs.pop()
+            self.runs[-1] = np.union1d(self.runs[-1], last)
+
+    def __len__(self):
+        return sum(len(run) for run in self.runs)
+
+
+def _normalize_columns(columns):
+    return pd.Index(columns).str.strip().str.lower().str.replace(" ", "_")
+
+
+def _strip_chunk(chunk):
+    for col in chunk.columns:
+        chunk[col] = chunk[col].str.strip()
+    return chunk
+
+
+def scan_csv_column_types(input_path, chunksize=500_000, **read_csv_kwargs):
+    """
+    One streaming pass deciding each column's final dtype, so every chunk
+    is converted the same way:
+      - "int64":   numeric everywhere, integers only, never missing
+      - "float64": numeric everywhere (missing values become 0 later)
+      - "object":  anything else stays string
+    """
+    numeric, integer, has_na = {}, {}, {}
+    for chunk in pd.read_csv(input_path, dtype=str, chunksize=chunksize, **read_csv_kwargs):
+        chunk.columns = _normalize_columns(chunk.columns)
+        chunk = _strip_chunk(chunk)
+        for col in chunk.columns:
+            values = chunk[col].dropna()
+            converted = pd.to_numeric(values, errors="coerce")
+            numeric[col] = numeric.get(col, True) and bool(converted.notna().all())
+            integer[col] = integer.get(col, True) and pd.api.types.is_integer_dtype(converted)
+            has_na[col] = has_na.get(col, False) or len(values) < len(chunk)
+
+    return {
+        col: ("object" if not is_num else "int64" if integer[col] and not has_na[col] else "float64")
+        for col, is_num in numeric.items()
+    }
+
+
+def clean_csv_streaming(input_path, output_path, chunksize=500_000, column_types=None, **read_csv_kwargs):
+    """
+    clean_dataframe for CSVs larger than RAM.
+
+    Reads `input_path` in chunks, applies the same normalisation as
+    clean_dataframe, drops duplicates across the whole file with a compact
+    row-hash set, and appends each cleaned chunk to `output_path`. Peak
+    memory is one chunk plus 8 bytes per unique row.
+
+    column_types: {column: "int64" | "float64" | "object"}; when omitted a
+                  first pass (scan_csv_column_types) decides them for the
+                  whole file.
+
+    Returns a summary dict (rows_in, rows_out, duplicates_dropped,
+    empty_dropped, column_types).
+    """
+    if column_types is None:
+        column_types = scan_csv_column_types(input_path, chunksize=chunksize, **read_csv_kwargs)
+    numeric_cols = [c for c, t in column_types.items() if t != "object"]
+
+    seen = _RowHashSet()
+    summary = {"rows_in": 0, "rows_out": 0, "duplicates_dropped": 0, "empty_dropped": 0}
+    header = True
+
+    for chunk in pd.read_csv(input_path, dtype=str, chunksize=chunksize, **read_csv_kwargs):
+        summary["rows_in"] += len(chunk)
+        chunk.columns = _normalize_columns(chunk.columns)
+        chunk = _strip_chunk(chunk)
+
+        # file-wide dtype before hashing: 1 (int) and 1.0 (float) hash differently
+        for col in numeric_cols:
+            chunk[col] = pd.to_numeric(chunk[col]).astype("float64" if column_types[col] == "float64" else "int64")
+
+        # Drop duplicates (within the chunk and against earlier chunks)
+        hashes = pd.util.hash_pandas_object(chunk, index=False).to_numpy()
+        keep = ~pd.Series(hashes).duplicated().to_numpy() & ~seen.contains(hashes)
+        seen.add(hashes[keep])
+        summary["duplicates_dropped"] += int((~keep).sum())
+        chunk = chunk[keep]
+
+        # Drop fully empty rows
+        before = len(chunk)
+        chunk = chunk.dropna(how="all")
+        summary["empty_dropped"] += before - len(chunk)
+
+        # Fill numeric NA with 0 and pin the file-wide dtype
+        chunk = chunk.fillna({c: 0 for c in numeric_cols}).astype({c: column_types[c] for c in numeric_cols})
+
+        chunk.to_csv(output_path, mode="w" if header else "a", header=header, index=False)
+        header = False
+        summary["rows_out"] += len(chunk)
+
+    summary["column_types"] = column_types
+    return summary
 
 
+if __name__ == "__main__":
+    print(benchmark_clean().to_string(index=False))
@@ -0,0 +1,129 @@
+# sensitivity_utils.py
+"""
+Sensitivity tables around financial_forecast.
+
+Business role:
+- WACC x terminal-growth, growth x margin (or any 2-3 assumptions) grids
+  for the valuation pack, without calling financial_forecast per cell.
+- Tornado-chart data: EV swing when each assumption moves low -> high.
+
+How: the yearly free-cash-flow stream depends only on the operating
+assumptions (growth, margins, tax, capex, working capital). It is built once
+per operating combination with the vectorized engine in forecast_utils; the
+discount rate and terminal growth only enter through discount factors, so
+EV for every cell is one matrix product:
+
+    EV[op, disc] = FCF[op, :] @ DF[disc, :] + FCF_last[op] * TV_factor[disc]
+"""
+
+import numpy as np
+import pandas as pd
+
+from forecast_utils import (
+    FORECAST_ASSUMPTIONS, DEFAULT_ASSUMPTIONS,
+    _assumption_arrays, _forecast_arrays, financial_forecast_batch
+)
+
+DISCOUNT_ASSUMPTIONS = ("discount_rate", "terminal_growth")
+
+
+def _ev_grid(base: dict, axes: dict, revenue, years):
+    """EV array shaped like the axes grid (one dimension per axis, in order)."""
+    names = list(axes)
+    values = [np.atleast_1d(np.asarray(axes[k], dtype=float)) for k in names]
+    op_names = [k for k in names if k not in DISCOUNT_ASSUMPTIONS]
+    disc_names = [k for k in names if k in DISCOUNT_ASSUMPTIONS]
+
+    # Operating side: one FCF stream per combination of the operating axes
+    op_grid = np.meshgrid(*[values[names.index(k)] for k in op_names], indexing="ij") if op_names else []
+    op = {**base, **{k: g.ravel() for k, g in zip(op_names, op_grid)}}
+    f = _forecast_arrays(_assumption_arrays(op, revenue=revenue), years)
+    fcf = f["Free Cash Flow"]  # (n_op, years)
+
+    # Discount side: one discount-factor row per (discount_rate, terminal_growth) pair
+    disc_grid = np.meshgrid(*[values[names.index(k)] for k in disc_names], indexing="ij") if disc_names else []
+    disc = {k: np.asarray(base[k], dtype=float) for k in DISCOUNT_ASSUMPTIONS}
+    disc.update({k: g.ravel() for k, g in zip(disc_names, disc_grid)})
+    r, tg = np.broadcast_arrays(np.atleast_1d(disc["discount_rate"]), np.atleast_1d(disc["terminal_growth"]))
+    year = np.arange(1, years + 1)
+    discount_factors = (1 + r[:, None]) ** -year  # (n_disc, years)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        tv_factor = np.where(r > tg, (1 + tg) / (r - tg), np.nan) * discount_factors[:, -1]
+
+    ev = fcf @ discount_factors.T + fcf[:, -1:] * tv_factor[None, :]  # (n_op, n_disc)
+
+    # Back to one axis per assumption, in the caller's order
+    shape = [len(values[names.index(k)]) for k in op_names + disc_names]
+    ev = ev.reshape(shape)
+    order = [(op_names + disc_names).index(k) for k in names]
+    return np.transpose(ev, order), values
+
+
+def sensitivity_grid(axes: dict, assumptions: dict = None, revenue=1_000_000, years=5):
+    """
+    EV over a 2-D or 3-D grid of assumptions in one broadcast.
+
+    axes:        {assumption: values}, 2 or 3 entries (FORECAST_ASSUMPTIONS names),
+                 e.g. {"discount_rate": [0.10, 0.11, 0.12], "terminal_growth": [0.02, 0.03]}
+    assumptions: base case for everything not on an axis (defaults to
+                 DEFAULT_ASSUMPTIONS)
+    Cells where discount_rate <= terminal_growth have no terminal value and are NaN.
+
+    Returns a dict:
+      - grid:   pivoted DataFrame (first axis as rows, last axis as columns;
+                for 3-D the first two axes form a MultiIndex on the rows)
+      - values: the raw EV ndarray, one dimension per axis
+      - base_enterprise_value: EV at the base case
+    """
+    unknown = set(axes) - set(FORECAST_ASSUMPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown assumptions {sorted(unknown)}. Choose from {FORECAST_ASSUMPTIONS}")
+    if len(axes) not in (2, 3):
+        raise ValueError("sensitivity_grid needs 2 or 3 axes.")
+
+    base = {**DEFAULT_ASSUMPTIONS, **(assumptions or {})}
+    ev, values = _ev_grid(base, axes, revenue, years)
+    names = list(axes)
+
+    if len(names) == 2:
+        grid = pd.DataFrame(ev, index=pd.Index(values[0], name=names[0]), columns=pd.Index(values[1], name=names[1]))
+    else:
+        rows = pd.MultiIndex.from_product([values[0], values[1]], names=names[:2])
+        grid = pd.DataFrame(ev.reshape(-1, len(values[2])), index=rows, columns=pd.Index(values[2], name=names[2]))
+
+    _, base_ev, _ = financial_forecast_batch(base, revenue=revenue, years=years)
+    return {"grid": grid, "values": ev, "base_enterprise_value": float(base_ev[0])}
+
+
+def tornado_data(ranges: dict, assumptions: dict = None, revenue=1_000_000, years=5) -> pd.DataFrame:
+    """
+    EV swing for each assumption moved to its low and high value, all
+    other assumptions at the base case (one batched forecast for all cases).
+
+    ranges: {assumption: (low, high)}
+    Returns assumption, low, high, ev_low, ev_high, swing, sorted by swing
+    (largest first) — ready for a tornado chart.
+    """
+    unknown = set(ranges) - set(FORECAST_ASSUMPTIONS)
+    if unknown:
+        raise ValueError(f"Unknown assumptions {sorted(unknown)}. Choose from {FORECAST_ASSUMPTIONS}")
+
+    base = {**DEFAULT_ASSUMPTIONS, **(assumptions or {})}
+    names = list(ranges)
+    cases = {k: np.full(1 + 2 * len(names), float(base[k])) for k in FORECAST_ASSUMPTIONS}
+    for i, (k, (low, high)) in enumerate(ranges.items()):
+        cases[k][1 + 2 * i] = low
+        cases[k][2 + 2 * i] = high
+
+    _, ev, _ = financial_forecast_batch(cases, revenue=revenue, years=years)
+    ev_low, ev_high = ev[1::2], ev[2::2]
+    table = pd.DataFrame({
+        "assumption": names,
+        "low": [ranges[k][0] for k in names],
+        "high": [ranges[k][1] for k in names],
+        "ev_low": ev_low,
+        "ev_high": ev_high,
+        "swing": np.abs(ev_high - ev_low)
+    })
+    table.attrs["base_enterprise_value"] = float(ev[0])
+    return table.sort_values("swing", ascending=False, ignore_index=True)
@@ -1,21 +1,281 @@
-import pandas as pd
+import json
+import hashlib
+import importlib
+import threading
+import contextvars
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
 import numpy as np
-import scipy
-import statsmodels
-import sklearn
-import openpyxl
-import yfinance as yf
-
-# Utilities
-from latest_data_utils import get_latest_data
-from primary_clean_utils import clean_dataframe
-from default_folder import load_file
-from analysis_target_entry import ask_for_columns
-from analysis_utils import prepare_regression, check_correlation, compare_groups
-from kpi_utils import valuation_kpis
-from forecast_utils import run_forecast
+import pandas as pd
 
+# Core utilities every task needs (load, clean, save). Analysis, market-data
+# and model modules are imported by the task that uses them — see TASK_REGISTRY.
+from latest_data_utils import find_latest_file
+from primary_clean_utils import clean_dataframe, compact_dataframe
+from default_folder import load_file, resolve_path
+from input_cache_utils import file_fingerprint
 from output_utils import save_output
+from instrument_utils import stage, note_shape, instrumented
+
+
+# Task registry: name -> handler, the modules it imports on first use, saved message
+TASK_REGISTRY = {}
+
+
+def register_task(name: str, modules=(), saved: str = None):
+    """
+    Register handler(df, filepath=..., interactive=..., **params) as a task.
+    `modules` lists what the handler imports, so callers can preload a task
+    (import_task) or measure its start-up cost without running it.
+    """
+    def decorator(fn):
+        TASK_REGISTRY[name] = {"handler": fn, "modules": tuple(modules), "saved": saved}
+        return fn
+    return decorator
+
+
+def import_task(task: str):
+    """Import every module a task declares (e.g. to warm a long-running process)."""
+    for module in TASK_REGISTRY[task]["modules"]:
+        importlib.import_module(module)
+
+
+# Memoized stage outputs, keyed by (stage, input fingerprint, parameters).
+# Bounded by entries and by bytes: the warm service keeps whole frames here.
+STAGE_CACHE_MAX = 32
+STAGE_CACHE_MAX_BYTES = 512 * 1024 ** 2
+_stage_cache = OrderedDict()
+_stage_sizes = {}
+_stage_lock = threading.Lock()
+
+
+def _key_part(value):
+    """json.dumps default: arrays and frames by content; other objects are not memoized."""
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        digest = hashlib.sha1(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+        digest.update(repr(list(value.columns) if isinstance(value, pd.DataFrame) else value.name).encode())
+        return f"{type(value).__name__}:{value.shape}:{digest.hexdigest()}"
+    if isinstance(value, np.ndarray):
+        data = value if value.dtype != object else np.array([repr(v) for v in value.ravel()])
+        digest = hashlib.sha1(np.ascontiguousarray(data).tobytes()).hexdigest()
+        return f"ndarray:{value.dtype}:{value.shape}:{digest}"
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"cannot key on {type(value).__name__}")
+
+
+def _nbytes(value) -> int:
+    """Approximate memory held by a cached stage output."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, dict):
+        return sum(_nbytes(v) for v in value.values())
+    if isinstance(value, (list, tuple)):
+        return sum(_nbytes(v) for v in value)
+    return 0
+
+
+def _memoize(stage: str, key, fn):
+    """
+    Return the cached output of `stage` for `key`, computing it once.
+    Keys that cannot be hashed by content, and outputs larger than
+    STAGE_CACHE_MAX_BYTES, are computed without caching.
+    """
+    try:
+        key = (stage, json.dumps(key, sort_keys=True, default=_key_part))
+    except (TypeError, ValueError):
+        return fn()
+    with _stage_lock:
+        if key in _stage_cache:
+            _stage_cache.move_to_end(key)
+            return _stage_cache[key]
+    value = fn()
+    size = _nbytes(value)
+    if size > STAGE_CACHE_MAX_BYTES:
+        return value
+    with _stage_lock:
+        _stage_cache[key] = value
+        _stage_sizes[key] = size
+        while len(_stage_cache) > STAGE_CACHE_MAX or sum(_stage_sizes.values()) > STAGE_CACHE_MAX_BYTES:
+            old, _ = _stage_cache.popitem(last=False)
+            _stage_sizes.pop(old, None)
+    return value
+
+
+def stage_cache_bytes() -> int:
+    with _stage_lock:
+        return sum(_stage_sizes.values())
+
+
+def clear_stage_cache():
+    with _stage_lock:
+        _stage_cache.clear()
+        _stage_sizes.clear()
+
+
+def _required(value, prompt, interactive, name):
+    """Use the given value; otherwise prompt (interactive) or fail (batch)."""
+    if value is not None:
+        return value
+    if not interactive:
+        raise ValueError(f"'{name}' is required when running non-interactively.")
+    return input(prompt).strip()
+
+
+def _resolve_input(filepath: str = None) -> dict:
+    """Input fingerprint (path, size, mtime) that keys every memoized stage."""
+    if filepath is None:
+        path = find_latest_file()
+        print("✅ Auto-selected latest file")
+    else:
+        path = resolve_path(filepath)
+    return file_fingerprint(path, content_hash=False)
+
+
+def _basic_clean(df, compact=False):
+    df = clean_dataframe(df)
+    df.columns = [str(c).strip() for c in df.columns]
+    df = df.dropna(how="all")
+    return compact_dataframe(df) if compact else df
+
+
+def load_clean(filepath: str = None, fingerprint: dict = None, compact: bool = False):
+    """
+    Step 1 (load) + Step 2 (basic cleaning), memoized by input fingerprint.
+    Only the cleaned frame is cached; the raw frame is dropped after
+    cleaning, and on a cache hit the file is not read at all.
+    compact=True stores the cleaned frame with memory-compact text dtypes
+    (categoricals, Arrow strings — see compact_dataframe).
+    Returns a shallow copy, so callers may add columns freely.
+    """
+    fingerprint = fingerprint or _resolve_input(filepath)
+    path = fingerprint["path"]
+
+    def load_and_clean():
+        with stage("load", file=path):
+            raw = load_file(path)
+            print(f"✅ Loaded file: {path}")
+            note_shape(raw)
+        with stage("clean", file=path):
+            df = _basic_clean(raw, compact)
+            note_shape(df)
+        return df
+
+    df = _memoize("clean", [fingerprint, compact], load_and_clean)
+    return df.copy(deep=False)
+
+
+# -------------------------
+# CLEAN ONLY
+# -------------------------
+@register_task("clean", saved="✅ Clean results saved.")
+def _task_clean(df, **_):
+    return df
+
+
+def _ask_columns(df, predictors, target, interactive):
+    if predictors is None or target is None:
+        if not interactive:
+            raise ValueError("'predictors' and 'target' are required when running non-interactively.")
+        from analysis_target_entry import ask_for_columns
+        print("\nAvailable columns:", df.columns.tolist())
+        predictors, target = ask_for_columns(df)
+    return predictors, target
+
+
+# -------------------------
+# SCENARIO ANALYSIS (Regression)
+# -------------------------
+@register_task("scenario", modules=("analysis_utils", "analysis_target_entry"), saved="✅ Scenario analysis saved.")
+def _task_scenario(df, interactive=True, predictors=None, target=None, **_):
+    from analysis_utils import prepare_regression
+    predictors, target = _ask_columns(df, predictors, target, interactive)
+    reg = prepare_regression(df, predictors, target)
+    df["scenario_prediction"] = reg.fittedvalues
+    return df
+
+
+# -------------------------
+# RELATION FINDING (Correlation)
+# -------------------------
+@register_task("relation", modules=("analysis_utils", "analysis_target_entry"), saved="✅ Relation results saved.")
+def _task_relation(df, interactive=True, predictors=None, target=None, **_):
+    from analysis_utils import check_correlation, top_correlations
+    if not interactive and (predictors is None or target is None):
+        # no pair given: rank every numeric pair instead
+        return top_correlations(df)
+    predictors, target = _ask_columns(df, predictors, target, interactive)
+    corr, p = check_correlation(df, predictors[0], target)
+    # scalar results go to the side-car summary, not onto every row
+    df.attrs = {**df.attrs, "summary": {"correlation_value": float(corr), "correlation_p": float(p)}}
+    return df
+
+
+# -------------------------
+# REASON FINDING (Hypothesis / A/B)
+# -------------------------
+@register_task("comparison", modules=("analysis_utils",), saved="✅ Comparison results saved.")
+def _task_comparison(df, interactive=True, group_col=None, metric=None, group_a=None, group_b=None, mode=None, **_):
+    from analysis_utils import compare_groups, compare_all_groups
+    if interactive:
+        print("\nAvailable columns:", df.columns.tolist())
+    group_col = _required(group_col, "Enter grouping column: ", interactive, "group_col")
+    metric = _required(metric, "Enter metric column: ", interactive, "metric")
+    if mode is None and interactive and group_a is None:
+        mode = input("Compare two groups (Enter), every pair ('pairs') or each group vs the rest ('rest'): ").strip().lower() or None
+    if mode is not None:
+        mode = str(mode).strip().lower()
+        if mode not in ("pairs", "rest"):
+            raise ValueError(f"Unknown comparison mode '{mode}'. Choose: pairs, rest.")
+        return compare_all_groups(df, group_col, metric, mode=mode)
+    if interactive and (group_a is None or group_b is None):
+        group_values = df[group_col].dropna().unique().tolist()
+        print("Detected groups:", group_values)
+    group_a = _required(group_a, "Enter first group value: ", interactive, "group_a")
+    group_b = _required(group_b, "Enter second group value: ", interactive, "group_b")
+    t, p = compare_groups(df, group_col, metric, group_a, group_b)
+    df.attrs = {**df.attrs, "summary": {"t_value": float(t), "t_p": float(p)}}
+    return df
+
+
+# -------------------------
+# KPI VALUATION
+# -------------------------
+@register_task("kpi", modules=("kpi_utils",), saved="✅ KPI results saved.")
+def _task_kpi(df, interactive=True, ticker=None, **_):
+    from kpi_utils import valuation_kpis
+    ticker = _required(ticker, "Enter market ticker (e.g., WMT): ", interactive, "ticker")
+    return valuation_kpis(ticker)
+
+
+# -------------------------
+# 3-STATEMENT MODEL
+# -------------------------
+@register_task("model", modules=("forecast_utils",))
+def _task_model(df, filepath=None, interactive=True, assumptions=None, opening_balances=None,
+                ownership=None, forecast=None, **_):
+    # ✅ Just delegate to forecast_utils
+    from forecast_utils import run_forecast
+    return run_forecast(filepath=filepath, data=df, assumptions=assumptions,
+                        opening_balances=opening_balances, ownership=ownership,
+                        interactive=interactive, **(forecast or {}))
+
+
+def _saved_message(task: str) -> str:
+    return TASK_REGISTRY[task]["saved"] or f"✅ {task.capitalize()} results saved."
+
+
+def _analyse(task: str, df, filepath=None, interactive=True, **params):
+    """
+    Run one analysis task on a cleaned frame.
+    Returns the frame to save, or the run_forecast results for "model".
+    """
+    return TASK_REGISTRY[task]["handler"](df, filepath=filepath, interactive=interactive, **params)
 
 
 def run_task(task: str,
@@ -23,7 +283,21 @@ def run_task(task: str,
              domain: str = None,
              assumptions: dict = None,
              opening_balances: dict = None,
-             ownership: dict = None):
+             ownership: dict = None,
+             predictors: list = None,
+             target: str = None,
+             group_col: str = None,
+             metric: str = None,
+             group_a=None,
+             group_b=None,
+             mode: str = None,
+             ticker: str = None,
+             forecast: dict = None,
+             archive: bool = None,
+             interactive: bool = True,
+             trace: str = None,
+             profile: bool = False,
+             compact: bool = False):
     """
     Universal runner (NO SCHEMA, NO AUTO-CONFIG)
     Tasks:
@@ -33,105 +307,159 @@ def run_task(task: str,
         - comparison
         - kpi
         - model
+
+    Any column / group / ticker left as None is prompted for. With
+    interactive=False nothing is prompted: missing inputs, an unknown task
+    and an empty dataset raise ValueError, and the archive file is only
+    written when archive=True.
+    forecast: extra run_forecast arguments for the model task
+              (revenue, years, start_year, industry, scenarios).
+    mode:    comparison task only — None compares group_a with group_b,
+             "pairs" tests every pair of groups, "rest" each group vs the rest.
+    The loaded and cleaned frame is memoized per input file, so repeated
+    calls in one session skip Steps 1-2.
+    trace:   path for a per-stage timing / memory trace (JSON + Chrome trace);
+             profile=True also saves a cProfile of the slowest stage
+    compact: keep the cleaned frame with memory-compact text dtypes
+             (categoricals, Arrow strings); every task accepts them as they are
     """
 
     # Normalize task input
     task = (task or "").strip().lower()
 
-    # -------------------------
-    # Step 1: Load file
-    # -------------------------
-    if filepath is None:
-        df = get_latest_data()
-        print("✅ Auto-selected latest file")
-    else:
-        df = load_file(filepath)
-        print(f"✅ Loaded file: {filepath}")
+    if task not in TASK_REGISTRY:
+        if not interactive:
+            raise ValueError(f"Unknown task '{task}'. Choose: {', '.join(TASK_REGISTRY)}.")
+        print(f"⚠️ Unknown task. Choose: {', '.join(TASK_REGISTRY)}.")
+        return
 
-    # -------------------------
-    # Step 2: Basic cleaning ONLY
-    # -------------------------
-    df = clean_dataframe(df)
-    df.columns = [str(c).strip() for c in df.columns]
-    df = df.dropna(how="all")
+    with instrumented(trace, profile=profile):
+        # -------------------------
+        # Step 1 + 2: Load file, basic cleaning ONLY
+        # -------------------------
+        df = load_clean(filepath, compact=compact)
 
-    if df.shape[0] == 0:
-        print("❌ Dataset is empty after basic cleaning.")
-        return
+        if df.shape[0] == 0:
+            if not interactive:
+                raise ValueError("Dataset is empty after basic cleaning.")
+            print("❌ Dataset is empty after basic cleaning.")
+            return
 
-    # -------------------------
-    # CLEAN ONLY
-    # -------------------------
-    if task == "clean":
-        save_output(df, filepath, "clean")
-        print("✅ Clean results saved.")
-        return
+        with stage(f"analyse:{task}"):
+            out = _analyse(task, df, filepath=filepath, interactive=interactive,
+                           assumptions=assumptions, opening_balances=opening_balances, ownership=ownership,
+                           predictors=predictors, target=target, group_col=group_col, metric=metric,
+                           group_a=group_a, group_b=group_b, mode=mode, ticker=ticker, forecast=forecast)
+            note_shape(out)
+        if task == "model":
+            return out
 
-    # -------------------------
-    # SCENARIO ANALYSIS (Regression)
-    # -------------------------
-    if task == "scenario":
-        print("\nAvailable columns:", df.columns.tolist())
-        predictors, target = ask_for_columns(df)
-        reg = prepare_regression(df, predictors, target)
-        df["scenario_prediction"] = reg.fittedvalues
-        save_output(df, filepath, "scenario")
-        print("✅ Scenario analysis saved.")
-        return
+        with stage("save"):
+            path = save_output(out, filepath, task, archive=archive, interactive=interactive)
+            note_shape(out)
+        print(_saved_message(task))
+        return path
 
-    # -------------------------
-    # RELATION FINDING (Correlation)
-    # -------------------------
-    if task == "relation":
-        print("\nAvailable columns:", df.columns.tolist())
-        predictors, target = ask_for_columns(df)
-        corr, p = check_correlation(df, predictors[0], target)
-        df["correlation_value"] = corr
-        df["correlation_p"] = p
-        save_output(df, filepath, "relation")
-        print("✅ Relation results saved.")
-        return
 
-    # -------------------------
-    # REASON FINDING (Hypothesis / A/B)
-    # -------------------------
-    if task == "comparison":
-        print("\nAvailable columns:", df.columns.tolist())
-        group_col = input("Enter grouping column: ").strip()
-        metric = input("Enter metric column: ").strip()
-        group_values = df[group_col].dropna().unique().tolist()
-        print("Detected groups:", group_values)
-        group_a = input("Enter first group value: ").strip()
-        group_b = input("Enter second group value: ").strip()
-        t, p = compare_groups(df, group_col, metric, group_a, group_b)
-        df["t_value"] = t
-        df["t_p"] = p
-        save_output(df, filepath, "comparison")
-        print("✅ Comparison results saved.")
-        return
+class StageError:
+    """Marks a stage that failed (or whose dependency failed)."""
 
-    # -------------------------
-    # KPI VALUATION
-    # -------------------------
-    if task == "kpi":
-        print("\nAvailable columns:", df.columns.tolist())
-        predictors, target = ask_for_columns(df)
-        ticker = input("Enter market ticker (e.g., WMT): ").strip()
-        kpi_df = valuation_kpis(df, predictors, target, ticker)
-        save_output(kpi_df, filepath, "kpi")
-        print("✅ KPI results saved.")
-        return
+    def __init__(self, stage, error):
+        self.stage = stage
+        self.error = error
+
+    def __repr__(self):
+        return f"StageError({self.stage}: {self.error})"
+
+
+def run_dag(stages: dict, max_workers: int = 4) -> dict:
+    """
+    Execute {name: (dependencies, fn)} where fn(*dependency_outputs).
+    Stages run as soon as their dependencies finish; independent stages
+    run at the same time. A failure becomes a StageError that is passed on
+    to its dependents (which are skipped) instead of aborting the graph.
+    Each stage runs in a copy of the caller's context, so it records into
+    the caller's trace (see instrument_utils).
+    """
+    results, pending, running = {}, dict(stages), {}
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        while pending or running:
+            for name, (deps, fn) in list(pending.items()):
+                if any(d not in stages for d in deps):
+                    raise ValueError(f"Stage '{name}' depends on an unknown stage: {deps}")
+                if all(d in results for d in deps):
+                    del pending[name]
+                    failed = [results[d] for d in deps if isinstance(results[d], StageError)]
+                    if failed:
+                        results[name] = failed[0]
+                    else:
+                        running[pool.submit(contextvars.copy_context().run, fn, *[results[d] for d in deps])] = name
+            if not running:
+                if pending:
+                    raise ValueError(f"Stages could not be scheduled (cycle?): {list(pending)}")
+                break
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    results[name] = future.result()
+                except Exception as e:
+                    results[name] = StageError(name, f"{type(e).__name__}: {e}")
+    return results
+
+
+def run_pipeline(tasks: list, filepath: str = None, archive: bool = False, max_workers: int = 4,
+                 trace: str = None, profile: bool = False, compact: bool = False, **shared):
+    """
+    Run several tasks on one input as a DAG: load -> clean -> tasks -> save.
+
+    tasks:  task names or dicts ({"task": "scenario", "predictors": [...], "target": "..."});
+            an optional "name" distinguishes two runs of the same task.
+    shared: parameters applied to every task (e.g. ownership, assumptions).
+
+    The file is loaded and cleaned once; analysis outputs are memoized by
+    input fingerprint + task parameters, and independent tasks run
+    concurrently. Never prompts. Returns {name: output path | model results | StageError}.
+    trace / profile: as in run_task (concurrent stages share one memory
+    tracker, so their memory figures overlap).
+    compact: as in run_task.
+    """
+    specs = [t if isinstance(t, dict) else {"task": t} for t in tasks]
+
+    stages = {
+        "input": ([], lambda: _resolve_input(filepath)),
+        "load_clean": (["input"], lambda fp: load_clean(fingerprint=fp, compact=compact)),
+    }
+    names = []
+    for spec in specs:
+        task = spec["task"].strip().lower()
+        if task not in TASK_REGISTRY:
+            raise ValueError(f"Unknown task '{task}'. Choose: {', '.join(TASK_REGISTRY)}.")
+        name = spec.get("name", task)
+        params = {**shared, **{k: v for k, v in spec.items() if k not in ("task", "name")}}
+        names.append(name)
+
+        def analyse(fp, df, task=task, name=name, params=params):
+            if df.shape[0] == 0:
+                raise ValueError("Dataset is empty after basic cleaning.")
+            with stage(f"analyse:{name}", task=task):
+                out = _memoize("analyse", [fp, compact, task, params],
+                               lambda: _analyse(task, df.copy(deep=False), filepath=filepath, interactive=False, **params))
+                note_shape(out)
+            return out
+
+        def save(out, task=task, name=name):
+            if task == "model":
+                return out
+            with stage(f"save:{name}"):
+                path = save_output(out, filepath, name, archive=archive, interactive=False)
+                note_shape(out)
+            print(_saved_message(task))
+            return path
+
+        stages[f"analyse:{name}"] = (["input", "load_clean"], analyse)
+        stages[f"save:{name}"] = ([f"analyse:{name}"], save)
 
-    # -------------------------
-    # 3-STATEMENT MODEL
-    # -------------------------
-    if task == "model":
-        
-         # ✅ Just delegate to forecast_utils
-        results = run_forecast(filepath=filepath, ownership=ownership)
-        return results
-
-    # -------------------------
-    # UNKNOWN TASK
-    # -------------------------
-    print("⚠️ Unknown task. Choose: clean, scenario, relation, comparison, kpi, model.")
+    with instrumented(trace, profile=profile):
+        results = run_dag(stages, max_workers=max_workers)
+    return {name: results[f"save:{name}"] for name in names}
@@ -0,0 +1,58 @@
+# conftest.py
+"""Shared fixtures: the utilities are flat modules in the repo root."""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def output_folder(tmp_path, monkeypatch):
+    """Send save_output writes to a temp folder, synchronously, as CSV."""
+    import output_utils
+    folder = tmp_path / "output"
+    folder.mkdir()
+    monkeypatch.setattr(output_utils, "OUTPUT_FOLDER", str(folder))
+    monkeypatch.setitem(output_utils._settings, "format", "csv")
+    monkeypatch.setitem(output_utils._settings, "background", False)
+    return folder
+
+
+@pytest.fixture(autouse=True)
+def input_cache(tmp_path, monkeypatch):
+    """Point the columnar input cache at a temp folder (every test: run_task loads through it)."""
+    import input_cache_utils
+    monkeypatch.setattr(input_cache_utils, "CACHE_DIR", str(tmp_path / "input_cache"))
+    return tmp_path / "input_cache"
+
+
+@pytest.fixture
+def market_cache(tmp_path, monkeypatch):
+    """
+    Market-data cache on a temp folder with a local fetcher instead of
+    yfinance. Fill `market_cache.data[(TICKER, dataset)]`; `calls` counts fetches.
+    """
+    import market_data_utils
+
+    class Fixture:
+        data = {}
+        calls = []
+
+        def fetch(self, ticker, dataset):
+            self.calls.append((ticker, dataset))
+            return self.data[(ticker.upper(), dataset)]
+
+    fixture = Fixture()
+    fixture.data, fixture.calls = {}, []
+    monkeypatch.setattr(market_data_utils, "_settings", {
+        "offline": False,
+        "ttls": dict(market_data_utils.DEFAULT_TTLS),
+        "cache_dir": str(tmp_path / "market_cache"),
+        "fetcher": fixture.fetch
+    })
+    market_data_utils.clear_cache()
+    yield fixture
+    market_data_utils.clear_cache()
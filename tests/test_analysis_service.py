@@ -0,0 +1,125 @@
+import json
+import threading
+import time
+
+import pandas as pd
+import pytest
+
+import task_runner
+from analysis_service import start_background, stop_background, request_task
+
+
+@pytest.fixture
+def sales_csv(tmp_path):
+    path = tmp_path / "sales.csv"
+    pd.DataFrame({"Region": ["N", "S", "E"], "Sales": [1.0, 2.0, 3.0]}).to_csv(path, index=False)
+    task_runner.clear_stage_cache()
+    yield str(path)
+    task_runner.clear_stage_cache()
+
+
+@pytest.fixture
+def service(output_folder):
+    service, (host, port) = start_background(port=0, max_workers=1, max_pending=1, preload=False)
+    yield service, port
+    stop_background(service)
+
+
+def test_health_run_and_errors(service, sales_csv, output_folder):
+    _, port = service
+    assert request_task(port=port, path="/health") == {"status": "ok", "http_status": 200}
+
+    reply = request_task({"task": "clean", "filepath": sales_csv}, port=port)
+    assert reply["http_status"] == 200 and reply["status"] == "done"
+    assert pd.read_csv(reply["output"])["sales"].tolist() == [1.0, 2.0, 3.0]
+
+    bad = request_task({"task": "forecast", "filepath": sales_csv}, port=port)
+    assert bad["http_status"] == 400 and "unknown task" in bad["error"]
+    assert request_task({"task": "clean", "colour": "red"}, port=port)["http_status"] == 400
+    assert request_task(port=port, path="/nope")["http_status"] == 404
+
+    failed = request_task({"task": "clean", "filepath": sales_csv + ".missing"}, port=port)
+    assert failed["http_status"] == 500 and failed["status"] == "failed"
+
+    stats = request_task(port=port, path="/stats")
+    assert (stats["completed"], stats["failed"], stats["running"]) == (1, 1, 0)
+    assert stats["stage_cache_entries"] > 0
+    assert request_task(port=port, path="/cache/clear", method="POST")["status"] == "cleared"
+    assert request_task(port=port, path="/stats")["stage_cache_entries"] == 0
+
+
+def test_full_service_answers_503(service, sales_csv):
+    _, port = service
+    release = threading.Event()
+
+    @task_runner.register_task("slow")
+    def _task_slow(df, **_):
+        release.wait(10)
+        return df
+
+    try:
+        first = {}
+        worker = threading.Thread(target=lambda: first.update(request_task({"task": "slow", "filepath": sales_csv},
+                                                                           port=port)))
+        worker.start()
+        deadline = time.time() + 5
+        while request_task(port=port, path="/stats")["running"] == 0 and time.time() < deadline:
+            time.sleep(0.01)
+
+        busy = request_task({"task": "clean", "filepath": sales_csv}, port=port)
+        assert busy["http_status"] == 503 and busy["rejected"] == 1
+        release.set()
+        worker.join(10)
+        assert first["status"] == "done"
+        assert request_task({"task": "clean", "filepath": sales_csv}, port=port)["http_status"] == 200
+    finally:
+        release.set()
+        del task_runner.TASK_REGISTRY["slow"]
+
+
+def test_unix_socket(tmp_path, output_folder, sales_csv):
+    sock = str(tmp_path / "analysis.sock")
+    service, address = start_background(unix_socket=sock, preload=False)
+    try:
+        assert address == sock
+        assert request_task(unix_socket=sock, path="/health")["status"] == "ok"
+        assert request_task({"task": "clean", "filepath": sales_csv}, unix_socket=sock)["status"] == "done"
+    finally:
+        stop_background(service)
+
+
+def test_concurrent_traced_jobs_keep_their_own_traces(tmp_path, output_folder):
+    service, (_, port) = start_background(port=0, max_workers=2, preload=False)
+    both_running = threading.Barrier(2, timeout=10)
+
+    @task_runner.register_task("paired")
+    def _task_paired(df, **_):
+        both_running.wait()
+        return df
+
+    def run(name, rows):
+        path = tmp_path / f"{name}.csv"
+        pd.DataFrame({"Region": ["N"] * rows, "Sales": [float(i) for i in range(rows)]}).to_csv(path, index=False)
+        trace = tmp_path / f"{name}.json"
+        replies[name] = request_task({"task": "paired", "filepath": str(path), "trace": str(trace)}, port=port)
+        with open(trace, encoding="utf-8") as fh:
+            traces[name] = json.load(fh)["stages"]
+
+    replies, traces = {}, {}
+    try:
+        task_runner.clear_stage_cache()
+        workers = [threading.Thread(target=run, args=args) for args in (("first", 3), ("second", 5))]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(20)
+    finally:
+        del task_runner.TASK_REGISTRY["paired"]
+        task_runner.clear_stage_cache()
+        stop_background(service)
+
+    for name, rows in (("first", 3), ("second", 5)):
+        assert replies[name]["status"] == "done", replies[name]
+        stages = traces[name]
+        assert [r["name"] for r in stages] == ["load", "clean", "analyse:paired", "save"]
+        assert stages[0]["file"].endswith(f"{name}.csv") and stages[1]["rows"] == rows
@@ -0,0 +1,210 @@
+import warnings
+
+import numpy as np
+import pandas as pd
+import pytest
+import statsmodels.api as sm
+from scipy.stats import pearsonr, spearmanr, ttest_ind
+
+from analysis_utils import correlation_matrix, top_correlations, grouped_regression, rolling_regression, \
+    streaming_regression, compare_all_groups
+
+
+def _frame_with_gaps(n_rows=300, seed=0):
+    rng = np.random.default_rng(seed)
+    base = rng.normal(size=n_rows)
+    df = pd.DataFrame({
+        "a": base + rng.normal(scale=0.5, size=n_rows),
+        "b": np.round(base * 3),  # ties
+        "c": rng.integers(0, 5, n_rows).astype(float),  # heavy ties
+        "d": -base + rng.normal(scale=2.0, size=n_rows),
+        "label": ["x"] * n_rows
+    })
+    for col, frac in [("a", 0.1), ("b", 0.2), ("d", 0.3)]:
+        df.loc[rng.random(n_rows) < frac, col] = np.nan
+    return df
+
+
+def _pairwise(df, fn):
+    cols = ["a", "b", "c", "d"]
+    out = pd.DataFrame(np.nan, index=cols, columns=cols)
+    for x in cols:
+        for y in cols:
+            both = df[[x, y]].dropna()
+            out.loc[x, y] = 1.0 if x == y else fn(both[x], both[y])[0]
+    return out
+
+
+@pytest.mark.parametrize("method,fn", [("pearson", pearsonr), ("spearman", spearmanr)])
+@pytest.mark.parametrize("block_size", [None, 3])
+def test_correlation_matrix_matches_scipy_with_pairwise_missing(method, fn, block_size):
+    df = _frame_with_gaps()
+    corr, pvals, n_obs = correlation_matrix(df, method=method, block_size=block_size)
+    expected = _pairwise(df, fn)
+    np.testing.assert_allclose(corr.loc[expected.index, expected.columns], expected, atol=1e-10)
+    both = df[["a", "d"]].dropna()
+    assert n_obs.loc["a", "d"] == len(both)
+    assert pvals.loc["a", "d"] == pytest.approx(fn(both["a"], both["d"])[1], rel=1e-6)
+    assert "label" not in corr.columns
+
+
+def test_approximate_spearman_only_differs_on_mismatched_gaps():
+    df = _frame_with_gaps()
+    exact, _, _ = correlation_matrix(df, method="spearman")
+    approx, _, _ = correlation_matrix(df, method="spearman", exact_spearman=False)
+    # "c" has no gaps, so c-vs-c is the only pair whose missing rows agree
+    assert approx.loc["c", "c"] == exact.loc["c", "c"]
+    assert not np.allclose(approx.loc["a", "d"], exact.loc["a", "d"])
+
+
+def test_top_correlations_ranks_pairs_by_strength():
+    df = _frame_with_gaps()
+    top = top_correlations(df, k=3, block_size=2)
+    expected = _pairwise(df, pearsonr).where(np.triu(np.ones((4, 4), bool), 1)).stack()
+    expected = expected.reindex(expected.abs().sort_values(ascending=False).index)[:3]
+    assert list(zip(top["col1"], top["col2"])) == list(expected.index)
+    np.testing.assert_allclose(top["r"], expected.to_numpy(), atol=1e-10)
+
+
+def _regression_frame(n_rows=400, seed=1):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Store": rng.choice(["A", "B", "C"], n_rows),
+        "Day": np.arange(n_rows),
+        "Price": rng.normal(10, 2, n_rows),
+        "Promo": rng.normal(size=n_rows)
+    })
+    df["Units Sold"] = 50 - 2 * df["Price"] + 3 * df["Promo"] + rng.normal(size=n_rows)
+    df.loc[rng.random(n_rows) < 0.05, "Promo"] = np.nan
+    return df
+
+
+@pytest.mark.parametrize("n_jobs", [1, 2])
+def test_grouped_regression_matches_statsmodels_per_group(n_jobs):
+    df = _regression_frame()
+    out = grouped_regression(df, ["Price", "Promo"], "Units Sold", "Store", n_jobs=n_jobs)
+    for store, rows in df.dropna().groupby("Store"):
+        model = sm.OLS(rows["Units Sold"], sm.add_constant(rows[["Price", "Promo"]])).fit()
+        np.testing.assert_allclose(out["coef"].loc[store], model.params.to_numpy(), rtol=1e-8)
+        np.testing.assert_allclose(out["se"].loc[store], model.bse.to_numpy(), rtol=1e-8)
+        assert out["r2"].loc[store] == pytest.approx(model.rsquared, rel=1e-8)
+        assert out["n"].loc[store] == len(rows)
+
+
+def test_grouped_regression_drops_rows_without_group_key():
+    df = _regression_frame()
+    df.loc[::7, "Store"] = None
+    out = grouped_regression(df, ["Price", "Promo"], "Units Sold", "Store")
+    assert sorted(out["coef"].index) == ["A", "B", "C"]
+    assert out["n"].sum() == len(df.dropna())
+    assert out["fitted"].index.isin(df.index[df["Store"].notna()]).all()
+    keyed = df.dropna()
+    rows = keyed[keyed["Store"] == "B"]
+    model = sm.OLS(rows["Units Sold"], sm.add_constant(rows[["Price", "Promo"]])).fit()
+    np.testing.assert_allclose(out["coef"].loc["B"], model.params.to_numpy(), rtol=1e-8)
+
+
+def test_rolling_regression_matches_statsmodels_windows():
+    df = _regression_frame().dropna().sample(frac=1, random_state=0)
+    df.loc[df.index[:10], "Store"] = None
+    out = rolling_regression(df, ["Price", "Promo"], "Units Sold", window=30, order_col="Day", group_col="Store")
+    assert out["coef"].index.isin(df.index[df["Store"].notna()]).all()
+    rows = df[df["Store"] == "A"].sort_values("Day")
+    for end in (29, 45, len(rows) - 1):
+        window = rows.iloc[end - 29:end + 1]
+        model = sm.OLS(window["Units Sold"], sm.add_constant(window[["Price", "Promo"]])).fit()
+        np.testing.assert_allclose(out["coef"].loc[window.index[-1]], model.params.to_numpy(), rtol=1e-7)
+        np.testing.assert_allclose(out["se"].loc[window.index[-1]], model.bse.to_numpy(), rtol=1e-7)
+    assert out["coef"].loc[rows.index[:29]].isna().all().all()
+
+
+def _ols(df):
+    rows = df.dropna()
+    return sm.OLS(rows["Units Sold"], sm.add_constant(rows[["Price", "Promo"]])).fit()
+
+
+def test_streaming_regression_from_csv_files_matches_statsmodels(tmp_path):
+    df = _regression_frame(n_rows=3000)
+    paths = []
+    for i, start in enumerate(range(0, len(df), 1000)):
+        paths.append(str(tmp_path / f"part_{i}.csv"))
+        df.iloc[start:start + 1000].to_csv(paths[-1], index=False)
+    model = _ols(df)
+    for source, n_jobs in [(paths, 1), (tuple(paths), 2)]:
+        out = streaming_regression(source, ["Price", "Promo"], "Units Sold", chunksize=400, n_jobs=n_jobs)
+        np.testing.assert_allclose(out["coef"], model.params.to_numpy(), rtol=1e-8)
+        np.testing.assert_allclose(out["se"], model.bse.to_numpy(), rtol=1e-8)
+        np.testing.assert_allclose(out["p_value"], model.pvalues.to_numpy(), rtol=1e-6)
+        assert out["r2"] == pytest.approx(model.rsquared, rel=1e-8) and out["n"] == int(model.nobs)
+    single = streaming_regression(paths[0], ["Price", "Promo"], "Units Sold", chunksize=400)
+    np.testing.assert_allclose(single["coef"], _ols(pd.read_csv(paths[0])).params.to_numpy(), rtol=1e-8)
+
+def test_streaming_regression_consumes_chunk_generators_lazily():
+    df = _regression_frame(n_rows=3000)
+    live, peak = [0], [0]
+
+    def chunks():
+        for start in range(0, len(df), 500):
+            live[0] += 1
+            peak[0] = max(peak[0], live[0])
+            yield df.iloc[start:start + 500]
+            live[0] -= 1
+
+    out = streaming_regression(chunks(), ["Price", "Promo"], "Units Sold")
+    assert peak[0] == 1
+    np.testing.assert_allclose(out["coef"], _ols(df).params.to_numpy(), rtol=1e-8)
+
+
+def _campaign_frame(seed=2):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Campaign": rng.choice(["email", "search", "social", "tv"], 600),
+        "Revenue": rng.normal(100, 15, 600)
+    })
+    df.loc[df["Campaign"] == "tv", "Revenue"] += 8
+    df.loc[rng.random(600) < 0.05, "Revenue"] = np.nan
+    df.loc[rng.random(600) < 0.1, "Campaign"] = None
+    df.loc[df["Campaign"].isna(), "Revenue"] += 500  # would skew "rest" if counted
+    return df
+
+
+@pytest.mark.parametrize("equal_var", [False, True])
+def test_compare_all_pairs_matches_scipy(equal_var):
+    df = _campaign_frame()
+    out = compare_all_groups(df, "Campaign", "Revenue", equal_var=equal_var, correction=None)
+    assert len(out) == 6
+    for row in out.itertuples():
+        a = df.loc[df["Campaign"] == row.group1, "Revenue"].dropna()
+        b = df.loc[df["Campaign"] == row.group2, "Revenue"].dropna()
+        t, p = ttest_ind(a, b, equal_var=equal_var)
+        assert row.t_stat == pytest.approx(t, rel=1e-9)
+        assert row.p_value == pytest.approx(p, rel=1e-7)
+        assert row.p_adjusted == row.p_value
+
+
+def test_compare_each_group_to_rest_ignores_rows_without_group():
+    df = _campaign_frame()
+    out = compare_all_groups(df, "Campaign", "Revenue", mode="rest", correction="holm")
+    keyed = df[df["Campaign"].notna()]
+    for row in out.itertuples():
+        a = keyed.loc[keyed["Campaign"] == row.group1, "Revenue"].dropna()
+        b = keyed.loc[keyed["Campaign"] != row.group1, "Revenue"].dropna()
+        t, p = ttest_ind(a, b, equal_var=False)
+        assert (row.n2, row.group2) == (len(b), "rest")
+        assert row.mean2 == pytest.approx(b.mean(), rel=1e-12)
+        assert row.t_stat == pytest.approx(t, rel=1e-8)
+        assert row.p_value == pytest.approx(p, rel=1e-6)
+    assert (out["p_adjusted"] >= out["p_value"]).all()
+    assert out.set_index("group1").loc["tv", "significant"]
+
+
+@pytest.mark.parametrize("frame", [pd.DataFrame(), pd.DataFrame({"region": ["N", "S"]}),
+                                   pd.DataFrame({"a": [], "b": []}, dtype=float)])
+@pytest.mark.parametrize("method", ["pearson", "spearman"])
+def test_correlations_of_empty_or_text_only_frames_are_empty(frame, method):
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        top = top_correlations(frame, method=method)
+        corr, pvals, n_obs = correlation_matrix(frame, method=method)
+    assert list(top.columns) == ["col1", "col2", "r", "p_value", "n"] and top.empty
+    assert corr.isna().all().all() and (n_obs == 0).all().all()
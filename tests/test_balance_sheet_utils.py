@@ -0,0 +1,48 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from balance_sheet_utils import (
+    compute_balance_sheet, _compute_balance_sheet_iterrows, _rollforward, _synthetic_statements
+)
+
+OPENING = {"ppne_opening": 5e5, "cash_opening": 1e5, "debt_opening": 2e5, "equity_opening": 3e5}
+
+
+def _loop_rollforward(opening, flows, floor):
+    balance, out = opening, []
+    for flow in flows:
+        balance = balance + flow
+        if floor:
+            balance = max(0.0, balance)
+        out.append(balance)
+    return np.array(out)
+
+
+@pytest.mark.parametrize("floor", [True, False])
+def test_rollforward_matches_loop_when_floor_binds(floor):
+    flows = np.random.default_rng(0).normal(0, 100, 500)  # drifts below zero repeatedly
+    np.testing.assert_allclose(_rollforward(50.0, flows, floor=floor), _loop_rollforward(50.0, flows, floor),
+                               rtol=0, atol=1e-9)
+
+
+@pytest.mark.parametrize("opening", [OPENING, {k: 0.0 for k in OPENING}])
+def test_balance_sheet_matches_iterrows_reference(opening):
+    income_df, cash_flow_df = _synthetic_statements(60, seed=3)
+    income_df, cash_flow_df = income_df.drop(columns="Entity"), cash_flow_df.drop(columns="Entity")
+    fast = compute_balance_sheet(income_df, cash_flow_df, opening)
+    reference = _compute_balance_sheet_iterrows(income_df, cash_flow_df, opening)
+    pd.testing.assert_frame_equal(fast.reset_index(drop=True), reference.reset_index(drop=True)[fast.columns],
+                                  check_dtype=False, rtol=1e-9, atol=1e-6)
+
+
+def test_panel_mode_matches_entity_by_entity():
+    income_df, cash_flow_df = _synthetic_statements(15, n_entities=6, seed=4)
+    openings = pd.DataFrame({k: np.linspace(v, 2 * v, 6) for k, v in OPENING.items()}, index=range(6))
+    panel = compute_balance_sheet(income_df, cash_flow_df, {}, opening_balances=openings, entity_col="Entity")
+    for entity in range(6):
+        single = compute_balance_sheet(income_df[income_df["Entity"] == entity].drop(columns="Entity"),
+                                       cash_flow_df[cash_flow_df["Entity"] == entity].drop(columns="Entity"),
+                                       {}, opening_balances=openings.loc[entity].to_dict())
+        rows = panel[panel["Entity"] == entity].drop(columns="Entity").reset_index(drop=True)
+        pd.testing.assert_frame_equal(rows, single.reset_index(drop=True), check_dtype=False, rtol=1e-12)
@@ -0,0 +1,57 @@
+import pandas as pd
+import pytest
+
+import task_runner
+from batch_runner import load_job_spec, _run_job
+
+
+@pytest.fixture
+def sales_csv(tmp_path):
+    path = tmp_path / "sales.csv"
+    pd.DataFrame({"Region": ["North", "South", "East"], "Sales": [10, 20, 30]}).to_csv(path, index=False)
+    task_runner.clear_stage_cache()
+    yield str(path)
+    task_runner.clear_stage_cache()
+
+
+def test_spec_defaults_and_unknown_keys():
+    jobs = load_job_spec({"defaults": {"filepath": "a.csv"}, "jobs": [{"task": "clean"}]})
+    assert jobs == [{"filepath": "a.csv", "task": "clean", "name": "job_1"}]
+    with pytest.raises(ValueError, match="unknown keys"):
+        load_job_spec([{"task": "clean", "colour": "red"}])
+
+
+def test_spec_rejects_unknown_task():
+    with pytest.raises(ValueError, match="unknown task 'forecast'"):
+        load_job_spec([{"task": "forecast", "filepath": "a.csv"}])
+
+
+def test_clean_job_is_done(sales_csv, output_folder):
+    row = _run_job(load_job_spec([{"task": "clean", "filepath": sales_csv}])[0])
+    assert row["status"] == "done" and row["error"] is None
+    assert row["output"].startswith(str(output_folder))
+
+
+def test_empty_dataset_job_is_failed(tmp_path, output_folder):
+    path = tmp_path / "empty.csv"
+    path.write_text("Region,Sales\n")
+    task_runner.clear_stage_cache()
+    row = _run_job({"name": "empty", "task": "clean", "filepath": str(path)})
+    assert row["status"] == "failed"
+    assert "empty" in row["error"]
+
+
+def test_unknown_task_raises_without_prompts(sales_csv):
+    with pytest.raises(ValueError, match="Unknown task"):
+        task_runner.run_task("forecast", filepath=sales_csv, interactive=False)
+
+
+def test_model_job_saves_a_workbook(tmp_path, output_folder):
+    path = tmp_path / "plan.csv"
+    pd.DataFrame({"Year": [2021, 2022, 2023], "Revenue": [100.0, 110.0, 120.0]}).to_csv(path, index=False)
+    task_runner.clear_stage_cache()
+    row = _run_job({"name": "plan", "task": "model", "filepath": str(path),
+                    "forecast": {"years": 3, "start_year": 2024}})
+    assert row["status"] == "done", row["error"]
+    assert row["output"] == str(output_folder / "plan_model_output.xlsx")
+    assert "Summary" in pd.ExcelFile(row["output"]).sheet_names
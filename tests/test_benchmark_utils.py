@@ -0,0 +1,58 @@
+import json
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmark_utils import (
+    run_benchmarks, compare_to_baseline, synthetic_sales_frame, synthetic_assumptions, CASES
+)
+from forecast_utils import FORECAST_ASSUMPTIONS
+
+
+def _write_baseline(path, rows):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"environment": {}, "results": rows}, fh)
+
+
+def test_compare_to_baseline_statuses(tmp_path):
+    path = tmp_path / "baseline.json"
+    _write_baseline(path, [{"case": c, "scale": "small", "seconds": 1.0} for c in ("same", "slow", "fast", "tiny")]
+                    + [{"case": "noise", "scale": "small", "seconds": 0.001}])
+    results = pd.DataFrame({"case": ["same", "slow", "fast", "tiny", "noise", "added"],
+                            "scale": "small",
+                            "seconds": [1.1, 1.5, 0.5, 1.002, 0.003, 0.2]})
+    out = compare_to_baseline(results, str(path), tolerance=0.25, min_delta=0.005)
+    assert out["status"].tolist() == ["ok", "regression", "improved", "ok", "ok", "new"]
+    assert out.loc[1, "ratio"] == pytest.approx(1.5)
+
+
+def test_small_run_writes_results_and_compares_with_baseline(tmp_path):
+    baseline = str(tmp_path / "baseline.json")
+    cases = ["check_correlation", "financial_forecast_batch", "save_output"]
+    first = run_benchmarks(scales=("small",), cases=cases, repeat=1, baseline_path=baseline, update_baseline=True)
+    assert first["case"].tolist() == cases
+    assert (first["seconds"] > 0).all() and (first["throughput"] > 0).all()
+
+    output = tmp_path / "results.json"
+    second = run_benchmarks(scales=("small",), cases=cases, repeat=1, output_path=str(output), baseline_path=baseline)
+    assert set(second["status"]) <= {"ok", "regression", "improved"}
+    with open(output, encoding="utf-8") as fh:
+        payload = json.load(fh)
+    assert payload["environment"]["pandas"] == pd.__version__
+    assert [r["case"] for r in payload["results"]] == cases
+
+
+def test_unknown_case_is_rejected():
+    with pytest.raises(ValueError, match="Unknown benchmark cases"):
+        run_benchmarks(cases=["nope"])
+
+
+def test_synthetic_generators_are_seeded_and_shaped():
+    df = synthetic_sales_frame(500, n_groups=4, seed=3)
+    pd.testing.assert_frame_equal(df, synthetic_sales_frame(500, n_groups=4, seed=3))
+    assert df.shape == (500, 5) and set(df["Campaign"]) == {"A", "B", "C", "D"}
+    a = synthetic_assumptions(50, seed=1)
+    assert set(a) == set(FORECAST_ASSUMPTIONS) and all(len(v) == 50 for v in a.values())
+    assert np.all(a["discount_rate"] > a["terminal_growth"])
+    assert {dimension for dimension, *_ in CASES.values()} == {"rows", "scenarios"}
@@ -0,0 +1,64 @@
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from excel_export_utils import save_workbook, save_model_workbook
+
+
+def _statement(scenarios=3, years=4):
+    rows = [(s, 2025 + y, 1000.0 * (s + 1) + y, 100 * y) for s in range(scenarios) for y in range(years)]
+    return pd.DataFrame(rows, columns=["Scenario", "Year", "Revenue", "Units"])
+
+
+def test_sheets_values_and_formats(tmp_path):
+    df = pd.DataFrame({"Year": [2025, 2026], "Revenue": [1234.5, np.nan], "Units": [10, 20],
+                       "Date": pd.to_datetime(["2025-01-31", "2026-01-31"])})
+    path = save_workbook({"P&L": df, "a/b:c?": df.iloc[:1], "p&l": df}, str(tmp_path / "out.xlsx"),
+                         number_formats={"Units": "0.0"})
+    wb = load_workbook(path)
+    assert wb.sheetnames == ["P&L", "a_b_c_", "p&l (2)"]
+    ws = wb["P&L"]
+    assert [c.value for c in ws[1]] == ["Year", "Revenue", "Units", "Date"]
+    assert ws["B2"].value == 1234.5 and ws["B3"].value is None  # NaN -> blank
+    assert (ws["A2"].number_format, ws["B2"].number_format, ws["C2"].number_format) == ("0", "#,##0.00", "0.0")
+    assert ws["D2"].number_format == "yyyy-mm-dd"
+    assert os.listdir(tmp_path) == ["out.xlsx"]
+
+
+def test_model_workbook_splits_scenarios(tmp_path):
+    results = {"enterprise_value": np.array([1.0, 2.0, 3.0]), "net_present_value": np.array([0.5, 1.5, 2.5]),
+               "income_statement": _statement(), "cash_flow": _statement()}
+    wb = load_workbook(save_model_workbook(results, str(tmp_path / "model.xlsx")))
+    assert wb.sheetnames == ["Summary"] + [f"{label} - S{s}" for label in ("Income", "Cash Flow") for s in range(3)]
+    sheet = pd.read_excel(tmp_path / "model.xlsx", sheet_name="Income - S1")
+    expected = _statement().query("Scenario == 1").drop(columns="Scenario").reset_index(drop=True)
+    pd.testing.assert_frame_equal(sheet, expected, check_dtype=False)
+
+    long = save_model_workbook(results, str(tmp_path / "long.xlsx"), split_scenarios=False)
+    assert load_workbook(long).sheetnames == ["Summary", "Income", "Cash Flow"]
+    assert len(pd.read_excel(long, sheet_name="Income")) == 12
+
+
+def test_concurrent_saves_to_one_path(tmp_path):
+    path = str(tmp_path / "shared.xlsx")
+    frame = pd.DataFrame({"v": np.arange(20_000, dtype=float)})
+    barrier, errors = threading.Barrier(8), []
+
+    def export():
+        barrier.wait()
+        try:
+            save_workbook({"Data": frame}, path)
+        except Exception as e:  # pragma: no cover - the failure being tested
+            errors.append(e)
+
+    threads = [threading.Thread(target=export) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert errors == []
+    assert os.listdir(tmp_path) == ["shared.xlsx"]
+    assert len(pd.read_excel(path)) == 20_000
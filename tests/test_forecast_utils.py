@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecast_utils import (
+    financial_forecast, financial_forecast_batch, run_forecast, FORECAST_ASSUMPTIONS, DEFAULT_ASSUMPTIONS
+)
+
+
+def _reference_forecast(revenue, years, growth_rate, cogs_pct, opex_pct, tax_rate, capex_pct,
+                        depr_pct, wc_pct, discount_rate, terminal_growth):
+    """The original year-by-year loop financial_forecast replaced."""
+    rows = []
+    for year in range(1, years + 1):
+        rev = revenue * (1 + growth_rate) ** year
+        cogs, opex, depr = rev * cogs_pct, rev * opex_pct, rev * depr_pct
+        ebit = rev - cogs - opex - depr
+        net_income = ebit - ebit * tax_rate
+        capex, wc_change = rev * capex_pct, rev * wc_pct
+        fcf = net_income + depr - capex - wc_change
+        rows.append([year, rev, cogs, opex, depr, ebit, net_income, capex, wc_change, fcf,
+                     fcf / (1 + discount_rate) ** year])
+    df = pd.DataFrame(rows, columns=["Year", "Revenue", "COGS", "Opex", "Depreciation", "EBIT", "Net Income",
+                                     "Capex", "Working Capital Change", "Free Cash Flow", "Discounted FCF"])
+    tv = df["Free Cash Flow"].iloc[-1] * (1 + terminal_growth) / (discount_rate - terminal_growth)
+    ev = df["Discounted FCF"].sum() + tv / (1 + discount_rate) ** years
+    return df, ev, df["Free Cash Flow"].iloc[-1] * 0.10
+
+
+def _random_assumptions(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return {k: DEFAULT_ASSUMPTIONS[k] + rng.uniform(-0.02, 0.02, n) for k in FORECAST_ASSUMPTIONS}
+
+
+def test_financial_forecast_matches_reference_loop():
+    df, ev, npv = financial_forecast(revenue=2_500_000, growth_rate=0.07, years=7)
+    ref_df, ref_ev, ref_npv = _reference_forecast(2_500_000, 7, **{**DEFAULT_ASSUMPTIONS, "growth_rate": 0.07})
+    pd.testing.assert_frame_equal(df, ref_df, check_dtype=False, rtol=1e-12)
+    assert ev == round(ref_ev, 2)
+    assert npv == round(ref_npv, 2)
+
+
+def test_batch_matches_scalar_per_scenario():
+    assumptions = _random_assumptions(25)
+    table, ev, npv = financial_forecast_batch(assumptions, revenue=1_000_000, years=5, return_table=True)
+    assert table.shape[0] == 25 * 5
+    for i in range(25):
+        scenario = {k: v[i] for k, v in assumptions.items()}
+        df, ev_i, npv_i = financial_forecast(revenue=1_000_000, years=5, **scenario)
+        assert ev[i] == pytest.approx(ev_i, abs=0.006)
+        assert npv[i] == pytest.approx(npv_i, abs=0.006)
+        rows = table[table["Scenario"] == i].drop(columns="Scenario").reset_index(drop=True)
+        pd.testing.assert_frame_equal(rows, df, check_dtype=False, rtol=1e-12)
+
+
+def test_batch_accepts_dataframe_and_per_scenario_revenue():
+    frame = pd.DataFrame(_random_assumptions(4, seed=1))
+    frame["revenue"] = [1e5, 2e5, 3e5, 4e5]
+    _, ev, _ = financial_forecast_batch(frame)
+    expected = [_reference_forecast(r, 5, **{k: frame[k].iloc[i] for k in FORECAST_ASSUMPTIONS})[1]
+                for i, r in enumerate(frame["revenue"])]
+    np.testing.assert_allclose(ev, expected, rtol=1e-12)
+
+
+def test_batch_rejects_two_dimensional_assumptions():
+    with pytest.raises(ValueError):
+        financial_forecast_batch({"growth_rate": np.zeros((2, 2))})
+
+
+# -------------------------
+# run_forecast (three-statement model)
+# -------------------------
+BALANCED_OPENING = {"cash_opening": 1e5, "ppne_opening": 4e5, "debt_opening": 2e5, "equity_opening": 3e5}
+
+
+def test_run_forecast_balances_and_matches_dcf():
+    results = run_forecast(revenue=1_000_000, years=6, start_year=2026, industry="",
+                           opening_balances=BALANCED_OPENING, assumptions={"dividends_pct_net_income": 0.3,
+                                                                           "debt_change_schedule": {2027: 5e4}},
+                           ownership={"Promoters": 0.6, "Public": 0.4}, interactive=False)
+    assert results["balance_check"]["balanced"]
+    assert results["income_statement"]["Year"].tolist() == list(range(2026, 2032))
+    _, ev, npv = financial_forecast(revenue=1_000_000, years=6)
+    assert results["enterprise_value"] == ev
+    assert results["net_present_value"] == npv
+    bs = results["balance_sheet"]
+    assert bs["Debt"].iloc[0] == 2e5 and bs["Debt"].iloc[-1] == 2.5e5
+    assert "shareholding" in results
+
+
+def test_run_forecast_scenarios_match_batch_engine():
+    scenarios = _random_assumptions(8, seed=5)
+    results = run_forecast(revenue=5e5, years=5, start_year=2026, industry="", scenarios=scenarios,
+                           opening_balances=BALANCED_OPENING, interactive=False)
+    _, ev, npv = financial_forecast_batch(scenarios, revenue=5e5, years=5)
+    np.testing.assert_allclose(results["enterprise_value"], ev, rtol=1e-12)
+    np.testing.assert_allclose(results["net_present_value"], npv, rtol=1e-12)
+    assert results["balance_check"]["balanced"]
+    assert results["balance_sheet"]["Scenario"].nunique() == 8
+
+
+def test_run_forecast_takes_revenue_from_data():
+    data = pd.DataFrame({"Revenue": [100.0, 200.0, 750_000.0]})
+    results = run_forecast(data=data, years=3, start_year=2026, industry="", interactive=False)
+    assert results["enterprise_value"] == financial_forecast(revenue=750_000, years=3)[1]
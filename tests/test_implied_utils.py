@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from forecast_utils import DEFAULT_ASSUMPTIONS, financial_forecast_batch
+from implied_utils import solve_implied_assumption, implied_assumptions, IMPLIED_COLUMNS
+
+
+def _market_ev(revenue, years=5, **changes):
+    _, ev, _ = financial_forecast_batch({**DEFAULT_ASSUMPTIONS, **changes}, revenue=revenue, years=years)
+    return ev
+
+
+@pytest.mark.parametrize("solve_for,truth", [
+    ("growth_rate", [-0.05, 0.04, 0.18, 0.35]),
+    ("discount_rate", [0.07, 0.09, 0.13, 0.20]),
+    ("terminal_growth", [0.0, 0.015, 0.025, 0.04]),
+    ("cogs_pct", [0.45, 0.5, 0.55, 0.65]),
+])
+def test_solver_recovers_the_assumption_behind_each_ev(solve_for, truth):
+    truth = np.array(truth)
+    revenue = np.array([1e6, 5e6, 2e7, 3e5])
+    target = _market_ev(revenue, years=7, **{solve_for: truth})
+    out = solve_implied_assumption(target, solve_for=solve_for, revenue=revenue, years=7)
+    assert out["converged"].all()
+    np.testing.assert_allclose(out["implied_value"], truth, rtol=1e-7, atol=1e-9)
+    assert (out["residual"].abs() <= 1e-6 * np.abs(target)).all()
+
+
+def test_unreachable_targets_are_flagged():
+    out = solve_implied_assumption([-1e12, 1e6], solve_for="growth_rate", revenue=1e6)
+    assert out["status"].tolist()[0] == "no_root_in_bracket"
+    assert np.isnan(out["implied_value"].iloc[0]) and not out["converged"].iloc[0]
+    with pytest.raises(ValueError, match="Unknown assumption"):
+        solve_implied_assumption(1e6, solve_for="wacc")
+
+
+def test_watchlist_solves_fetched_tickers_and_keeps_failures(market_cache):
+    ev = _market_ev(2e8, growth_rate=0.12)[0]
+    market_cache.data[("AAA", "info")] = {"currentPrice": 20.0, "sharesOutstanding": (ev - 1e7 + 4e6) / 20.0,
+                                          "totalRevenue": 2e8, "totalDebt": 1e7, "totalCash": 4e6}
+    market_cache.data[("BBB", "info")] = {"currentPrice": 10.0}
+    table = implied_assumptions(["BBB", "AAA"], retries=0)
+    assert table["Ticker"].tolist() == ["BBB", "AAA"]
+    assert table.loc[0, "Error"].startswith("ValueError")
+    assert table.loc[1, "market_ev"] == pytest.approx(ev)
+    assert table.loc[1, "implied_value"] == pytest.approx(0.12, rel=1e-8)
+
+
+def test_watchlist_of_no_tickers_is_an_empty_frame():
+    table = implied_assumptions([])
+    assert table.empty and list(table.columns) == IMPLIED_COLUMNS
@@ -0,0 +1,49 @@
+import os
+
+import pandas as pd
+
+from ingest_utils import ingest_folder, load_manifest, MANIFEST_NAME
+
+
+def _drop(folder, name, rows, mtime):
+    path = folder / name
+    pd.DataFrame({"Store": range(rows), "Sales": [1.5] * rows}).to_csv(path, index=False)
+    os.utime(path, ns=(mtime, mtime))
+    return path
+
+
+def test_only_new_or_changed_files_are_processed(tmp_path):
+    seen = []
+
+    def process(df, path):
+        seen.append((os.path.basename(path), len(df)))
+
+    _drop(tmp_path, "a.csv", 3, 1_000_000_000_000_000_000)
+    _drop(tmp_path, "b.csv", 4, 1_000_000_000_000_000_000)
+
+    handled = ingest_folder(str(tmp_path), process=process, settle_seconds=0)
+    assert sorted(seen) == [("a.csv", 3), ("b.csv", 4)]
+    assert all(h["status"] == "done" for h in handled)
+
+    assert ingest_folder(str(tmp_path), process=process, settle_seconds=0) == []  # nothing new
+
+    _drop(tmp_path, "b.csv", 6, 1_100_000_000_000_000_000)  # changed content
+    path_a = tmp_path / "a.csv"
+    os.utime(path_a, ns=(1_200_000_000_000_000_000,) * 2)  # touched, same bytes
+    ingest_folder(str(tmp_path), process=process, settle_seconds=0)
+    assert seen[2:] == [("b.csv", 6)]
+
+    manifest = load_manifest(str(tmp_path / MANIFEST_NAME))
+    assert manifest[str(path_a.resolve())]["rows"] == 3
+
+
+def test_failures_are_recorded_and_retried_on_request(tmp_path):
+    _drop(tmp_path, "bad.csv", 2, 1_000_000_000_000_000_000)
+
+    def fail(df, path):
+        raise RuntimeError("boom")
+
+    handled = ingest_folder(str(tmp_path), process=fail, settle_seconds=0)
+    assert handled[0]["status"] == "failed" and "boom" in handled[0]["error"]
+    assert ingest_folder(str(tmp_path), settle_seconds=0) == []
+    assert ingest_folder(str(tmp_path), settle_seconds=0, retry_failed=True)[0]["status"] == "done"
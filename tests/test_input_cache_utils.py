@@ -0,0 +1,96 @@
+import os
+import threading
+
+import pandas as pd
+
+import input_cache_utils
+from input_cache_utils import read_cached, evict_cache
+
+
+class CountingReader:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, path):
+        self.calls += 1
+        return pd.read_csv(path)
+
+
+def _write(path, rows):
+    pd.DataFrame({"Region": [" north "] * rows, "Sales": range(rows)}).to_csv(path, index=False)
+
+
+def test_second_load_is_served_from_cache(tmp_path, input_cache):
+    path = tmp_path / "sales.csv"
+    _write(path, 10)
+    reader = CountingReader()
+    first = read_cached(str(path), reader)
+    second = read_cached(str(path), reader)
+    assert reader.calls == 1
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_edited_file_is_reparsed_and_clean_variant_is_separate(tmp_path, input_cache):
+    path = tmp_path / "sales.csv"
+    _write(path, 10)
+    reader = CountingReader()
+    read_cached(str(path), reader)
+    _write(path, 12)
+    assert len(read_cached(str(path), reader)) == 12
+    cleaned = read_cached(str(path), reader, clean=True)
+    assert list(cleaned.columns) == ["region", "sales"] and cleaned["region"].iloc[0] == "north"
+    assert reader.calls == 3
+
+
+def test_concurrent_first_loads_of_one_file(tmp_path, input_cache):
+    path = tmp_path / "sales.csv"
+    _write(path, 50_000)
+    errors, frames = [], []
+    start = threading.Barrier(16)
+
+    def load():
+        start.wait()
+        try:
+            frames.append(read_cached(str(path), pd.read_csv))
+        except Exception as e:  # noqa: BLE001 - collected for the assertion
+            errors.append(e)
+
+    threads = [threading.Thread(target=load) for _ in range(16)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert all(len(f) == 50_000 for f in frames)
+    assert not [n for n in os.listdir(input_cache) if n.endswith(".tmp")]
+
+
+def test_eviction_keeps_cache_under_budget(tmp_path, input_cache):
+    for i in range(4):
+        path = tmp_path / f"f{i}.csv"
+        _write(path, 2_000)
+        read_cached(str(path), pd.read_csv)
+    evict_cache(max_bytes=1)
+    assert os.listdir(input_cache_utils.CACHE_DIR) == []
+
+
+def test_default_key_is_stat_only_and_content_hash_is_opt_in(tmp_path, input_cache, monkeypatch):
+    path = tmp_path / "sales.csv"
+    _write(path, 10)
+    reader = CountingReader()
+    read_cached(str(path), reader)
+
+    def no_hashing(*args, **kwargs):
+        raise AssertionError("file contents hashed on a default load")
+
+    with monkeypatch.context() as patch:
+        patch.setattr(input_cache_utils.hashlib, "blake2b", no_hashing)
+        read_cached(str(path), reader)
+    assert reader.calls == 1
+
+    # same size, same mtime, different bytes: only the content hash notices
+    stat = os.stat(path)
+    path.write_text(path.read_text().replace("north", "south"))
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    assert read_cached(str(path), reader)["Region"].str.contains("north").all()
+    assert read_cached(str(path), reader, content_hash=True)["Region"].str.contains("south").all()
@@ -0,0 +1,117 @@
+import json
+import os
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import instrument_utils
+import task_runner
+from instrument_utils import stage, note, note_shape, get_records, instrumented, enable_instrumentation, \
+    disable_instrumentation
+
+
+@pytest.fixture(autouse=True)
+def _off():
+    disable_instrumentation()
+    yield
+    disable_instrumentation()
+
+
+def test_disabled_stage_is_a_shared_noop():
+    enable_instrumentation(memory=False)
+    disable_instrumentation()  # leaves an empty record list
+    assert stage("load") is stage("clean", file="x.csv")
+    with stage("load"):
+        note(rows=5)
+        note_shape(pd.DataFrame({"a": [1]}))
+    assert get_records() == []
+    assert instrumented(None) is stage("load")
+
+
+def test_nested_stages_record_time_memory_shape_and_errors():
+    enable_instrumentation(memory=True)
+    with stage("outer", file="sales.csv"):
+        with stage("inner"):
+            block = np.ones(1_000_000)
+            note_shape(pd.DataFrame({"a": range(7), "b": range(7)}))
+        del block
+        with pytest.raises(KeyError):
+            with stage("broken"):
+                raise KeyError("Region")
+    disable_instrumentation()
+
+    records = {r["name"]: r for r in get_records()}
+    assert list(records) == ["inner", "broken", "outer"]
+    assert records["inner"]["parent"] == "outer" and records["outer"]["parent"] is None
+    assert (records["inner"]["rows"], records["inner"]["columns"]) == (7, 2)
+    assert records["inner"]["tracemalloc_peak_delta_bytes"] >= 8_000_000
+    assert records["outer"]["tracemalloc_peak_delta_bytes"] >= records["inner"]["tracemalloc_peak_delta_bytes"]
+    assert records["outer"]["wall_seconds"] >= records["inner"]["wall_seconds"]
+    assert records["broken"]["error"] == "KeyError: 'Region'"
+    assert records["outer"]["file"] == "sales.csv"
+
+
+def test_run_task_trace_covers_every_stage(tmp_path, output_folder):
+    path = tmp_path / "sales.csv"
+    pd.DataFrame({"Region": ["N", "S", "E"], "Sales": [1.0, 2.0, 3.0]}).to_csv(path, index=False)
+    task_runner.clear_stage_cache()
+    trace = tmp_path / "traces" / "clean.json"
+    task_runner.run_task("clean", filepath=str(path), interactive=False, trace=str(trace), profile=True)
+    task_runner.clear_stage_cache()
+
+    with open(trace, encoding="utf-8") as fh:
+        payload = json.load(fh)
+    names = [r["name"] for r in payload["stages"]]
+    assert names == ["load", "clean", "analyse:clean", "save"]
+    assert payload["stages"][1]["rows"] == 3
+    assert [e["name"] for e in payload["traceEvents"]] == names
+    assert all(e["ph"] == "X" and e["dur"] >= 0 for e in payload["traceEvents"])
+    assert os.path.exists(f"{trace}.prof") and open(f"{trace}.prof.txt").read().startswith("Hottest stage:")
+    assert sorted(os.listdir(trace.parent)) == ["clean.json", "clean.json.prof", "clean.json.prof.txt"]
+    assert not instrument_utils.is_enabled()
+
+
+def test_concurrent_traced_runs_write_their_own_traces(tmp_path, output_folder, monkeypatch):
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    # both runs are inside their analyse stage at the same time
+    barrier = threading.Barrier(2, timeout=10)
+    clean = task_runner.TASK_REGISTRY["clean"]["handler"]
+    monkeypatch.setitem(task_runner.TASK_REGISTRY["clean"], "handler",
+                        lambda df, **kw: barrier.wait() is not None and clean(df, **kw))
+    task_runner.clear_stage_cache()
+
+    def run(name, rows):
+        path = tmp_path / f"{name}.csv"
+        pd.DataFrame({"Region": ["N"] * rows, "Sales": np.arange(rows, dtype=float)}).to_csv(path, index=False)
+        trace = tmp_path / f"{name}.json"
+        task_runner.run_task("clean", filepath=str(path), interactive=False, trace=str(trace))
+        with open(trace, encoding="utf-8") as fh:
+            return json.load(fh)["stages"]
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        first, second = pool.submit(run, "first", 3), pool.submit(run, "second", 5)
+        first, second = first.result(), second.result()
+    task_runner.clear_stage_cache()
+
+    for stages, name, rows in ((first, "first", 3), (second, "second", 5)):
+        assert [r["name"] for r in stages] == ["load", "clean", "analyse:clean", "save"]
+        assert stages[0]["file"].endswith(f"{name}.csv") and stages[1]["rows"] == rows
+        assert "tracemalloc_peak_delta_bytes" in stages[-1]
+    assert not instrument_utils.is_enabled()
+    assert not tracemalloc.is_tracing()
+
+
+def test_pipeline_trace_includes_worker_thread_stages(tmp_path, output_folder):
+    path = tmp_path / "sales.csv"
+    pd.DataFrame({"Region": ["N", "S"], "Sales": [1.0, 2.0]}).to_csv(path, index=False)
+    task_runner.clear_stage_cache()
+    trace = tmp_path / "pipeline.json"
+    task_runner.run_pipeline(["clean"], filepath=str(path), trace=str(trace))
+    task_runner.clear_stage_cache()
+    with open(trace, encoding="utf-8") as fh:
+        names = [r["name"] for r in json.load(fh)["stages"]]
+    assert names == ["load", "clean", "analyse:clean", "save:clean"]
@@ -0,0 +1,51 @@
+import time
+
+import pandas as pd
+import pytest
+
+from market_data_utils import get_market_data, configure_cache, clear_cache, CachedTicker
+
+
+def test_memory_then_disk_then_fetch(market_cache):
+    market_cache.data[("WMT", "info")] = {"currentPrice": 60.0}
+    assert get_market_data("wmt", "info") == {"currentPrice": 60.0}
+    assert CachedTicker("WMT").info == {"currentPrice": 60.0}
+    assert len(market_cache.calls) == 1  # second call served from memory
+
+    clear_cache()  # memory only: the disk copy still serves
+    assert get_market_data("WMT", "info") == {"currentPrice": 60.0}
+    assert len(market_cache.calls) == 1
+
+
+def test_statement_frames_round_trip_through_disk(market_cache):
+    frame = pd.DataFrame({"2024": [1.0, 2.0]}, index=["Total Revenue", "Cost Of Revenue"])
+    market_cache.data[("TCS.NS", "financials")] = frame
+    get_market_data("TCS.NS", "financials")
+    clear_cache()
+    pd.testing.assert_frame_equal(get_market_data("TCS.NS", "financials"), frame)
+
+
+def test_expired_entry_is_refetched(market_cache):
+    market_cache.data[("MSFT", "info")] = {"v": 1}
+    get_market_data("MSFT", "info")
+    configure_cache(ttls={"info": 0})
+    time.sleep(0.01)
+    market_cache.data[("MSFT", "info")] = {"v": 2}
+    assert get_market_data("MSFT", "info") == {"v": 2}
+    assert len(market_cache.calls) == 2
+
+
+def test_offline_replays_stale_entries_and_never_fetches(market_cache):
+    market_cache.data[("JPM", "info")] = {"v": 1}
+    get_market_data("JPM", "info")
+    configure_cache(offline=True, ttls={"info": 0})
+    clear_cache()
+    assert get_market_data("JPM", "info") == {"v": 1}
+    with pytest.raises(LookupError):
+        get_market_data("AAPL", "info")
+    assert len(market_cache.calls) == 1
+
+
+def test_unknown_dataset_rejected(market_cache):
+    with pytest.raises(ValueError):
+        get_market_data("WMT", "dividends")
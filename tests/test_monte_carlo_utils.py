@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from forecast_utils import financial_forecast_batch, FORECAST_ASSUMPTIONS, DEFAULT_ASSUMPTIONS
+from monte_carlo_utils import StreamingMoments, QuantileSketch, monte_carlo_forecast, _sample
+
+
+def test_streaming_moments_match_numpy_across_merged_chunks():
+    values = np.random.default_rng(0).normal(50, 10, 10_001)
+    left, right = StreamingMoments(), StreamingMoments()
+    for chunk in np.array_split(values[:6000], 7):
+        left.update(chunk)
+    right.update(values[6000:])
+    merged = left.merge(right)
+    assert merged.count == values.size
+    assert merged.mean == pytest.approx(values.mean(), rel=1e-12)
+    assert merged.std == pytest.approx(values.std(ddof=1), rel=1e-10)
+    assert (merged.min, merged.max) == (values.min(), values.max())
+
+
+def test_quantile_sketch_within_relative_accuracy():
+    values = np.random.default_rng(1).lognormal(10, 1, 50_000) * np.where(np.arange(50_000) % 5 == 0, -1, 1)
+    sketch = QuantileSketch(relative_accuracy=0.01).update(values[:20_000]).merge(QuantileSketch(0.01).update(values[20_000:]))
+    for q in (0.05, 0.25, 0.5, 0.9):
+        assert sketch.quantile(q) == pytest.approx(np.quantile(values, q), rel=0.02)
+
+
+def test_monte_carlo_matches_batch_engine_and_is_reproducible():
+    spec = {"growth_rate": {"dist": "normal", "mean": 0.08, "std": 0.02},
+            "cogs_pct": {"dist": "uniform", "low": 0.55, "high": 0.65}}
+    result = monte_carlo_forecast(spec, n_paths=20_000, chunk_size=3_000, seed=7)
+    assert result == monte_carlo_forecast(spec, n_paths=20_000, chunk_size=3_000, seed=7)
+
+    # same draws, in the same chunk order, through the batch engine
+    rng = np.random.default_rng(7)
+    evs = []
+    for start in range(0, 20_000, 3_000):
+        size = min(3_000, 20_000 - start)
+        draws = {k: _sample(spec.get(k, DEFAULT_ASSUMPTIONS[k]), rng, size) for k in FORECAST_ASSUMPTIONS}
+        evs.append(financial_forecast_batch(draws)[1])
+    evs = np.concatenate(evs)
+    assert result["paths"] == 20_000
+    assert result["ev_mean"] == pytest.approx(evs.mean(), abs=0.01)
+    assert result["ev_quantiles"][0.5] == pytest.approx(np.median(evs), rel=0.01)
+    assert result["prob_loss"] == (evs < 0).mean()
+
+
+def test_unknown_distribution_raises():
+    with pytest.raises(ValueError):
+        monte_carlo_forecast({"growth_rate": {"dist": "cauchy"}}, n_paths=10)
+
+
+def test_non_finite_paths_are_excluded_from_every_statistic():
+    # half the paths discount at the terminal growth rate: infinite terminal value
+    spec = {"discount_rate": {"dist": "empirical", "values": [0.03, 0.12]}, "terminal_growth": 0.03,
+            "growth_rate": {"dist": "normal", "mean": 0.08, "std": 0.02}}
+    result = monte_carlo_forecast(spec, n_paths=10_000, chunk_size=3_000, seed=3)
+    assert 0 < result["excluded_paths"] < 10_000
+    assert result["paths"] + result["excluded_paths"] == 10_000
+    assert np.isfinite([result["ev_mean"], result["ev_std"], result["ev_max"], result["npv_mean"]]).all()
+
+    finite = monte_carlo_forecast({**spec, "discount_rate": 0.12}, n_paths=10_000, seed=3)
+    assert finite["excluded_paths"] == 0
+    # what is left is the 12% population: mean and median describe the same sample
+    assert result["ev_mean"] == pytest.approx(finite["ev_mean"], rel=0.02)
+    assert result["ev_quantiles"][0.5] == pytest.approx(finite["ev_quantiles"][0.5], rel=0.02)
@@ -0,0 +1,98 @@
+import json
+import os
+
+import pandas as pd
+import pytest
+
+import output_utils
+from output_utils import save_output, flush_outputs
+
+
+def _frame():
+    return pd.DataFrame({"Region": ["North", "South", "East", "West"], "Sales": [10.5, 20.0, 30.25, 40.0],
+                         "Units": [1, 2, 3, 4]})
+
+
+READERS = {"csv": pd.read_csv, "parquet": pd.read_parquet, "feather": pd.read_feather}
+
+
+@pytest.mark.parametrize("fmt", ["csv", "parquet", "feather"])
+def test_round_trip_per_format(fmt, output_folder):
+    path = save_output(_frame(), "sales.csv", "clean", interactive=False, fmt=fmt)
+    assert path == os.path.join(str(output_folder), f"sales_clean_output.{fmt}")
+    pd.testing.assert_frame_equal(READERS[fmt](path), _frame(), check_dtype=False)
+    assert os.listdir(output_folder) == [f"sales_clean_output.{fmt}"]
+
+
+def test_partitioned_parquet_replaces_previous_folder(output_folder):
+    df = _frame()
+    save_output(df, "sales.csv", "clean", interactive=False, fmt="parquet", partition_cols=["Region"])
+    path = save_output(df.iloc[:2], "sales.csv", "clean", interactive=False, fmt="parquet", partition_cols=["Region"])
+    assert sorted(os.listdir(path)) == ["Region=North", "Region=South"]
+    assert sorted(os.listdir(output_folder)) == ["sales_clean_output.parquet"]
+    with pytest.raises(ValueError, match="partition_cols"):
+        save_output(df, "sales.csv", "clean", interactive=False, fmt="csv", partition_cols=["Region"])
+
+
+def test_summary_side_car_from_attrs(output_folder):
+    df = _frame()
+    df.attrs["summary"] = {"correlation_value": 0.5, "correlation_p": 0.01}
+    path = save_output(df, "sales.csv", "relation", interactive=False)
+    with open(os.path.join(output_folder, "sales_relation_output_summary.json")) as fh:
+        assert json.load(fh) == {"correlation_value": 0.5, "correlation_p": 0.01}
+    assert list(pd.read_csv(path).columns) == ["Region", "Sales", "Units"]
+
+
+def test_failed_write_keeps_previous_output(output_folder, monkeypatch):
+    path = save_output(_frame(), "sales.csv", "clean", interactive=False)
+
+    def broken(self, target, **kwargs):
+        with open(target, "w") as fh:
+            fh.write("Region,Sa")
+        raise OSError("disk full")
+
+    monkeypatch.setattr(pd.DataFrame, "to_csv", broken)
+    with pytest.raises(OSError):
+        save_output(_frame().iloc[:1], "sales.csv", "clean", interactive=False)
+    monkeypatch.undo()
+    pd.testing.assert_frame_equal(pd.read_csv(path), _frame())
+
+
+def test_background_writes_and_archive(output_folder, monkeypatch):
+    monkeypatch.setitem(output_utils._settings, "background", True)
+    path = save_output(_frame(), "sales.csv", "clean", interactive=False, archive=True)
+    flush_outputs()
+    names = sorted(os.listdir(output_folder))
+    assert len(names) == 2 and names[0] == "sales_clean_output.csv"
+    assert names[1].startswith("sales_clean_output_") and names[1].endswith(".csv")
+    pd.testing.assert_frame_equal(pd.read_csv(path), _frame())
+
+
+def test_unknown_format_is_rejected(output_folder):
+    with pytest.raises(ValueError, match="not supported"):
+        save_output(_frame(), "sales.csv", "clean", interactive=False, fmt="xlsx")
+    with pytest.raises(ValueError, match="not supported"):
+        output_utils.configure_output(fmt="xlsx")
+
+
+def test_save_without_summary_removes_a_stale_one(output_folder):
+    df = _frame()
+    df.attrs["summary"] = {"correlation_value": 0.5}
+    save_output(df, "sales.csv", "relation", interactive=False)
+    assert os.path.exists(os.path.join(output_folder, "sales_relation_output_summary.json"))
+    save_output(_frame(), "sales.csv", "relation", interactive=False)
+    assert os.listdir(output_folder) == ["sales_relation_output.csv"]
+
+
+def test_background_write_is_not_affected_by_later_changes(output_folder, monkeypatch):
+    import threading
+    gate = threading.Event()
+    write_frame = output_utils._write_frame
+    monkeypatch.setattr(output_utils, "_write_frame", lambda *a, **kw: gate.wait(5) and write_frame(*a, **kw))
+    df = _frame()
+    path = save_output(df, "sales.csv", "clean", interactive=False, background=True)
+    df["Sales"] = 0.0
+    df.loc[0, "Units"] = 99
+    gate.set()
+    flush_outputs()
+    pd.testing.assert_frame_equal(pd.read_csv(path), _frame())
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from primary_clean_utils import (
+    clean_dataframe, clean_dataframe_fast, clean_csv_streaming, scan_csv_column_types, _synthetic_messy_frame,
+    compact_dataframe, memory_report
+)
+
+
+def _messy_csv(path, n=3_000, seed=0):
+    rng = np.random.default_rng(seed)
+    df = pd.DataFrame({
+        "Region Name": rng.choice([" north", "south ", " east "], n),
+        "Units": rng.integers(0, 20, n).astype(float),
+        "Price": np.round(rng.uniform(1, 9, n), 1),
+        "Code": rng.choice(["001", " 002", "003 "], n)
+    })
+    df.loc[rng.random(n) < 0.05, "Price"] = np.nan
+    df = pd.concat([df, df.iloc[::7], df.iloc[:0].reindex(range(5))], ignore_index=True)  # duplicates + empty rows
+    df.to_csv(path, index=False)
+    return path
+
+
+def test_streaming_clean_matches_in_memory_clean(tmp_path):
+    source = _messy_csv(tmp_path / "raw.csv")
+    summary = clean_csv_streaming(source, tmp_path / "clean.csv", chunksize=500)
+
+    expected = clean_dataframe(pd.read_csv(source)).reset_index(drop=True)
+    result = pd.read_csv(tmp_path / "clean.csv")
+    assert summary["rows_out"] == len(result) == len(expected)
+    assert summary["rows_in"] == summary["rows_out"] + summary["duplicates_dropped"] + summary["empty_dropped"]
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+
+
+def test_column_types_are_decided_for_the_whole_file(tmp_path):
+    path = tmp_path / "types.csv"
+    pd.DataFrame({"a": ["1", "2", "3", "4"], "b": ["1", "2", "x", "4"], "c": ["1", None, "3", "4"]}).to_csv(path, index=False)
+    assert scan_csv_column_types(path, chunksize=2) == {"a": "int64", "b": "object", "c": "float64"}
+
+
+@pytest.mark.parametrize("n_rows", [0, 1, 5_000])
+def test_fast_clean_matches_reference(n_rows):
+    raw = _synthetic_messy_frame(n_rows, 8, seed=2)
+    expected = clean_dataframe(raw.copy())
+    pd.testing.assert_frame_equal(clean_dataframe_fast(raw), expected)
+
+
+def test_fast_clean_edge_columns_and_leaves_input_untouched():
+    raw = pd.DataFrame({
+        "Mixed": [" a ", 1, None, " a ", 2.5],          # strings and numbers in one column
+        "Late Text": ["1", "2", "3", "4", " x "],        # numeric sample, text further down
+        "Numeric Text": [" 10", "20 ", None, " 10", "30"],
+        "Values": [1.0, np.nan, 3.0, 1.0, 5.0]
+    })
+    before = raw.copy()
+    pd.testing.assert_frame_equal(clean_dataframe_fast(raw, sample_size=2), clean_dataframe(raw.copy()))
+    pd.testing.assert_frame_equal(raw, before)
+
+
+def test_compact_keeps_numeric_dtypes_and_values():
+    df = pd.DataFrame({
+        "Region": ["North", "South"] * 500,
+        "Note": [f"order {i}" for i in range(1000)],
+        "Units": np.full(1000, 120, dtype="int64"),
+        "Price": np.full(1000, 1000.0),
+        "Delta": np.tile([-0.0, 0.5], 500),
+        "Flag": [True, False] * 500
+    })
+    compact = compact_dataframe(df)
+    assert isinstance(compact["Region"].dtype, pd.CategoricalDtype)
+    assert not isinstance(compact["Note"].dtype, pd.CategoricalDtype)
+    assert (compact.dtypes[["Units", "Price", "Delta", "Flag"]] == df.dtypes[["Units", "Price", "Delta", "Flag"]]).all()
+    # units * price and units ** 3 would overflow in int8 / int16
+    assert (compact["Units"] * compact["Price"] == 120_000.0).all()
+    assert (compact["Units"] ** 3 == 1_728_000).all()
+    assert np.signbit(compact["Delta"].iloc[0])
+    pd.testing.assert_frame_equal(compact.astype({"Region": df["Region"].dtype}), df, check_dtype=False)
+    assert not isinstance(df["Region"].dtype, pd.CategoricalDtype)  # input untouched
+    report = memory_report(df, compact)
+    assert report["bytes_after"].iloc[-1] < report["bytes_before"].iloc[-1]
+
+
+def test_compact_turns_python_and_object_text_into_arrow_strings():
+    notes = [f"order {i}" for i in range(6)]
+    df = pd.DataFrame({"Python": pd.Series(notes, dtype=pd.StringDtype("python")),
+                       "Object": pd.Series(notes[:5] + [None], dtype=object)})
+    compact = compact_dataframe(df)
+    assert compact["Python"].dtype == pd.StringDtype("pyarrow")
+    assert compact["Object"].dtype.storage == "pyarrow"
+    assert compact["Python"].tolist() == notes and compact["Object"].isna().tolist() == [False] * 5 + [True]
+
+
+def test_compact_downcast_numeric_is_opt_in_and_lossless():
+    df = pd.DataFrame({
+        "Units": np.arange(100, dtype="int64"),
+        "Big": np.full(100, 2 ** 40, dtype="int64"),
+        "Half": np.tile([0.5, -0.0, np.nan, 1.25], 25),
+        "Price": np.full(100, 0.1)
+    })
+    assert (compact_dataframe(df).dtypes == df.dtypes).all()
+    narrow = compact_dataframe(df, downcast_numeric=True)
+    assert narrow.dtypes.astype(str).tolist() == ["int8", "int64", "float32", "float64"]
+    assert np.signbit(narrow["Half"].iloc[1])
+    pd.testing.assert_frame_equal(narrow.astype(df.dtypes.to_dict()), df)
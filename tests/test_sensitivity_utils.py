@@ -0,0 +1,55 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from forecast_utils import DEFAULT_ASSUMPTIONS, financial_forecast_batch
+from sensitivity_utils import sensitivity_grid, tornado_data
+
+
+def _cell(base, revenue=2_000_000, years=6, **changes):
+    _, ev, _ = financial_forecast_batch({**base, **changes}, revenue=revenue, years=years)
+    return ev[0]
+
+
+def test_discount_grid_matches_per_cell_forecast():
+    axes = {"discount_rate": [0.08, 0.10, 0.12, 0.02], "terminal_growth": [0.01, 0.02, 0.03]}
+    out = sensitivity_grid(axes, revenue=2_000_000, years=6)
+    grid = out["grid"]
+    assert grid.shape == (4, 3) and grid.index.name == "discount_rate"
+    for r, g in itertools.product(*axes.values()):
+        cell = grid.loc[r, g]
+        if r <= g:
+            assert np.isnan(cell)  # no terminal value
+        else:
+            assert cell == pytest.approx(_cell(DEFAULT_ASSUMPTIONS, discount_rate=r, terminal_growth=g), rel=1e-12)
+    assert out["base_enterprise_value"] == pytest.approx(_cell(DEFAULT_ASSUMPTIONS), rel=1e-12)
+
+
+def test_mixed_three_axis_grid_keeps_axis_order():
+    base = {**DEFAULT_ASSUMPTIONS, "cogs_pct": 0.55}
+    axes = {"terminal_growth": [0.02, 0.03], "growth_rate": [0.05, 0.10, 0.15], "discount_rate": [0.09, 0.11]}
+    out = sensitivity_grid(axes, assumptions=base, revenue=2_000_000, years=6)
+    assert out["values"].shape == (2, 3, 2)
+    assert out["grid"].index.names == ["terminal_growth", "growth_rate"]
+    for (i, tg), (j, gr), (k, r) in itertools.product(*(enumerate(v) for v in axes.values())):
+        expected = _cell(base, terminal_growth=tg, growth_rate=gr, discount_rate=r)
+        assert out["values"][i, j, k] == pytest.approx(expected, rel=1e-12)
+        assert out["grid"].loc[(tg, gr), r] == pytest.approx(expected, rel=1e-12)
+
+
+def test_grid_rejects_bad_axes():
+    with pytest.raises(ValueError, match="Unknown assumptions"):
+        sensitivity_grid({"discount_rate": [0.1], "wacc": [0.1]})
+    with pytest.raises(ValueError, match="2 or 3 axes"):
+        sensitivity_grid({"discount_rate": [0.1]})
+
+
+def test_tornado_swings_are_sorted_and_match_forecasts():
+    ranges = {"growth_rate": (0.05, 0.15), "tax_rate": (0.25, 0.35), "discount_rate": (0.10, 0.14)}
+    table = tornado_data(ranges, revenue=2_000_000, years=6)
+    assert list(table["swing"]) == sorted(table["swing"], reverse=True)
+    for row in table.itertuples():
+        assert row.ev_low == pytest.approx(_cell(DEFAULT_ASSUMPTIONS, **{row.assumption: row.low}), rel=1e-12)
+        assert row.ev_high == pytest.approx(_cell(DEFAULT_ASSUMPTIONS, **{row.assumption: row.high}), rel=1e-12)
+    assert table.attrs["base_enterprise_value"] == pytest.approx(_cell(DEFAULT_ASSUMPTIONS), rel=1e-12)
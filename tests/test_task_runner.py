@@ -0,0 +1,132 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import task_runner
+from task_runner import _memoize, clear_stage_cache, stage_cache_bytes
+
+
+def _counting():
+    calls = []
+
+    def fn():
+        calls.append(1)
+        return len(calls)
+    return calls, fn
+
+
+def test_memo_keys_arrays_and_frames_by_content():
+    clear_stage_cache()
+    calls, fn = _counting()
+    # both arrays print as "[0. 0. 0. ... 0. 0. 0.]" — str() keys collided
+    a, b = np.zeros(5000), np.zeros(5000)
+    b[2500] = 1.0
+    assert str(a) == str(b)
+    _memoize("analyse", {"x": a}, fn)
+    _memoize("analyse", {"x": b}, fn)
+    _memoize("analyse", {"x": a.copy()}, fn)
+    assert len(calls) == 2
+
+    df1 = pd.DataFrame({"v": range(5000)})
+    df2 = df1.copy()
+    df2.loc[2500, "v"] = -1
+    _memoize("analyse", {"x": df1}, fn)
+    _memoize("analyse", {"x": df2}, fn)
+    _memoize("analyse", {"x": df1.copy()}, fn)
+    assert len(calls) == 4
+    clear_stage_cache()
+
+
+def test_unkeyable_params_are_not_memoized():
+    clear_stage_cache()
+    calls, fn = _counting()
+    _memoize("analyse", {"x": object()}, fn)
+    _memoize("analyse", {"x": object()}, fn)
+    assert len(calls) == 2 and len(task_runner._stage_cache) == 0
+
+
+def test_cache_is_bounded_by_bytes(monkeypatch):
+    clear_stage_cache()
+    frame = pd.DataFrame({"v": np.arange(10_000, dtype="float64")})
+    size = int(frame.memory_usage(index=True, deep=True).sum())
+    monkeypatch.setattr(task_runner, "STAGE_CACHE_MAX_BYTES", 3 * size)
+    for i in range(10):
+        _memoize("load", i, lambda: frame.copy())
+    assert len(task_runner._stage_cache) == 3
+    assert stage_cache_bytes() <= 3 * size
+    # the oldest were dropped, the newest kept
+    assert [k[1] for k in task_runner._stage_cache] == ["7", "8", "9"]
+    # an output larger than the whole budget is returned but not stored
+    big = pd.DataFrame({"v": np.zeros(50_000)})
+    assert _memoize("load", "big", lambda: big) is big
+    assert ("load", '"big"') not in task_runner._stage_cache
+    clear_stage_cache()
+    assert stage_cache_bytes() == 0
+
+
+def test_relation_without_columns_ranks_all_pairs(tmp_path, output_folder):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=200)
+    path = tmp_path / "metrics.csv"
+    pd.DataFrame({"Region": ["N"] * 200, "Sales": x, "Profit": 2 * x + rng.normal(size=200),
+                  "Noise": rng.normal(size=200)}).to_csv(path, index=False)
+    clear_stage_cache()
+    saved = task_runner.run_task("relation", filepath=str(path), interactive=False)
+    table = pd.read_csv(saved)
+    assert list(table.columns) == ["col1", "col2", "r", "p_value", "n"]
+    assert len(table) == 3
+    assert {table.loc[0, "col1"], table.loc[0, "col2"]} == {"sales", "profit"}
+    clear_stage_cache()
+
+
+def test_comparison_mode_is_separate_from_group_names(tmp_path, output_folder):
+    path = tmp_path / "teams.csv"
+    pd.DataFrame({"Team": ["rest", "all", "core"] * 20,
+                  "Score": np.arange(60, dtype=float)}).to_csv(path, index=False)
+    clear_stage_cache()
+    run = lambda **kw: task_runner.run_task("comparison", filepath=str(path), interactive=False,
+                                            group_col="team", metric="score", **kw)
+    # groups literally named "rest" / "all" are compared as groups
+    saved = run(group_a="rest", group_b="all")
+    assert pd.read_csv(saved).shape[0] == 60
+    assert pd.read_csv(run(mode="pairs")).shape[0] == 3
+    vs_rest = pd.read_csv(run(mode="rest"))
+    assert sorted(vs_rest["group1"]) == ["all", "core", "rest"]
+    with pytest.raises(ValueError, match="comparison mode"):
+        run(mode="everything")
+    clear_stage_cache()
+
+
+def test_tasks_registered_later_are_runnable(tmp_path, output_folder):
+    from batch_runner import load_job_spec
+    path = tmp_path / "sales.csv"
+    pd.DataFrame({"Region": ["N", "S"], "Sales": [1.0, 2.0]}).to_csv(path, index=False)
+
+    @task_runner.register_task("double")
+    def _task_double(df, **_):
+        return df.assign(sales=df["sales"] * 2)
+
+    try:
+        clear_stage_cache()
+        saved = task_runner.run_task("double", filepath=str(path), interactive=False)
+        assert pd.read_csv(saved)["sales"].tolist() == [2.0, 4.0]
+        out = task_runner.run_pipeline(["double", "clean"], filepath=str(path))
+        assert out["double"] == saved
+        assert load_job_spec([{"task": "double"}])[0]["task"] == "double"
+    finally:
+        del task_runner.TASK_REGISTRY["double"]
+        clear_stage_cache()
+
+
+def test_load_clean_caches_only_the_cleaned_frame(tmp_path, monkeypatch):
+    path = tmp_path / "sales.csv"
+    pd.DataFrame({"Region": ["N", "S"], "Sales": [1.0, 2.0]}).to_csv(path, index=False)
+    reads = []
+    monkeypatch.setattr(task_runner, "load_file", lambda p: reads.append(p) or pd.read_csv(p))
+    clear_stage_cache()
+    first = task_runner.load_clean(str(path))
+    second = task_runner.load_clean(str(path))
+    assert len(reads) == 1
+    assert [k[0] for k in task_runner._stage_cache] == ["clean"]
+    pd.testing.assert_frame_equal(first, second)
+    clear_stage_cache()
@@ -0,0 +1,85 @@
+import pandas as pd
+import pytest
+
+from financial_metrics_utils import get_assumptions, get_assumptions_batch, ASSUMPTION_COLUMNS
+from kpi_utils import valuation_kpis, valuation_kpis_batch, KPI_COLUMNS
+from market_data_utils import fetch_many
+
+INFO = {"currentPrice": 50.0, "trailingEps": 5.0, "bookValue": 25.0, "dividendRate": 1.0, "beta": 1.2}
+
+
+def _statements(revenue=(100.0, 110.0, 121.0)):
+    years = ["2022", "2023", "2024"]
+    fin = pd.DataFrame([revenue, [0.6 * r for r in revenue], [0.2 * r for r in revenue]],
+                       index=["Total Revenue", "Cost Of Revenue", "Operating Income"], columns=years)
+    cf = pd.DataFrame([[-5.0, -5.5, -6.05]], index=["Capital Expenditures"], columns=years)
+    bs = pd.DataFrame([[50.0, 55.0, 60.5], [30.0, 33.0, 36.3]],
+                      index=["Total Current Assets", "Total Current Liabilities"], columns=years)
+    return fin, cf, bs
+
+
+def test_kpi_batch_keeps_input_order_and_reports_failures(market_cache):
+    market_cache.data[("AAA", "info")] = INFO
+    market_cache.data[("CCC", "info")] = {**INFO, "currentPrice": 100.0}
+    table = valuation_kpis_batch(["CCC", "BBB", "AAA"], retries=0)
+    assert table["Ticker"].tolist() == ["CCC", "BBB", "AAA"]
+    assert table["Error"].isna().tolist() == [True, False, True]
+    pd.testing.assert_frame_equal(table.iloc[[2]].drop(columns="Error").reset_index(drop=True), valuation_kpis("AAA"))
+
+
+def test_kpi_batch_of_no_tickers_is_an_empty_frame():
+    table = valuation_kpis_batch([])
+    assert table.empty
+    assert list(table.columns) == KPI_COLUMNS + ["Error"]
+
+
+def test_kpi_without_current_price_raises(market_cache):
+    market_cache.data[("NOPX", "info")] = {**INFO, "currentPrice": None}
+    with pytest.raises(ValueError, match="No current price for NOPX"):
+        valuation_kpis("NOPX")
+    table = valuation_kpis_batch(["NOPX"], retries=3, backoff=10)  # a retry would sleep 10s
+    assert list(table.columns) == KPI_COLUMNS + ["Error"]
+    assert table.loc[0, "Error"].startswith("ValueError")
+
+
+def test_assumption_batches_always_have_the_same_columns(market_cache):
+    empty = get_assumptions_batch([])
+    assert empty.empty and list(empty.columns) == ASSUMPTION_COLUMNS + ["Error"]
+    failed = get_assumptions_batch(["MISSING"], retries=0)
+    assert list(failed.columns) == ASSUMPTION_COLUMNS + ["Error"]
+    assert failed.loc[0, "Ticker"] == "MISSING" and failed.loc[0, "Error"]
+
+
+def test_get_assumptions_batch_matches_single_calls(market_cache):
+    for ticker in ("AAA", "BBB"):
+        fin, cf, bs = _statements()
+        market_cache.data.update({(ticker, "financials"): fin, (ticker, "cashflow"): cf,
+                                  (ticker, "balance_sheet"): bs, (ticker, "info"): INFO})
+    table = get_assumptions_batch(["AAA", "BBB"], max_workers=2)
+    single = get_assumptions("AAA")
+    assert table["Error"].isna().all()
+    assert table.iloc[0].drop(["Ticker", "Error"]).to_dict() == single
+    assert single["Growth Rate"] == 10.0
+
+
+def test_missing_revenue_fails_fast_without_retries(market_cache):
+    market_cache.data.update({("EMPTY", "financials"): pd.DataFrame(), ("EMPTY", "cashflow"): pd.DataFrame(),
+                              ("EMPTY", "balance_sheet"): pd.DataFrame()})
+    with pytest.raises(ValueError):
+        get_assumptions("EMPTY")
+    table = get_assumptions_batch(["EMPTY"], retries=3, backoff=10)  # a retry would sleep 10s
+    assert table["Error"].iloc[0].startswith("ValueError")
+    assert market_cache.calls.count(("EMPTY", "financials")) == 1
+
+
+def test_fetch_many_retries_transient_errors():
+    attempts = []
+
+    def flaky(ticker):
+        attempts.append(ticker)
+        if len(attempts) < 3:
+            raise ConnectionError("timeout")
+        return ticker.lower()
+
+    assert fetch_many(flaky, ["X"], retries=2, backoff=0) == [("X", "x", None)]
+    assert len(attempts) == 3